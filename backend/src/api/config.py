@@ -13,6 +13,8 @@ class GeneralSettings(BaseSettings):
     frontend_url: str = Field(default="")
     root_path: str = Field(default="")
     log_level: LogLevel = Field(default=LogLevel.debug)
+    validation_workers: int = Field(default=4, ge=1)  # max plans validated at once
+    schedule_workers: int = Field(default=1, ge=1)  # max plans scheduled at once, in processes apart from validation
 
 
 CONFIG = GeneralSettings()  # type: ignore[call-arg]
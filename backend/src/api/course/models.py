@@ -2,7 +2,7 @@
 
 from uuid import UUID, uuid4
 
-from sqlalchemy import JSON, ForeignKey, UniqueConstraint
+from sqlalchemy import JSON, Computed, ForeignKey, UniqueConstraint
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -87,6 +87,9 @@ class CourseDBModel(BaseDBModel):
     category: Mapped[str]
     code: Mapped[str]
 
+    # Full course code e.g., 'CSSE1001', generated by the db so lookups by it can use an index
+    full_code: Mapped[str] = mapped_column(Computed("category || code", persisted=True), index=True, unique=True)
+
     # info
     name: Mapped[str]
     description: Mapped[str]
@@ -117,7 +120,5 @@ class CourseDBModel(BaseDBModel):
 
     assessment: Mapped[dict | None] = mapped_column(JSON)
 
-    @hybrid_property
-    def full_code(self) -> str:
-        """Get full course code e.g., 'CSSE1001."""
-        return self.category + self.code
+    # hash of the data file record it was seeded from, to tell when it needs updating
+    content_hash: Mapped[str | None]
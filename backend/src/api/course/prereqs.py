@@ -0,0 +1,154 @@
+"""In memory prerequisite graph over the course catalogue."""
+
+import logging
+import re
+from collections.abc import Iterable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.course.models import CourseDBModel
+from common.enums import CourseRequirementKind
+from degree.interner import course_interner
+
+log = logging.getLogger(__name__)
+
+COURSE_CODE_PATTERN = re.compile(r"[A-Z]{4}[0-9]{4}")
+
+
+def requirement_codes(requirement: dict | None) -> Iterator[str]:
+    """Every course code in a stored requirement (see common.reqs_parsing), whether and'd or or'd."""
+    if requirement is None:
+        return
+    stack = [requirement]
+    while stack:
+        node = stack.pop()
+        value = node.get("value")
+        if node.get("kind") == CourseRequirementKind.ATOMIC:
+            code = str(value).strip().upper()
+            if COURSE_CODE_PATTERN.fullmatch(code):
+                yield code
+        elif isinstance(value, list):
+            stack.extend(child for child in value if isinstance(child, dict))
+
+
+class PrerequisiteGraph:
+    """Prerequisite edges between courses, by their interned ids (see degree.interner).
+
+    Transitive prerequisites/unlocks are bitsets, computed the first time they're asked
+    for and kept until the graph is rebuilt.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty graph, see `build`."""
+        self._trees: dict[str, dict | None] = {}  # full code -> stored prerequisite requirement
+        self._incompatible: dict[str, dict] = {}  # full code -> stored incompatible requirement
+        self._requires: dict[int, tuple[int, ...]] = {}  # course -> its direct prerequisites
+        self._unlocks: dict[int, tuple[int, ...]] = {}  # course -> courses it's a direct prerequisite of
+        self._all_requires: dict[int, int] = {}
+        self._all_unlocks: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        """Number of courses in the graph."""
+        return len(self._trees)
+
+    def __contains__(self, code: str) -> bool:
+        """Whether the course is in the graph."""
+        return code in self._trees
+
+    def build(self, courses: Iterable[tuple[str, dict | None, dict | None]]) -> None:
+        """Replace the contents of the graph.
+
+        Args:
+            courses (Iterable[tuple[str, dict | None, dict | None]]): The full code, and stored
+                prerequisite and incompatible requirements of each course.
+        """
+        trees: dict[str, dict | None] = {}
+        incompatible: dict[str, dict] = {}
+        requires: dict[int, tuple[int, ...]] = {}
+        unlocks: dict[int, list[int]] = {}
+
+        for full_code, prerequisite, incompatible_with in courses:
+            trees[full_code] = prerequisite
+            if incompatible_with is not None:
+                incompatible[full_code] = incompatible_with
+            course_id = course_interner.intern(full_code)
+            prereq_ids = tuple(dict.fromkeys(course_interner.intern(code) for code in requirement_codes(prerequisite)))
+            if prereq_ids:
+                requires[course_id] = prereq_ids
+                for prereq_id in prereq_ids:
+                    unlocks.setdefault(prereq_id, []).append(course_id)
+
+        # swap everything in at once so lookups never see a half built graph
+        self._trees, self._incompatible, self._requires = trees, incompatible, requires
+        self._unlocks = {course_id: tuple(ids) for course_id, ids in unlocks.items()}
+        self._all_requires, self._all_unlocks = {}, {}
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        """Rebuild the graph from the courses in the db."""
+        result = await session.execute(
+            select(CourseDBModel.full_code, CourseDBModel.prerequisite, CourseDBModel.incompatible)
+        )
+        self.build((row.full_code, row.prerequisite, row.incompatible) for row in result)
+        log.info(f"Built prerequisite graph over {len(self)} courses and {len(self._requires)} with prerequisites")
+
+    def _closure(self, course_id: int, edges: dict[int, tuple[int, ...]], memo: dict[int, int]) -> int:
+        """Bitset of every course reachable from the course, reusing any already computed closures."""
+        if course_id in memo:
+            return memo[course_id]
+
+        reached = 0
+        stack = list(edges.get(course_id, ()))
+        while stack:
+            other = stack.pop()
+            bit = 1 << other
+            if reached & bit:
+                continue
+            reached |= bit
+            if other in memo:
+                reached |= memo[other]
+            else:
+                stack.extend(edges.get(other, ()))
+
+        # a course can end up its own prerequisite through a cycle in the handbook data
+        reached &= ~(1 << course_id)
+        memo[course_id] = reached
+        return reached
+
+    def prerequisite(self, code: str) -> dict | None:
+        """The course's stored prerequisite requirement."""
+        return self._trees.get(code)
+
+    def incompatible(self, code: str) -> dict | None:
+        """The course's stored incompatible requirement."""
+        return self._incompatible.get(code)
+
+    def requires(self, code: str, transitive: bool = False) -> list[str]:  # noqa: FBT001, FBT002
+        """Courses that are (directly or transitively) prerequisites of the course, sorted."""
+        course_id = course_interner.lookup(code)
+        if course_id is None:
+            return []
+        if transitive:
+            mask = self._closure(course_id, self._requires, self._all_requires)
+            return sorted(course_interner.codes(mask))
+        return sorted(course_interner.codes(self._mask(self._requires, course_id)))
+
+    def unlocks(self, code: str, transitive: bool = False) -> list[str]:  # noqa: FBT001, FBT002
+        """Courses the course is (directly or transitively) a prerequisite of, sorted."""
+        course_id = course_interner.lookup(code)
+        if course_id is None:
+            return []
+        if transitive:
+            mask = self._closure(course_id, self._unlocks, self._all_unlocks)
+            return sorted(course_interner.codes(mask))
+        return sorted(course_interner.codes(self._mask(self._unlocks, course_id)))
+
+    @staticmethod
+    def _mask(edges: dict[int, tuple[int, ...]], course_id: int) -> int:
+        mask = 0
+        for other in edges.get(course_id, ()):
+            mask |= 1 << other
+        return mask
+
+
+prerequisite_graph = PrerequisiteGraph()
@@ -1,26 +1,87 @@
 """Course routes."""
 
-from fastapi import APIRouter, HTTPException, status
+from collections.abc import AsyncGenerator
+from typing import Annotated
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 
 from api.course.models import CourseDBModel
-from api.course.schemas import CourseRead, CourseReadDetailed
-from api.course.service import get_all_courses, get_course_by_full_code
+from api.course.prereqs import prerequisite_graph
+from api.course.schemas import (
+    CourseFilters,
+    CoursePrereqTree,
+    CourseRead,
+    CourseReadDetailed,
+    CourseSearchHit,
+    CourseUnlocks,
+)
+from api.course.search import course_search_index
+from api.course.service import get_all_courses, get_course_by_full_code, get_course_fields, stream_courses
 from api.database.deps import DbSession
-from common.enums import CourseLevel
+from api.database.service import session_factory
+from api.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from common.enums import CourseField
+
+MAX_SEARCH_RESULTS = 100
 
 r = router = APIRouter()
 
 
 @r.get("", response_model=list[CourseRead])
-async def get_all(
+async def get_all(  # noqa: PLR0913, PLR0917
     db: DbSession,
-    course_category: str | None = None,
-    course_level: CourseLevel | None = None,
-    num_units: int | None = None,
-    is_active: bool | None = None,  # noqa: FBT001
-) -> list[CourseDBModel]:
-    """Get all courses."""
-    return await get_all_courses(db, course_category, course_level, num_units, is_active)
+    response: Response,
+    filters: Annotated[CourseFilters, Depends()],
+    after: str | None = None,
+    limit: Annotated[int | None, Query(ge=1, le=MAX_PAGE_SIZE)] = None,
+    fields: Annotated[list[CourseField] | None, Query()] = None,
+) -> list[CourseDBModel] | Response:
+    """Get all courses.
+
+    Pass `limit` to page through the courses, the full code to pass as `after` for the
+    next page is returned in the `X-Next-Cursor` header. Pass `fields` to only get those
+    columns of each course.
+    """
+    if fields:
+        rows = await get_course_fields(db, filters, fields, after, limit)
+        next_cursor = rows[-1][CourseField.FULL_CODE] if limit and len(rows) == limit else None
+        headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+        return Response(orjson.dumps(rows), media_type="application/json", headers=headers)
+
+    courses = await get_all_courses(db, filters, after, limit)
+    if limit and len(courses) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = courses[-1].full_code
+    return courses
+
+
+@r.get("/stream")
+async def stream(
+    filters: Annotated[CourseFilters, Depends()],
+    fields: Annotated[list[CourseField] | None, Query()] = None,
+) -> StreamingResponse:
+    """Stream all courses as newline delimited JSON."""
+
+    async def lines() -> AsyncGenerator[bytes]:
+        # the session has to outlive this handler, so the stream gets its own
+        async with session_factory() as session:
+            async for course in stream_courses(session, filters, fields):
+                yield orjson.dumps(course) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@r.get("/search")
+async def search(
+    q: Annotated[str, Query(min_length=1)],
+    limit: Annotated[int, Query(ge=1, le=MAX_SEARCH_RESULTS)] = 20,
+) -> list[CourseSearchHit]:
+    """Search courses by code prefix (e.g., 'CSSE2'), name and description."""
+    return [
+        CourseSearchHit(full_code=full_code, name=name, rank=rank)
+        for full_code, name, rank in course_search_index.search(q, limit)
+    ]
 
 
 @r.get("/{course_code}", response_model=CourseReadDetailed)
@@ -32,3 +93,33 @@ async def get(course_code: str, db: DbSession) -> CourseDBModel:
             status_code=status.HTTP_404_NOT_FOUND, detail=f"Course under the id '{course_code}' not found"
         )
     return result
+
+
+def _require_in_graph(course_code: str) -> None:
+    if course_code not in prerequisite_graph:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Course under the id '{course_code}' not found"
+        )
+
+
+@r.get("/{course_code}/prereq-tree")
+async def prereq_tree(course_code: str) -> CoursePrereqTree:
+    """Get a course's prerequisites, including the prerequisites of those and so on."""
+    _require_in_graph(course_code)
+    return CoursePrereqTree(
+        full_code=course_code,
+        prerequisite=prerequisite_graph.prerequisite(course_code),
+        requires=prerequisite_graph.requires(course_code),
+        all_requires=prerequisite_graph.requires(course_code, transitive=True),
+    )
+
+
+@r.get("/{course_code}/unlocks")
+async def unlocks(course_code: str) -> CourseUnlocks:
+    """Get the courses a course is a prerequisite of, including the courses those unlock and so on."""
+    _require_in_graph(course_code)
+    return CourseUnlocks(
+        full_code=course_code,
+        unlocks=prerequisite_graph.unlocks(course_code),
+        all_unlocks=prerequisite_graph.unlocks(course_code, transitive=True),
+    )
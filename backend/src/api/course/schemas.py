@@ -9,6 +9,23 @@ from common.reqs_parsing import RequirementRead
 from common.schemas import AssessmentItem, SecatInfo, UQRoadmapBase
 
 
+class CourseFilters(UQRoadmapBase):
+    """Filters for listing courses."""
+
+    course_category: str | None = None
+    course_level: CourseLevel | None = None
+    num_units: int | None = None
+    is_active: bool | None = None
+
+
+class CourseSearchHit(UQRoadmapBase):
+    """A course matching a search."""
+
+    full_code: str
+    name: str
+    rank: float
+
+
 class CourseOfferingRead(UQRoadmapBase):
     """Read a course offering."""
 
@@ -79,3 +96,20 @@ class CourseReadDetailed(CourseRead):
     duration: int
     class_hours: str | None
     course_enquries: str | None
+
+
+class CoursePrereqTree(UQRoadmapBase):
+    """A course's prerequisites."""
+
+    full_code: str
+    prerequisite: RequirementRead | None
+    requires: list[str]  # direct prerequisites
+    all_requires: list[str]  # prerequisites of prerequisites and so on
+
+
+class CourseUnlocks(UQRoadmapBase):
+    """The courses a course is a prerequisite of."""
+
+    full_code: str
+    unlocks: list[str]  # courses it's a direct prerequisite of
+    all_unlocks: list[str]  # and the courses those are prerequisites of, and so on
@@ -0,0 +1,135 @@
+"""In memory search index over the course catalogue."""
+
+import bisect
+import heapq
+import logging
+import math
+import re
+from collections.abc import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.course.models import CourseDBModel
+
+log = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# how much a query term matching each part of a course counts towards its rank
+EXACT_CODE_WEIGHT = 100.0
+CODE_PREFIX_WEIGHT = 20.0
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+TERM_PREFIX_DISCOUNT = 0.5  # a term that only prefixes a word counts for less
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase search terms."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class CourseSearchIndex:
+    """Inverted index over course codes, names and descriptions.
+
+    Course codes are kept sorted so code prefixes (e.g., "CSSE2") are a binary
+    search, and name/description words are kept in postings lists weighted by
+    where they appear and how rare they are.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty index, see `build`."""
+        self._codes: list[str] = []  # lowercase full codes, sorted
+        self._names: dict[str, str] = {}  # lowercase full code -> name
+        self._display: dict[str, str] = {}  # lowercase full code -> full code
+        self._terms: list[str] = []  # every indexed word, sorted
+        self._postings: dict[str, dict[str, float]] = {}  # word -> lowercase full code -> weight
+
+    def __len__(self) -> int:
+        """Number of courses in the index."""
+        return len(self._codes)
+
+    def build(self, courses: Iterable[tuple[str, str, str]]) -> None:
+        """Replace the contents of the index.
+
+        Args:
+            courses (Iterable[tuple[str, str, str]]): The (full code, name, description) of each course.
+        """
+        names: dict[str, str] = {}
+        display: dict[str, str] = {}
+        term_freqs: dict[str, dict[str, float]] = {}
+
+        for full_code, name, description in courses:
+            key = full_code.lower()
+            names[key] = name
+            display[key] = full_code
+
+            for weight, text in ((NAME_WEIGHT, name), (DESCRIPTION_WEIGHT, description)):
+                for term in tokenize(text):
+                    docs = term_freqs.setdefault(term, {})
+                    docs[key] = docs.get(key, 0) + weight
+
+        num_courses = max(len(names), 1)
+        postings: dict[str, dict[str, float]] = {}
+        for term, docs in term_freqs.items():
+            idf = math.log(num_courses / len(docs)) + 1
+            # dampen repeated words so long descriptions don't drown out names
+            postings[term] = {key: (1 + math.log(freq)) * idf for key, freq in docs.items()}
+
+        # swap everything in at once so searches never see a half built index
+        self._codes, self._names, self._display = sorted(names), names, display
+        self._terms, self._postings = sorted(postings), postings
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        """Rebuild the index from the courses in the db."""
+        result = await session.execute(select(CourseDBModel.full_code, CourseDBModel.name, CourseDBModel.description))
+        self.build((row.full_code, row.name, row.description) for row in result)
+        log.info(f"Built course search index over {len(self)} courses")
+
+    def _with_prefix(self, values: list[str], prefix: str) -> list[str]:
+        start = bisect.bisect_left(values, prefix)
+        end = bisect.bisect_left(values, prefix + "\uffff")
+        return values[start:end]
+
+    def _score_term(self, term: str) -> dict[str, float]:
+        scores: dict[str, float] = {}
+
+        for key in self._with_prefix(self._codes, term):
+            scores[key] = EXACT_CODE_WEIGHT if key == term else CODE_PREFIX_WEIGHT
+
+        for word in self._with_prefix(self._terms, term):
+            discount = 1.0 if word == term else TERM_PREFIX_DISCOUNT
+            for key, weight in self._postings[word].items():
+                scores[key] = scores.get(key, 0) + weight * discount
+
+        return scores
+
+    def search(self, query: str, limit: int) -> list[tuple[str, str, float]]:
+        """Find the courses best matching every term in the query.
+
+        Args:
+            query (str): Search text, e.g., "CSSE2" or "operating systems".
+            limit (int): Maximum number of results.
+
+        Returns:
+            list[tuple[str, str, float]]: The (full code, name, rank) of each match, best first.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        totals: dict[str, float] | None = None
+        for term in terms:
+            scores = self._score_term(term)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {key: total + scores[key] for key, total in totals.items() if key in scores}
+            if not totals:
+                return []
+
+        best = heapq.nsmallest(limit, totals.items(), key=lambda item: (-item[1], item[0]))  # type: ignore[union-attr]
+        return [(self._display[key], self._names[key], round(score, 4)) for key, score in best]
+
+
+course_search_index = CourseSearchIndex()
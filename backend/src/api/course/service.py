@@ -1,46 +1,119 @@
 """Course service."""
 
-from sqlalchemy import select
+from collections.abc import AsyncGenerator, Iterable
+from typing import Any
+
+from sqlalchemy import Row, Select, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from api.course.models import CourseDBModel
-from common.enums import CourseLevel
+from api.course.models import CourseDBModel, CourseSecatDBModel
+from api.course.schemas import CourseFilters, CourseRead
+from common.enums import CourseField
+
+STREAM_BATCH_SIZE = 500  # rows fetched from the db at a time when streaming courses
+
+
+def _filter_courses(query: Select, filters: CourseFilters, after: str | None) -> Select:
+    """Apply the listing filters and keyset cursor to a course query."""
+    if filters.course_category:
+        query = query.where(CourseDBModel.category == filters.course_category)
+    if filters.course_level:
+        query = query.where(CourseDBModel.level == filters.course_level)
+    if filters.num_units:
+        query = query.where(CourseDBModel.num_units == filters.num_units)
+    if filters.is_active is not None:
+        query = query.where(CourseDBModel.active == filters.is_active)
+    if after is not None:
+        query = query.where(CourseDBModel.full_code > after)
+    return query.order_by(CourseDBModel.full_code)
+
+
+def _select_fields(fields: Iterable[CourseField]) -> Select:
+    """Select only the given course columns, always including the full code for the cursor."""
+    names = dict.fromkeys([CourseField.FULL_CODE, *fields])
+    return select(*(getattr(CourseDBModel, name) for name in names))
 
 
 async def get_all_courses(
     db: AsyncSession,
-    course_category: str | None,
-    course_level: CourseLevel | None,
-    num_units: int | None,
-    is_active: bool | None,  # noqa: FBT001
+    filters: CourseFilters,
+    after: str | None = None,
+    limit: int | None = None,
 ) -> list[CourseDBModel]:
     """Get all the courses with optional filters.
 
     Args:
         db (AsyncSession): Database session.
-        course_category (str | None): Course category filter.
-        course_level (CourseLevel | None): Course level filter.
-        num_units (int | None): Number of units filter.
-        is_active (bool | None): Active status filter.
+        filters (CourseFilters): Course filters.
+        after (str | None): Only get courses with a full code after this one.
+        limit (int | None): Maximum number of courses to get.
 
     Returns:
-        list[CourseDBModel]: _description_
+        list[CourseDBModel]: Courses ordered by full code.
     """
-    query = select(CourseDBModel)
-    if course_category:
-        query = query.where(CourseDBModel.category == course_category)
-    if course_level:
-        query = query.where(CourseDBModel.level == course_level)
-    if num_units:
-        query = query.where(CourseDBModel.num_units == num_units)
-    if is_active is not None:
-        query = query.where(CourseDBModel.active == is_active)
+    query = _filter_courses(select(CourseDBModel), filters, after).limit(limit)
 
     result = await db.execute(query)
     return list(result.scalars().unique().all())
 
 
+async def get_course_fields(
+    db: AsyncSession,
+    filters: CourseFilters,
+    fields: list[CourseField],
+    after: str | None = None,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
+    """Get only some columns of the courses, skipping the secat and offering joins.
+
+    Args:
+        db (AsyncSession): Database session.
+        filters (CourseFilters): Course filters.
+        fields (list[CourseField]): Columns to get, the full code is always included.
+        after (str | None): Only get courses with a full code after this one.
+        limit (int | None): Maximum number of courses to get.
+
+    Returns:
+        list[dict[str, Any]]: Course columns ordered by full code.
+    """
+    query = _filter_courses(_select_fields(fields), filters, after).limit(limit)
+
+    result = await db.execute(query)
+    return [row._asdict() for row in result]
+
+
+async def stream_courses(
+    db: AsyncSession,
+    filters: CourseFilters,
+    fields: list[CourseField] | None = None,
+) -> AsyncGenerator[dict[str, Any]]:
+    """Stream courses from the db in batches rather than loading them all at once.
+
+    Args:
+        db (AsyncSession): Database session.
+        filters (CourseFilters): Course filters.
+        fields (list[CourseField] | None): Only get these columns, otherwise get full courses.
+
+    Yields:
+        dict[str, Any]: Each course, ordered by full code.
+    """
+    if fields:
+        query = _filter_courses(_select_fields(fields), filters, None)
+        rows = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for row in rows:
+            yield row._asdict()
+        return
+
+    # joined eager loads of collections can't be batched, so load the secats per batch instead
+    query = _filter_courses(select(CourseDBModel), filters, None).options(
+        selectinload(CourseDBModel.secat).selectinload(CourseSecatDBModel.questions)
+    )
+    courses = await db.stream_scalars(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    async for course in courses:
+        yield CourseRead.model_validate(course).model_dump(mode="json")
+
+
 async def get_course_by_full_code(db: AsyncSession, course_code: str) -> CourseDBModel | None:
     """Get a course by code.
 
@@ -57,3 +130,33 @@ async def get_course_by_full_code(db: AsyncSession, course_code: str) -> CourseD
         .where(CourseDBModel.full_code == course_code)
     )
     return result.unique().scalar_one_or_none()
+
+
+async def get_courses_by_full_codes(db: AsyncSession, course_codes: Iterable[str]) -> dict[str, Row]:
+    """Get a lightweight summary of many courses in a single query.
+
+    Only the columns needed to validate plans and suggest courses are selected, so none of the
+    joined secat/offering relationships are loaded.
+
+    Args:
+        db (AsyncSession): Database session.
+        course_codes (Iterable[str]): Course codes to look up, e.g., "CSSE2310".
+
+    Returns:
+        dict[str, Row]: Maps each course code that was found to its row.
+    """
+    codes = set(course_codes)
+    if not codes:
+        return {}
+
+    result = await db.execute(
+        select(
+            CourseDBModel.full_code,
+            CourseDBModel.name,
+            CourseDBModel.num_units,
+            CourseDBModel.level,
+            CourseDBModel.semesters_str,
+            CourseDBModel.score,
+        ).where(CourseDBModel.full_code.in_(codes))
+    )
+    return {row.full_code: row for row in result}
@@ -2,10 +2,12 @@
 
 import datetime
 import logging
+from collections.abc import Mapping
+from concurrent.futures import Executor
 
 from api.course.models import CourseDBModel, CourseOfferingDBModel, CourseSecatDBModel, CourseSecatQuestionsDBModel
 from common.enums import CourseMode
-from common.reqs_parsing import parse_requirement
+from common.reqs_parsing import RequirementRead, parse_requirement, parse_requirements_bulk
 from common.schemas import SecatInfo
 from scraper.courses.models import ScrapedCourse, ScrapedCourseOffering
 
@@ -51,13 +53,28 @@ def _transform_scraped_offering(scraped: ScrapedCourseOffering, active: bool) ->
     )
 
 
-def transform_scraped_course(scraped: ScrapedCourse) -> CourseDBModel:
-    """Transform scraped course into db model."""
+def _requirement(text: str | None, parsed: Mapping[str, RequirementRead] | None) -> RequirementRead | None:
+    if not text:
+        return None
+    if parsed is not None and text in parsed:
+        return parsed[text]
+    return parse_requirement(text)
+
+
+def transform_scraped_course(
+    scraped: ScrapedCourse, parsed: Mapping[str, RequirementRead] | None = None
+) -> CourseDBModel:
+    """Transform scraped course into db model.
+
+    Args:
+        scraped (ScrapedCourse): The course.
+        parsed (Mapping[str, RequirementRead] | None): Requirement strings already parsed, the rest are parsed here.
+    """
     category, code = scraped.code_parts
     log.info(f"Transforming course: {scraped.code}")
 
-    incompatible_req = parse_requirement(scraped.incompatible) if scraped.incompatible else None
-    prerequisite_req = parse_requirement(scraped.prerequisite) if scraped.prerequisite else None
+    incompatible_req = _requirement(scraped.incompatible, parsed)
+    prerequisite_req = _requirement(scraped.prerequisite, parsed)
 
     offerings: list[CourseOfferingDBModel] = []
 
@@ -97,3 +114,17 @@ def transform_scraped_course(scraped: ScrapedCourse) -> CourseDBModel:
         if scraped.latest_assessment
         else None,
     )
+
+
+def transform_scraped_courses(
+    scraped_courses: list[ScrapedCourse], pool: Executor | None = None
+) -> list[CourseDBModel]:
+    """Transform scraped courses into db models, parsing all their requirements in one go.
+
+    Args:
+        scraped_courses (list[ScrapedCourse]): The courses to transform.
+        pool (Executor | None): Process pool to parse the requirements in, see requirement_pool.
+    """
+    texts = list({text for course in scraped_courses for text in (course.incompatible, course.prerequisite) if text})
+    parsed = dict(zip(texts, parse_requirements_bulk(texts, pool=pool), strict=True))
+    return [transform_scraped_course(course, parsed) for course in scraped_courses]
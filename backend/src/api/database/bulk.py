@@ -0,0 +1,169 @@
+"""Bulk inserts and upserts of plain column rows, skipping the ORM unit of work when seeding."""
+
+import logging
+from collections.abc import Iterable, Sequence
+from collections.abc import Set as AbstractSet
+from itertools import batched
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import Table, delete, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.course.models import CourseDBModel, CourseOfferingDBModel, CourseSecatDBModel, CourseSecatQuestionsDBModel
+from api.database.base import BaseDBModel
+from api.degree.models import DegreeDBModel
+
+log = logging.getLogger(__name__)
+
+BULK_INSERT_CHUNK_SIZE = 5000  # rows sent per executemany
+
+# what identifies a course row when upserting
+COURSE_KEYS = ("category", "code")
+
+type Row = dict[str, Any]
+type TableRows = dict[Table, list[Row]]
+
+COURSE_TABLE: Table = CourseDBModel.__table__  # type: ignore[assignment]
+OFFERING_TABLE: Table = CourseOfferingDBModel.__table__  # type: ignore[assignment]
+SECAT_TABLE: Table = CourseSecatDBModel.__table__  # type: ignore[assignment]
+QUESTION_TABLE: Table = CourseSecatQuestionsDBModel.__table__  # type: ignore[assignment]
+DEGREE_TABLE: Table = DegreeDBModel.__table__  # type: ignore[assignment]
+
+
+def model_row(model: BaseDBModel) -> Row:
+    """The columns of a model that isn't in a session yet, leaving out those the db generates (e.g., full_code)."""
+    return {column.key: getattr(model, column.key) for column in model.__table__.columns if column.computed is None}
+
+
+def course_rows(courses: Iterable[CourseDBModel]) -> TableRows:
+    """Flatten courses and their offerings, secats and secat questions into rows, parents first.
+
+    The ids are generated here rather than by the db, so each child row can point at
+    its parent without a round trip.
+    """
+    rows: TableRows = {COURSE_TABLE: [], OFFERING_TABLE: [], SECAT_TABLE: [], QUESTION_TABLE: []}
+    for course in courses:
+        course_id = uuid4()
+        rows[COURSE_TABLE].append(model_row(course) | {"course_id": course_id})
+
+        for offering in course.offerings:
+            rows[OFFERING_TABLE].append(model_row(offering) | {"offering_id": uuid4(), "course_id": course_id})
+
+        if course.secat is None:
+            continue
+        secat_id = uuid4()
+        rows[SECAT_TABLE].append(model_row(course.secat) | {"secat_id": secat_id, "course_id": course_id})
+        rows[QUESTION_TABLE].extend(
+            model_row(question) | {"question_id": uuid4(), "secat_id": secat_id} for question in course.secat.questions
+        )
+    return rows
+
+
+def degree_row(details: dict, title: str, degree_url: str | None, content_hash: str | None = None) -> Row:
+    """A degree's row from its flat degree, as a dict."""
+    return {
+        "degree_id": uuid4(),
+        "degree_code": str(details["code"]),
+        "year": int(details["year"]),
+        "title": title,
+        "degree_url": degree_url,
+        "details": details,
+        "content_hash": content_hash,
+    }
+
+
+async def insert_rows(session: AsyncSession, rows: TableRows, chunk_size: int = BULK_INSERT_CHUNK_SIZE) -> None:
+    """Insert rows table by table, in order, as batched executemany inserts."""
+    for table, table_rows in rows.items():
+        for chunk in batched(table_rows, chunk_size, strict=False):
+            await session.execute(insert(table), list(chunk))
+        log.info(f"Inserted {len(table_rows)} rows into {table.name}")
+
+
+def drop_unchanged(rows: TableRows, skip: AbstractSet[str | None]) -> TableRows:
+    """Drop the courses or degrees whose content hash is in skip, along with the children of dropped courses."""
+    if COURSE_TABLE not in rows:
+        return {
+            table: [row for row in table_rows if row["content_hash"] not in skip] for table, table_rows in rows.items()
+        }
+
+    courses = [course for course in rows[COURSE_TABLE] if course["content_hash"] not in skip]
+    course_ids = {course["course_id"] for course in courses}
+    secats = [secat for secat in rows[SECAT_TABLE] if secat["course_id"] in course_ids]
+    secat_ids = {secat["secat_id"] for secat in secats}
+    return {
+        COURSE_TABLE: courses,
+        OFFERING_TABLE: [offering for offering in rows[OFFERING_TABLE] if offering["course_id"] in course_ids],
+        SECAT_TABLE: secats,
+        QUESTION_TABLE: [question for question in rows[QUESTION_TABLE] if question["secat_id"] in secat_ids],
+    }
+
+
+def unique_rows(rows: Iterable[Row], keys: Sequence[str]) -> list[Row]:
+    """Drop all but the last of the rows with the same keys, an upsert can't touch a row twice."""
+    return list({tuple(row[key] for key in keys): row for row in rows}.values())
+
+
+async def upsert_rows(
+    session: AsyncSession, table: Table, rows: list[Row], keys: Sequence[str], chunk_size: int = BULK_INSERT_CHUNK_SIZE
+) -> dict[tuple, UUID]:
+    """Insert rows, updating those already there with the same keys, in batched executemany upserts.
+
+    Existing rows keep their primary key, so anything referencing them stays valid.
+
+    Returns:
+        dict[tuple, UUID]: The primary key of each row in the db, by the row's keys.
+    """
+    (primary_key,) = table.primary_key.columns
+    ids: dict[tuple, UUID] = {}
+    for chunk in batched(rows, chunk_size, strict=False):
+        stmt = pg_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={
+                column.key: stmt.excluded[column.key]
+                for column in table.columns
+                if column.computed is None and column is not primary_key and column.key not in keys
+            },
+        )
+        # updated rows return the id they already had rather than the one sent, so the rows
+        # are matched back up by their keys rather than by the order they were sent in
+        result = await session.execute(stmt.returning(*(table.c[key] for key in keys), primary_key), list(chunk))
+        for *key, row_id in result:
+            ids[tuple(key)] = row_id
+    log.info(f"Upserted {len(rows)} rows into {table.name}")
+    return ids
+
+
+async def upsert_courses(session: AsyncSession, rows: TableRows, chunk_size: int = BULK_INSERT_CHUNK_SIZE) -> None:
+    """Upsert courses by (category, code), replacing the offerings, secats and secat questions of those updated."""
+    courses = unique_rows(rows[COURSE_TABLE], COURSE_KEYS)
+    ids = await upsert_rows(session, COURSE_TABLE, courses, COURSE_KEYS, chunk_size)
+    # updated courses kept their old id, so their children have to point at that instead
+    course_ids = {course["course_id"]: ids[course["category"], course["code"]] for course in courses}
+
+    for chunk in batched(course_ids.values(), chunk_size, strict=False):
+        secat_ids = select(SECAT_TABLE.c.secat_id).where(SECAT_TABLE.c.course_id.in_(chunk))
+        await session.execute(delete(QUESTION_TABLE).where(QUESTION_TABLE.c.secat_id.in_(secat_ids)))
+        await session.execute(delete(SECAT_TABLE).where(SECAT_TABLE.c.course_id.in_(chunk)))
+        await session.execute(delete(OFFERING_TABLE).where(OFFERING_TABLE.c.course_id.in_(chunk)))
+
+    secats = [
+        row | {"course_id": course_ids[row["course_id"]]} for row in rows[SECAT_TABLE] if row["course_id"] in course_ids
+    ]
+    secat_ids = {secat["secat_id"] for secat in secats}
+    await insert_rows(
+        session,
+        {
+            OFFERING_TABLE: [
+                row | {"course_id": course_ids[row["course_id"]]}
+                for row in rows[OFFERING_TABLE]
+                if row["course_id"] in course_ids
+            ],
+            SECAT_TABLE: secats,
+            QUESTION_TABLE: [row for row in rows[QUESTION_TABLE] if row["secat_id"] in secat_ids],
+        },
+        chunk_size,
+    )
@@ -0,0 +1,188 @@
+"""The seed data files, and reading them into rows to insert."""
+
+import hashlib
+import logging
+import multiprocessing
+from collections.abc import Generator
+from collections.abc import Set as AbstractSet
+from concurrent.futures import ProcessPoolExecutor
+from itertools import batched
+from pathlib import Path
+
+import orjson
+from serde import to_dict
+from serde.json import from_dict
+
+from api.course.models import CourseDBModel
+from api.course.transformers import CURRENT_YEAR, transform_scraped_courses
+from api.database.bulk import DEGREE_TABLE, Row, TableRows, course_rows, degree_row
+from common.reqs_parsing import requirement_pool
+from degree.converter import convert_degree
+from scraper.courses.models import ScrapedCourse
+from scraper.degree import Degree as ParsedDegree
+
+log = logging.getLogger(__name__)
+
+DATA_DIR = Path("data")
+COURSES_FILE = DATA_DIR / "complete_courses.json"
+DEGREES_FILE = DATA_DIR / "program_details.json"
+PLANS_FILE = DATA_DIR / "plans.json"
+DEGREES_META_FILE = DATA_DIR / "program_meta.json"
+
+# where the records are in each file when it's a single JSON document
+COURSES_KEY = "courses"
+DEGREES_KEY = "program_details"
+
+# bump whenever what a record transforms/converts into changes (e.g., parse_requirement, convert_degree),
+# so every record's hash changes and they're all synced again
+TRANSFORM_VERSION = 2
+
+SEED_CHUNK_SIZE = 2000  # records transformed and inserted at a time
+DEGREE_CONVERT_CHUNK_SIZE = 16  # degree records sent to a conversion process at a time
+
+
+def iter_records(path: Path, key: str | None = None) -> Generator[dict]:
+    """Yield the records of a data file one at a time.
+
+    If there's a JSON lines version of the file next to it (e.g., complete_courses.jsonl,
+    written by scripts.data_to_jsonl) it's streamed a line at a time, unless it's older than
+    the JSON file and so might be out of date. Otherwise the whole JSON file has to be loaded,
+    and the records are taken from under key, if given.
+    """
+    jsonl_path = path.with_suffix(".jsonl")
+    if jsonl_path.exists() and path.exists() and jsonl_path.stat().st_mtime < path.stat().st_mtime:
+        log.warning(f"{jsonl_path} is older than {path}, ignoring it")
+    elif jsonl_path.exists():
+        with Path.open(jsonl_path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield orjson.loads(line)
+        return
+
+    log.info(f"No up to date {jsonl_path}, loading all of {path}")
+    with Path.open(path, "rb") as f:
+        data = orjson.loads(f.read())
+    yield from data[key] if key is not None else data
+
+
+def record_hash(record: dict, salt: bytes = b"") -> str:
+    """Hash of a data file record's content and the version of the code transforming it.
+
+    The same however the record's keys are ordered.
+    """
+    version = f"{TRANSFORM_VERSION}:".encode()
+    return hashlib.sha256(version + salt + orjson.dumps(record, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def convert_degree_record(data: dict) -> dict | None:
+    """Parse and flatten one year of a program or plan, None if it isn't a degree.
+
+    Pure CPU work on plain dicts, so it can run in another process.
+    """
+    degree: ParsedDegree = from_dict(ParsedDegree | None, data)
+    if degree is None:
+        return None
+    return to_dict(convert_degree(degree, data))
+
+
+def load_courses_from_file(
+    skip: AbstractSet[str | None] = frozenset(), max_workers: int | None = None
+) -> Generator[list[CourseDBModel]]:
+    """Loads courses from a JSON file and hydrates CourseDBModel instances, a chunk at a time.
+
+    The chunks share one requirement parsing pool, so processes are started at most once.
+
+    Args:
+        skip (AbstractSet[str | None]): Hashes of records that are already in the db.
+        max_workers (int | None): Most requirement parsing processes, defaults to one per CPU.
+    """
+    # whether a course is active depends on the current year, so they're all synced again each year
+    year_salt = f"{CURRENT_YEAR}:".encode()
+    with requirement_pool(max_workers) as pool:
+        for chunk in batched(iter_records(COURSES_FILE, COURSES_KEY), SEED_CHUNK_SIZE, strict=False):
+            changed = [
+                (course, content_hash)
+                for course in chunk
+                if (content_hash := record_hash(course, year_salt)) not in skip
+            ]
+            if not changed:
+                continue
+
+            courses = transform_scraped_courses([ScrapedCourse(**course) for course, _ in changed], pool)
+            for course, (_, content_hash) in zip(courses, changed, strict=True):
+                course.content_hash = content_hash
+            yield courses
+
+
+def load_degrees_from_file(
+    skip: AbstractSet[str | None] = frozenset(), max_workers: int | None = None
+) -> Generator[list[Row]]:
+    """Loads degrees from JSON files as degree rows, a chunk at a time.
+
+    Each year of each program and plan is converted independently, so the conversion
+    is spread over a process pool, a chunk of records at a time to keep memory bounded.
+    This blocks while each chunk converts, so seeding pulls the chunks from a thread.
+
+    Args:
+        skip (AbstractSet[str | None]): Hashes of records that are already in the db.
+        max_workers (int | None): Most conversion processes, defaults to one per CPU.
+    """
+    degree_meta_map: dict[str, tuple[str, str]] = {}  # mapping degree_id to (name, degree_url)
+    with Path.open(DEGREES_META_FILE, "rb") as f:
+        raw_meta = f.read()
+        for meta in orjson.loads(raw_meta):
+            degree_meta_map[meta["program_id"]] = (meta["title"], meta["url"])
+    # programs take their titles from the meta file, so they change with it
+    meta_salt = hashlib.sha256(raw_meta).digest()
+
+    programs = (
+        (data, content_hash)
+        for detail in iter_records(DEGREES_FILE, DEGREES_KEY)
+        for data in detail["data"].values()
+        if (content_hash := record_hash(data, meta_salt)) not in skip
+    )
+    plans = (
+        (data, content_hash)
+        for plan in iter_records(PLANS_FILE)
+        for data in plan["data"].values()
+        if (content_hash := record_hash(data)) not in skip
+    )
+
+    # spawned rather than forked, as the seeding process has an event loop and db connections open
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for chunk in batched(programs, SEED_CHUNK_SIZE, strict=False):
+            rows = []
+            converted = pool.map(
+                convert_degree_record, [data for data, _ in chunk], chunksize=DEGREE_CONVERT_CHUNK_SIZE
+            )
+            for details, (_, content_hash) in zip(converted, chunk, strict=True):
+                if details is None or details["code"] not in degree_meta_map:
+                    # thanks UQ :)
+                    continue
+                degree_title, degree_url = degree_meta_map[details["code"]]
+                rows.append(degree_row(details, degree_title, degree_url, content_hash))
+            yield rows
+
+        for chunk in batched(plans, SEED_CHUNK_SIZE, strict=False):
+            converted = pool.map(
+                convert_degree_record, [data for data, _ in chunk], chunksize=DEGREE_CONVERT_CHUNK_SIZE
+            )
+            yield [
+                degree_row(details, str(details["code"]), None, content_hash)
+                for details, (_, content_hash) in zip(converted, chunk, strict=True)
+                if details is not None
+            ]
+
+
+def data_file_blocks(skip: AbstractSet[str | None] = frozenset()) -> Generator[TableRows]:
+    """Rows from all the data files, a chunk of courses (with their children) or degrees at a time.
+
+    Transforming each chunk is CPU bound, so async callers should pull the chunks from a thread.
+
+    Args:
+        skip (AbstractSet[str | None]): Hashes of records that are already in the db.
+    """
+    for courses in load_courses_from_file(skip):
+        yield course_rows(courses)
+    for degrees in load_degrees_from_file(skip):
+        yield {DEGREE_TABLE: degrees}
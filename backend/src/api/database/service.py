@@ -3,7 +3,7 @@
 import logging
 from collections.abc import AsyncGenerator
 
-from sqlalchemy import Connection, inspect
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -17,6 +17,16 @@ from api.database.seed import seed_db
 
 log = logging.getLogger(__name__)
 
+# create_all only creates missing tables, so columns added since a table was created are added here.
+SCHEMA_UPGRADES = [
+    "ALTER TABLE course ADD COLUMN IF NOT EXISTS full_code VARCHAR GENERATED ALWAYS AS (category || code) STORED",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_course_full_code ON course (full_code)",
+    "ALTER TABLE plan ADD COLUMN IF NOT EXISTS validation_hash VARCHAR",
+    "ALTER TABLE plan ADD COLUMN IF NOT EXISTS validation_results JSON",
+    "ALTER TABLE course ADD COLUMN IF NOT EXISTS content_hash VARCHAR",
+    "ALTER TABLE degree ADD COLUMN IF NOT EXISTS content_hash VARCHAR",
+]
+
 db_engine: AsyncEngine = create_async_engine(
     CONFIG.db_url,
     pool_pre_ping=True,
@@ -48,28 +58,19 @@ async def get_db() -> AsyncGenerator[AsyncSession]:
 
 
 async def setup_database(engine: AsyncEngine) -> None:
-    """Initialise database."""
+    """Initialise database, then sync the courses and degrees with the data files."""
     # Importing as now sqlalchemy will know about them when creating the schema
     from api.course.models import CourseDBModel, CourseOfferingDBModel, CourseSecatDBModel, CourseSecatQuestionsDBModel
     from api.database.base import BaseDBModel
     from api.degree.models import DegreeDBModel
 
-    course_table_exists: bool = True
-    degree_table_exists: bool = True
-
     async with engine.begin() as conn:
-
-        def check_tables(sync_conn: Connection) -> tuple[bool, bool]:
-            inspector = inspect(sync_conn)
-            course_exists = inspector.has_table(CourseDBModel.__tablename__)
-            degree_exists = inspector.has_table(DegreeDBModel.__tablename__)
-            return course_exists, degree_exists
-
-        course_table_exists, degree_table_exists = await conn.run_sync(check_tables)
-
         await conn.run_sync(BaseDBModel.metadata.create_all)
 
+        for statement in SCHEMA_UPGRADES:
+            await conn.execute(text(statement))
+
     log.info("Initialising database was successful.")
 
     async for session in get_db():
-        await seed_db(session, not course_table_exists, not degree_table_exists)
+        await seed_db(session)
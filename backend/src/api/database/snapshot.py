@@ -0,0 +1,241 @@
+"""A versioned binary snapshot of the transformed seed rows, so startup can skip parsing and converting the data files.
+
+Layout, integers little endian:
+
+    magic (8 bytes) | version (u32) | index length (u32) | index (JSON) | row offsets (u64s) | rows (JSON)
+
+The index has the columns of each table, digests of the data files it was built from,
+the version of the code that transformed them (see records.TRANSFORM_VERSION) and the
+year they were transformed in, and for each block of rows (those upserted together,
+e.g., a chunk of courses and their children) where each table's offsets start and how
+many rows it has. Row i of a table in a block spans
+rows[offsets[start + i] : offsets[start + i + 1]]. The file is memory mapped, so rows
+are only read as their blocks are decoded.
+"""
+
+import hashlib
+import logging
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Callable, Generator, Iterable
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+from uuid import UUID
+
+import orjson
+from sqlalchemy import Enum, Table, Uuid
+
+from api.course.transformers import CURRENT_YEAR
+from api.database.bulk import COURSE_TABLE, DEGREE_TABLE, OFFERING_TABLE, QUESTION_TABLE, SECAT_TABLE, TableRows
+from api.database.records import (
+    COURSES_FILE,
+    DATA_DIR,
+    DEGREES_FILE,
+    DEGREES_META_FILE,
+    PLANS_FILE,
+    TRANSFORM_VERSION,
+)
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = DATA_DIR / "seed.snapshot"
+SNAPSHOT_MAGIC = b"UQRMSNAP"
+SNAPSHOT_VERSION = 1  # bump whenever the layout changes
+
+SOURCE_FILES = (COURSES_FILE, DEGREES_FILE, PLANS_FILE, DEGREES_META_FILE)
+TABLES = {str(table.name): table for table in (COURSE_TABLE, OFFERING_TABLE, SECAT_TABLE, QUESTION_TABLE, DEGREE_TABLE)}
+
+_HEADER = struct.Struct("<8sII")
+_OFFSET_SIZE = 8
+
+
+class SnapshotError(Exception):
+    """The snapshot can't be used, e.g., it's from another version or older data files."""
+
+
+def _columns(table: Table) -> list[str]:
+    return [column.key for column in table.columns if column.computed is None]
+
+
+def _decoders(table: Table) -> dict[str, Callable[[Any], Any]]:
+    """What turns each JSON value back into what the column expects, for the columns that need it."""
+    decoders: dict[str, Callable[[Any], Any]] = {}
+    for column in table.columns:
+        if isinstance(column.type, Uuid):
+            decoders[column.key] = UUID
+        elif isinstance(column.type, Enum) and column.type.enum_class is not None:
+            decoders[column.key] = column.type.enum_class
+    return decoders
+
+
+def _file_digest(path: Path) -> str:
+    with Path.open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _source_digests() -> dict[str, str]:
+    return {str(path): _file_digest(path) for path in SOURCE_FILES if path.exists()}
+
+
+def write_snapshot(path: Path, blocks: Iterable[TableRows]) -> int:
+    """Write blocks of rows to a snapshot, replacing any already at path.
+
+    Returns:
+        int: The number of rows written.
+    """
+    offsets = array("Q")
+    index_blocks: list[dict[str, tuple[int, int]]] = []
+    position = 0
+
+    with tempfile.TemporaryFile() as rows_file:
+        for block in blocks:
+            entry = {}
+            for table, rows in block.items():
+                entry[str(table.name)] = (len(offsets), len(rows))
+                offsets.append(position)
+                for row in rows:
+                    data = orjson.dumps(row)
+                    rows_file.write(data)
+                    position += len(data)
+                    offsets.append(position)
+            index_blocks.append(entry)
+
+        index = orjson.dumps(
+            {
+                "tables": {name: _columns(table) for name, table in TABLES.items()},
+                "sources": _source_digests(),
+                "transform_version": TRANSFORM_VERSION,
+                "year": CURRENT_YEAR,
+                "offsets": len(offsets),
+                "blocks": index_blocks,
+            }
+        )
+        if sys.byteorder != "little":
+            offsets.byteswap()
+
+        partial = path.with_suffix(".partial")
+        with Path.open(partial, "wb") as f:
+            f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(index)))
+            f.write(index)
+            f.write(offsets.tobytes())
+            rows_file.seek(0)
+            shutil.copyfileobj(rows_file, f)
+        partial.replace(path)
+
+    return len(offsets) - len([table for block in index_blocks for table in block])
+
+
+def _read_index(snapshot: mmap.mmap, path: Path) -> tuple[dict, int]:
+    """The snapshot's index and its length, if the snapshot can be used."""
+    try:
+        magic, version, index_length = _HEADER.unpack_from(snapshot)
+        index = orjson.loads(snapshot[_HEADER.size : _HEADER.size + index_length])
+        columns, sources = index["tables"], index["sources"]
+        transformed = (index["transform_version"], index["year"])
+    except (struct.error, orjson.JSONDecodeError, KeyError, TypeError) as e:
+        msg = f"{path} isn't a readable snapshot"
+        raise SnapshotError(msg) from e
+
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        msg = f"{path} isn't a version {SNAPSHOT_VERSION} snapshot"
+        raise SnapshotError(msg)
+    if transformed != (TRANSFORM_VERSION, CURRENT_YEAR):
+        msg = f"{path} was transformed by other code or in another year"
+        raise SnapshotError(msg)
+    if columns != {name: _columns(table) for name, table in TABLES.items()}:
+        msg = f"{path} was built for different columns"
+        raise SnapshotError(msg)
+    stale = [source for source, digest in _source_digests().items() if sources.get(source) != digest]
+    if stale:
+        msg = f"{path} is older than {', '.join(stale)}"
+        raise SnapshotError(msg)
+    return index, index_length
+
+
+class Snapshot:
+    """A memory mapped snapshot, read a block at a time."""
+
+    def __init__(self, path: Path) -> None:
+        """Map the snapshot and check it can be used.
+
+        Raises:
+            SnapshotError: If it's from another version, for other columns, or older data files.
+        """
+        if sys.byteorder != "little":
+            msg = "Snapshots can only be read on little endian machines"
+            raise SnapshotError(msg)
+
+        with Path.open(path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # it's empty
+                msg = f"{path} isn't a readable snapshot"
+                raise SnapshotError(msg) from e
+        try:
+            index, index_length = _read_index(self._mmap, path)
+        except SnapshotError:
+            self._mmap.close()
+            raise
+
+        self._blocks: list[dict[str, list[int]]] = index["blocks"]
+        offsets_start = _HEADER.size + index_length
+        self._rows_start = offsets_start + index["offsets"] * _OFFSET_SIZE
+        self._offsets = memoryview(self._mmap)[offsets_start : self._rows_start].cast("Q")
+        self._decoders = {name: _decoders(table) for name, table in TABLES.items()}
+
+    def __len__(self) -> int:
+        """The number of blocks."""
+        return len(self._blocks)
+
+    def block(self, i: int) -> TableRows:
+        """Decode the rows of a block."""
+        rows: TableRows = {}
+        for name, (start, count) in self._blocks[i].items():
+            decoders = self._decoders[name]
+            table_rows = []
+            for j in range(start, start + count):
+                row = orjson.loads(
+                    self._mmap[self._rows_start + self._offsets[j] : self._rows_start + self._offsets[j + 1]]
+                )
+                for key, decode in decoders.items():
+                    if row.get(key) is not None:
+                        row[key] = decode(row[key])
+                table_rows.append(row)
+            rows[TABLES[name]] = table_rows
+        return rows
+
+    def blocks(self) -> Generator[TableRows]:
+        """Decode the blocks in order."""
+        for i in range(len(self)):
+            yield self.block(i)
+
+    def close(self) -> None:
+        """Unmap the snapshot."""
+        self._offsets.release()
+        self._mmap.close()
+
+    def __enter__(self) -> Self:
+        """Use the snapshot until the block ends."""
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        """Unmap the snapshot."""
+        self.close()
+
+
+def open_snapshot(path: Path = SNAPSHOT_FILE) -> Snapshot | None:
+    """The snapshot at path, None if there isn't one that can be used."""
+    if not path.exists():
+        return None
+    try:
+        return Snapshot(path)
+    except SnapshotError as e:
+        log.warning(f"Not seeding from snapshot: {e}")
+        return None
@@ -0,0 +1,157 @@
+"""Reverse lookup of the degrees a set of courses comes closest to satisfying."""
+
+import heapq
+import logging
+from collections.abc import Iterable, Mapping
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.degree.models import DegreeDBModel
+
+log = logging.getLogger(__name__)
+
+# the selection rules that pick from a list of courses, the rest pick programs
+COURSE_SR_TYPES = frozenset({"SR1", "SR2", "SR3", "SR4", "SR5"})
+
+
+class DegreeEntry(NamedTuple):
+    """A degree row as stored in the index."""
+
+    degree_id: UUID
+    degree_code: str
+    year: int
+    title: str
+
+
+class RuleEntry(NamedTuple):
+    """A course selection rule as stored in the index."""
+
+    degree: int  # index into the degrees
+    part: str
+    required: float  # units needed to meet the rule
+
+
+class DegreeMatch(NamedTuple):
+    """How close a set of courses comes to meeting a degree's selection rules."""
+
+    degree: DegreeEntry
+    percentage: float  # of the units required by the rules that the courses cover
+    rules_met: int
+    rules_total: int
+
+
+class DegreeLookupIndex:
+    """Inverted index from course code to the degree selection rules it counts towards.
+
+    Only the courses given are looked up, so ranking every degree is proportional
+    to how many rules those courses appear in rather than to the number of degrees.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty index, see `build`."""
+        self._degrees: list[DegreeEntry] = []
+        self._rules: list[RuleEntry] = []
+        self._required: list[float] = []  # degree -> units required across all of its rules
+        self._num_rules: list[int] = []  # degree -> number of rules
+        self._postings: dict[str, list[int]] = {}  # course code -> rules it's an option of
+
+    def __len__(self) -> int:
+        """Number of degrees in the index."""
+        return len(self._degrees)
+
+    def build(self, degrees: Iterable[tuple[DegreeEntry, dict]]) -> None:
+        """Replace the contents of the index.
+
+        Args:
+            degrees (Iterable[tuple[DegreeEntry, dict]]): Each degree and its `details` column.
+        """
+        entries: list[DegreeEntry] = []
+        rules: list[RuleEntry] = []
+        required: list[float] = []
+        num_rules: list[int] = []
+        postings: dict[str, list[int]] = {}
+
+        for entry, details in degrees:
+            degree = len(entries)
+            entries.append(entry)
+            total, count = 0.0, 0
+
+            # read the raw rule dicts, deserialising thousands of whole degrees isn't needed
+            for sr in details.get("srs", []):
+                n = sr.get("n")
+                if sr.get("type") not in COURSE_SR_TYPES or not isinstance(n, int | float) or n <= 0:
+                    continue
+
+                rule = len(rules)
+                rules.append(RuleEntry(degree, sr.get("part", ""), n))
+                for code in dict.fromkeys(option["code"] for option in sr.get("options", [])):
+                    postings.setdefault(code, []).append(rule)
+                total += n
+                count += 1
+
+            required.append(total)
+            num_rules.append(count)
+
+        # swap everything in at once so lookups never see a half built index
+        self._degrees, self._rules, self._postings = entries, rules, postings
+        self._required, self._num_rules = required, num_rules
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        """Rebuild the index from the degrees in the db."""
+        result = await session.execute(
+            select(
+                DegreeDBModel.degree_id,
+                DegreeDBModel.degree_code,
+                DegreeDBModel.year,
+                DegreeDBModel.title,
+                DegreeDBModel.details,
+            )
+        )
+        self.build((DegreeEntry(row.degree_id, row.degree_code, row.year, row.title), row.details) for row in result)
+        log.info(f"Built degree lookup index over {len(self)} degrees and {len(self._rules)} rules")
+
+    def rank(self, course_units: Mapping[str, float], limit: int) -> list[DegreeMatch]:
+        """Rank the degrees by how much of their selection rules the courses cover.
+
+        Args:
+            course_units (Mapping[str, float]): Units of each completed course.
+            limit (int): Maximum number of degrees.
+
+        Returns:
+            list[DegreeMatch]: The closest degrees, best first. Degrees none of the courses
+                count towards are left out.
+        """
+        # accumulate units only for the rules the courses actually appear in
+        rule_units: dict[int, float] = {}
+        for code, units in course_units.items():
+            for rule in self._postings.get(code, ()):
+                rule_units[rule] = rule_units.get(rule, 0) + units
+
+        covered: dict[int, float] = {}
+        met: dict[int, int] = {}
+        for rule, units in rule_units.items():
+            entry = self._rules[rule]
+            covered[entry.degree] = covered.get(entry.degree, 0) + min(units, entry.required)
+            if units >= entry.required:
+                met[entry.degree] = met.get(entry.degree, 0) + 1
+
+        best = heapq.nsmallest(
+            limit,
+            covered.items(),
+            key=lambda item: (-item[1] / self._required[item[0]], self._degrees[item[0]].degree_code),
+        )
+        return [
+            DegreeMatch(
+                self._degrees[degree],
+                round(units / self._required[degree] * 100, 2),
+                met.get(degree, 0),
+                self._num_rules[degree],
+            )
+            for degree, units in best
+        ]
+
+
+degree_lookup_index = DegreeLookupIndex()
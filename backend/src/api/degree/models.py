@@ -22,3 +22,6 @@ class DegreeDBModel(BaseDBModel):
     title: Mapped[str]
     degree_url: Mapped[str | None]
     details: Mapped[dict] = mapped_column(JSON)
+
+    # hash of the data file record it was seeded from, to tell when it needs updating
+    content_hash: Mapped[str | None]
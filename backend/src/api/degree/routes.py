@@ -4,10 +4,13 @@ from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, status
 
+from api.course.service import get_courses_by_full_codes
 from api.database.deps import DbSession
+from api.degree.lookup import degree_lookup_index
 from api.degree.models import DegreeDBModel
-from api.degree.schemas import DegreeRead, DegreeSummary
+from api.degree.schemas import DegreeMatchQuery, DegreeMatchRead, DegreeRead, DegreeSummary
 from api.degree.service import get_all_degrees, get_degree, get_degree_by_id, get_degrees_summary
+from api.plan.plan import DEFAULT_COURSE_UNITS
 
 r = router = APIRouter()
 
@@ -24,6 +27,27 @@ async def get_summary(session: DbSession) -> list[DegreeSummary]:
     return await get_degrees_summary(session)
 
 
+@r.post("/match")
+async def match_degrees(query: DegreeMatchQuery, session: DbSession) -> list[DegreeMatchRead]:
+    """Rank the degrees by how much of their course requirements the completed courses meet."""
+    courses = await get_courses_by_full_codes(session, query.courses)
+    course_units = {
+        code: courses[code].num_units if code in courses else DEFAULT_COURSE_UNITS for code in query.courses
+    }
+
+    return [
+        DegreeMatchRead(
+            degree=DegreeRead(
+                degree_id=m.degree.degree_id, degree_code=m.degree.degree_code, year=m.degree.year, title=m.degree.title
+            ),
+            percentage=m.percentage,
+            rules_met=m.rules_met,
+            rules_total=m.rules_total,
+        )
+        for m in degree_lookup_index.rank(course_units, query.limit)
+    ]
+
+
 @r.get("/simple", response_model=DegreeRead)
 async def get_one_simple(degree_code: str, year: int, session: DbSession) -> DegreeDBModel:
     """Get a single degree."""
@@ -2,6 +2,8 @@
 
 from uuid import UUID
 
+from pydantic import Field
+
 from common.schemas import UQRoadmapBase
 
 
@@ -22,3 +24,22 @@ class DegreeSummary(UQRoadmapBase):
     title: str
     degree_code: str
     years: list[int]
+
+
+MAX_MATCH_RESULTS = 100
+
+
+class DegreeMatchQuery(UQRoadmapBase):
+    """Completed courses to find the closest degrees for."""
+
+    courses: list[str] = Field(min_length=1)
+    limit: int = Field(default=20, ge=1, le=MAX_MATCH_RESULTS)
+
+
+class DegreeMatchRead(UQRoadmapBase):
+    """How close a set of courses comes to meeting a degree's selection rules."""
+
+    degree: DegreeRead
+    percentage: float
+    rules_met: int
+    rules_total: int
@@ -1,5 +1,6 @@
 """Degree services."""
 
+from collections.abc import Iterable
 from uuid import UUID
 
 from sqlalchemy import func, select
@@ -27,6 +28,15 @@ async def get_degree_by_id(session: AsyncSession, degree_id: UUID) -> DegreeDBMo
     return await session.get(DegreeDBModel, degree_id)
 
 
+async def get_degrees_by_ids(session: AsyncSession, degree_ids: Iterable[UUID]) -> dict[UUID, DegreeDBModel]:
+    """Get many degrees by their IDs in a single query."""
+    ids = set(degree_ids)
+    if not ids:
+        return {}
+    result = await session.execute(select(DegreeDBModel).where(DegreeDBModel.degree_id.in_(ids)))
+    return {degree.degree_id: degree for degree in result.scalars()}
+
+
 async def get_degrees_summary(session: AsyncSession) -> list[DegreeSummary]:
     """Get summary."""
     stmt = (
@@ -8,11 +8,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 
 from api.config import CONFIG
+from api.course.prereqs import prerequisite_graph
 from api.course.routes import router as courses_router
-from api.database.service import db_engine, setup_database
+from api.course.search import course_search_index
+from api.database.service import db_engine, session_factory, setup_database
+from api.degree.lookup import degree_lookup_index
 from api.degree.routes import router as degree_router
 from api.plan.routes import router as plan_router
+from api.plan.service import schedule_pool, validation_pool
 from common.logging import configure_logging
+from degree.interner import course_interner
 
 
 @asynccontextmanager
@@ -20,7 +25,15 @@ async def lifespan(_: FastAPI) -> AsyncGenerator:
     """Lifespan event handler."""
     configure_logging(CONFIG.log_level)
     await setup_database(db_engine)
+
+    async with session_factory() as session:
+        await course_interner.load(session)
+        await course_search_index.rebuild(session)
+        await prerequisite_graph.rebuild(session)
+        await degree_lookup_index.rebuild(session)
     yield
+    validation_pool.shutdown()
+    schedule_pool.shutdown()
 
 
 app = FastAPI(lifespan=lifespan, root_path=CONFIG.root_path)
@@ -0,0 +1,6 @@
+"""Shared pagination constants."""
+
+MAX_PAGE_SIZE = 1000
+
+# paged listings return the cursor to pass as `after` for the next page in this header
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
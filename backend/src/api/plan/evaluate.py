@@ -0,0 +1,131 @@
+"""Evaluating plans against their degrees in worker processes, so plans are validated in parallel.
+
+Rule evaluation is CPU bound pure Python, so threads would only take turns holding the GIL.
+Everything sent to a worker is plain data: the degree's id and details (compiled once per
+worker, see degree.cache) and what's needed to build the plan. Plans are built in the
+worker, as their course bitsets only mean something in the process that interned the codes.
+
+Scheduling plans is CPU bound in the same way, so it runs on a pool of these workers too.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple
+from uuid import UUID
+
+from api.plan.plan import Plan
+from degree.cache import degree_cache
+from degree.compiled import CompiledDegree
+from degree.interner import course_interner
+from degree.validate_result import ValidateResult
+
+log = logging.getLogger(__name__)
+
+
+class PlanInputs(NamedTuple):
+    """What a plan is built from, as plain data that can be sent to a worker process."""
+
+    name: str
+    course_dates: dict[tuple[int, int], list[str]]
+    course_reqs: dict[str, list[str]]
+    courses: list[str]
+    degree: str
+    specialisations: dict[str, list[str]]
+    course_units: dict[str, float]
+
+    def build(self) -> Plan:
+        """Build the plan the rules are run against."""
+        return Plan(
+            self.name,
+            self.course_dates,
+            self.course_reqs,
+            self.courses,
+            self.degree,
+            self.specialisations,
+            course_units=self.course_units,
+        )
+
+
+class DegreeLoadError(Exception):
+    """A degree's details couldn't be compiled."""
+
+
+def _compiled(degree_id: UUID, details: dict, content_hash: str | None) -> CompiledDegree:
+    try:
+        return degree_cache.get(degree_id, details, content_hash)
+    except Exception as e:
+        raise DegreeLoadError(f"Unable to compile degree {degree_id}") from e
+
+
+def evaluate_plan(
+    inputs: PlanInputs, degree_id: UUID, details: dict, content_hash: str | None = None
+) -> list[ValidateResult]:
+    """Run every rule of the degree against the plan.
+
+    The degree's content hash is passed along when the caller already has it, so the
+    worker doesn't have to hash the details again to find its compiled degree.
+    """
+    return _compiled(degree_id, details, content_hash).degree.validate(inputs.build())
+
+
+def reevaluate_plan(  # noqa: PLR0913, PLR0917
+    inputs: PlanInputs,
+    degree_id: UUID,
+    details: dict,
+    content_hash: str | None,
+    previous: list[ValidateResult],
+    changed: set[str],
+    specs_changed: bool,  # noqa: FBT001
+) -> list[ValidateResult]:
+    """Re-run only the rules of the degree affected by an edit to the plan."""
+    return _compiled(degree_id, details, content_hash).revalidate(inputs.build(), previous, changed, specs_changed)
+
+
+def _init_worker(codes: Iterable[str]) -> None:
+    """Intern the catalogue in the new worker, so plans' courses get bits rather than overflowing."""
+    course_interner.intern_all(codes)
+
+
+class ValidationPool:
+    """Worker processes plans are evaluated (or scheduled) on, started the first time they're needed.
+
+    By then the catalogue is interned, so each worker can be given the same codes. Workers are
+    spawned rather than forked, so they don't inherit the app's event loop or db connections.
+    """
+
+    def __init__(self, workers: int, name: str = "validation") -> None:
+        """Set the number of worker processes, none are started yet."""
+        self._workers = workers
+        self._name = name
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(list(course_interner),),
+            )
+        return self._executor
+
+    async def run[T](self, fn: Callable[..., T], *args: object) -> T:
+        """Run a function on a worker, without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        except BrokenProcessPool:
+            # a worker died (e.g., killed for memory), start new ones next time
+            log.exception(f"The {self._name} worker pool broke, restarting it")
+            self.shutdown()
+            raise
+
+    def shutdown(self) -> None:
+        """Stop the workers, new ones are started if the pool is used again."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
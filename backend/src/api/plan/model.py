@@ -34,6 +34,10 @@ class PlanDBModel(BaseDBModel):
     # maps (part) -> degree code (e.g., "2525")
     specialisations: Mapped[dict[str, list[str]]] = mapped_column(JSON)
 
+    # last validation results, and the hash of the plan/degree inputs they were computed from
+    validation_hash: Mapped[str | None] = mapped_column(default=None)
+    validation_results: Mapped[list[dict] | None] = mapped_column(JSON, default=None)
+
     @hybrid_property
     def courses(self) -> list[str]:
         """Get full list of course codes (.e.g, "CSSE2310")."""
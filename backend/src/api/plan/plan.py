@@ -1,5 +1,113 @@
 """A Complete User Plan."""
 
+from collections.abc import Mapping
+from collections.abc import Set as AbstractSet
+
+from degree.interner import course_interner
+
+DEFAULT_COURSE_UNITS = 2  # used for any course we don't know the units of
+
+
+class PlanIndex:
+    """Lookups over the courses in a plan, computed once when the plan is built."""
+
+    codes: frozenset[str]
+    units: dict[str, float]
+    # level (e.g., 2 for CSSE2310) -> units / courses at that level
+    level_units: dict[int, float]
+    level_courses: dict[int, list[str]]
+    # discipline descriptor (e.g., CSSE) -> units / courses in that discipline
+    discipline_units: dict[str, float]
+    discipline_courses: dict[str, list[str]]
+    # courses whose level couldn't be read from the code
+    invalid_level: list[str]
+    # bitset of the courses (see degree.interner), and of the courses with each number of units
+    mask: int
+    unit_masks: dict[float, int]
+    # courses that aren't in the catalogue so have no bit, kept out of the interner so
+    # made up codes can't grow it
+    overflow: frozenset[str]
+
+    def __init__(self, courses: list[str], course_units: Mapping[str, float] | None = None) -> None:
+        """Index the given course codes.
+
+        Args:
+            courses (list[str]): Course codes in the plan, e.g., "CSSE2310".
+            course_units (Mapping[str, float] | None): Known units of each course.
+        """
+        unique = list(dict.fromkeys(courses))
+        course_units = course_units or {}
+
+        self.codes = frozenset(unique)
+        self.units = {code: course_units.get(code, DEFAULT_COURSE_UNITS) for code in unique}
+        self.level_units = {}
+        self.level_courses = {}
+        self.discipline_units = {}
+        self.discipline_courses = {}
+        self.invalid_level = []
+        self.mask = 0
+        self.unit_masks = {}
+        overflow = []
+
+        for code in unique:
+            units = self.units[code]
+
+            course_id = course_interner.lookup(code)
+            if course_id is None:
+                overflow.append(code)
+            else:
+                bit = 1 << course_id
+                self.mask |= bit
+                self.unit_masks[units] = self.unit_masks.get(units, 0) | bit
+
+            discipline = code[:4]
+            self.discipline_units[discipline] = self.discipline_units.get(discipline, 0) + units
+            self.discipline_courses.setdefault(discipline, []).append(code)
+
+            try:
+                level = int(code[4])
+            except (IndexError, ValueError):
+                self.invalid_level.append(code)
+                continue
+            self.level_units[level] = self.level_units.get(level, 0) + units
+            self.level_courses.setdefault(level, []).append(code)
+
+        self.overflow = frozenset(overflow)
+
+    def has(self, code: str) -> bool:
+        """Whether the course is in the plan."""
+        return code in self.codes
+
+    def units_of(self, code: str) -> float:
+        """Units of a course in the plan."""
+        return self.units.get(code, DEFAULT_COURSE_UNITS)
+
+    def units_in(self, mask: int, unknown: AbstractSet[str] = frozenset()) -> float:
+        """Total units of the plan's courses in the bitset, or in the codes that aren't interned."""
+        units = sum(units * (unit_mask & mask).bit_count() for units, unit_mask in self.unit_masks.items())
+        return units + sum(self.units[code] for code in unknown & self.codes)
+
+    def missing(self, mask: int) -> int:
+        """Bitset of the courses in the bitset that aren't in the plan."""
+        return mask & ~self.mask
+
+    def has_all(self, mask: int, unknown: AbstractSet[str] = frozenset()) -> bool:
+        """Whether every course in the bitset, and every code that isn't interned, is in the plan."""
+        return not self.missing(mask) and unknown <= self.codes
+
+    def units_at_level(self, level: int, or_higher: bool = False) -> float:  # noqa: FBT001, FBT002
+        """Total units at the level (or higher)."""
+        return sum(units for lvl, units in self.level_units.items() if lvl == level or (or_higher and lvl > level))
+
+    def courses_at_level(self, level: int, or_higher: bool = False) -> list[str]:  # noqa: FBT001, FBT002
+        """Courses at the level (or higher)."""
+        return [
+            code
+            for lvl, codes in self.level_courses.items()
+            if lvl == level or (or_higher and lvl > level)
+            for code in codes
+        ]
+
 
 class Plan:
     name: str
@@ -9,8 +117,9 @@ class Plan:
     courses: list[str]
     degree: str
     specialisations: dict[str, list[str]]
+    index: PlanIndex
 
-    def __init__(
+    def __init__(  # noqa: PLR0913, PLR0917
         self,
         name: str,
         course_dates: dict[tuple[int, int], list[str]],
@@ -18,6 +127,8 @@ class Plan:
         courses: list[str],
         degree: str,
         specialisations: dict[str, list[str]],
+        *,
+        course_units: Mapping[str, float] | None = None,
     ):
         self.name = name
         self.course_dates = course_dates
@@ -25,3 +136,4 @@ class Plan:
         self.courses = courses
         self.degree = degree
         self.specialisations = specialisations
+        self.index = PlanIndex(courses, course_units)
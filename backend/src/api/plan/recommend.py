@@ -0,0 +1,86 @@
+"""Ranks courses that would help a plan meet its unmet selection rules."""
+
+import datetime as dt
+from collections.abc import Iterable, Mapping
+from typing import NamedTuple
+
+from sqlalchemy import Row
+
+from api.plan.scheduler import offered_semesters
+from api.plan.timeline import requirement_met
+
+# how much each signal counts towards a course's rank
+UNMET_RULE_WEIGHT = 2.0  # per unmet rule the course counts towards
+AVAILABLE_WEIGHT = 1.5
+PREREQS_MET_WEIGHT = 1.5
+SECAT_WEIGHT = 1.0
+
+# secat scores are averages of 1 to 5 answers, courses without one are treated as middling
+SECAT_MIN, SECAT_MAX = 1.0, 5.0
+SECAT_DEFAULT = 0.5
+
+
+class Recommendation(NamedTuple):
+    """A course suggested to fill unmet rules, and why."""
+
+    full_code: str
+    name: str | None
+    rank: float
+    secat_score: float | None
+    available: bool  # offered in a semester the plan still has left
+    prereqs_met: bool  # by the courses already in the plan
+    unmet_rules: int  # unmet rules it counts towards
+
+
+def current_semester(today: dt.date | None = None) -> tuple[int, int]:
+    """The (year, sem) it is now, semester 2 starts in July."""
+    today = today or dt.datetime.now(tz=dt.UTC).date()
+    return today.year, 1 if today.month < 7 else 2  # noqa: PLR2004
+
+
+def rank_courses(  # noqa: PLR0913, PLR0917
+    candidates: Iterable[str],
+    unmet_counts: Mapping[str, int],
+    courses: Mapping[str, Row],
+    prerequisites: Mapping[str, dict | None],
+    plan_courses: frozenset[str],
+    remaining_sems: frozenset[int],
+    limit: int,
+) -> list[Recommendation]:
+    """Rank candidate courses, best first.
+
+    Args:
+        candidates (Iterable[str]): Courses that could be added.
+        unmet_counts (Mapping[str, int]): How many unmet rules each candidate counts towards.
+        courses (Mapping[str, Row]): Course rows with `name`, `score` and `semesters_str`.
+        prerequisites (Mapping[str, dict | None]): Each candidate's stored prerequisite.
+        plan_courses (frozenset[str]): Courses already in the plan.
+        remaining_sems (frozenset[int]): Plan semesters (1 and/or 2) the plan still has left.
+        limit (int): Maximum number of courses.
+
+    Returns:
+        list[Recommendation]: The best candidates.
+    """
+    recommendations = []
+    for code in candidates:
+        row = courses.get(code)
+        score = row.score if row is not None else None
+        available = bool(offered_semesters(row.semesters_str if row is not None else None) & remaining_sems)
+        prereqs_met = requirement_met(prerequisites.get(code), plan_courses)
+        unmet = unmet_counts.get(code, 0)
+
+        secat = SECAT_DEFAULT if score is None else (score - SECAT_MIN) / (SECAT_MAX - SECAT_MIN)
+        rank = (
+            UNMET_RULE_WEIGHT * unmet
+            + AVAILABLE_WEIGHT * available
+            + PREREQS_MET_WEIGHT * prereqs_met
+            + SECAT_WEIGHT * secat
+        )
+        recommendations.append(
+            Recommendation(
+                code, row.name if row is not None else None, round(rank, 4), score, available, prereqs_met, unmet
+            )
+        )
+
+    recommendations.sort(key=lambda rec: (-rec.rank, rec.full_code))
+    return recommendations[:limit]
@@ -1,31 +1,58 @@
 """Plan routes."""
 
-import asyncio
 import logging
-from typing import TYPE_CHECKING
+from collections.abc import AsyncGenerator
+from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, status
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from serde import to_dict
 
 from api.database.deps import DbSession
+from api.database.service import session_factory
 from api.degree.schemas import DegreeRead
 from api.degree.service import get_degree_by_id
+from api.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
 from api.plan.model import PlanDBModel
-from api.plan.schemas import PlanCreateUpdate, PlanRead
-from api.plan.service import create_plan, get_plan, get_plans, update_plan, validate_plan
-
-if TYPE_CHECKING:
-    from degree.validate_result import ValidateResult
+from api.plan.schemas import (
+    MAX_RECOMMENDATIONS,
+    CourseRecommendation,
+    PlanBatchValidate,
+    PlanCreateUpdate,
+    PlanDelta,
+    PlanRead,
+    ScheduleRead,
+    ScheduleRequest,
+)
+from api.plan.service import (
+    create_plan,
+    get_completion,
+    get_plan,
+    get_plans,
+    get_stored_validation,
+    get_validation,
+    get_validations,
+    recommend_courses,
+    revalidate_plan,
+    schedule_plan,
+    update_plan,
+    validate_batch,
+    validate_plan,
+    validate_plan_delta,
+)
+from api.plan.timeline import validate_timeline
+from degree.validate_result import ValidateResult
 
 r = router = APIRouter()
 
 log = logging.getLogger(__name__)
 
 
-async def add_validation(session: DbSession, plan: PlanDBModel) -> PlanRead:
-    """Add validation to plan db."""
-    result = PlanRead(
+def _plan_read(plan: PlanDBModel, validation_results: list[ValidateResult] | None) -> PlanRead:
+    """Build the read schema of a plan and its validation results."""
+    return PlanRead(
         plan_id=plan.plan_id,
         degree=DegreeRead(
             degree_id=plan.degree.degree_id,
@@ -40,24 +67,74 @@ async def add_validation(session: DbSession, plan: PlanDBModel) -> PlanRead:
         course_reqs=plan.course_reqs,
         specialisations=plan.specialisations,
         courses=plan.courses,
-        validation_results=None,
+        validation_results=validation_results,
     )
 
+
+async def add_validation(session: DbSession, plan: PlanDBModel) -> PlanRead:
+    """Add validation to plan db."""
     validation_results: list[ValidateResult] | None = None
     try:
-        validation_results = await validate_plan(session, plan)
-        result.validation_results = validation_results
+        validation_results = await get_validation(session, plan)
     except Exception:
         log.exception(f"Unable to get validation results for plan {plan.plan_id}")
-    return result
+    return _plan_read(plan, validation_results)
+
+
+async def _revalidate(session: DbSession, plan: PlanDBModel) -> None:
+    """Validate a changed plan up front so reads can use the stored results."""
+    try:
+        await validate_plan(session, plan)
+    except Exception:
+        # the plan itself was still saved, it'll be validated again when read
+        log.exception(f"Unable to get validation results for plan {plan.plan_id}")
 
 
 @r.get("")
-async def get_all(db: DbSession) -> list[PlanRead]:
-    """Get all plans."""
-    plans = await get_plans(db)
-    result = [add_validation(db, plan) for plan in plans]
-    return await asyncio.gather(*result)
+async def get_all(  # noqa: PLR0913, PLR0917
+    db: DbSession,
+    response: Response,
+    degree_id: UUID | None = None,
+    degree_code: str | None = None,
+    after: UUID | None = None,
+    limit: Annotated[int | None, Query(ge=1, le=MAX_PAGE_SIZE)] = None,
+    validate: bool = True,  # noqa: FBT001, FBT002
+) -> list[PlanRead]:
+    """Get all plans.
+
+    Pass `limit` to page through the plans, the id to pass as `after` for the next page
+    is returned in the `X-Next-Cursor` header. Pass `validate=false` to skip validation
+    and only get the plans themselves.
+    """
+    plans = await get_plans(db, degree_id, degree_code, after, limit)
+    if limit and len(plans) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = str(plans[-1].plan_id)
+
+    if not validate:
+        return [_plan_read(plan, None) for plan in plans]
+
+    validation_results = await get_validations(db, plans)
+    return [_plan_read(plan, results) for plan, results in zip(plans, validation_results, strict=True)]
+
+
+@r.post("/validate/batch")
+async def validate_many(batch: PlanBatchValidate) -> StreamingResponse:
+    """Validate many saved plans (by id) and/or unsaved plans at once.
+
+    Results are streamed as newline delimited JSON as each plan finishes, so they may
+    not be in the order given. Each line has the `plan_id` of a saved plan or the
+    `index` of an unsaved one, along with either its `results` or an `error`.
+    """
+
+    async def lines() -> AsyncGenerator[bytes]:
+        # the session has to outlive this handler, so the stream gets its own
+        async with session_factory() as session:
+            async for item in validate_batch(session, batch.plan_ids, batch.plans):
+                yield orjson.dumps(item) + b"\n"
+            # keep the fresh results of any saved plans
+            await session.commit()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @r.get("/{plan_id}")
@@ -83,12 +160,15 @@ async def create(db: DbSession, plan_in: PlanCreateUpdate) -> PlanDBModel:
         )
 
     try:
-        return await create_plan(db, degree, plan_in)
+        plan = await create_plan(db, degree, plan_in)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="The provided start year is after the provided end year."
         ) from e
 
+    await _revalidate(db, plan)
+    return plan
+
 
 @r.put("/{plan_id}", response_model=PlanRead)
 async def update(db: DbSession, plan_in: PlanCreateUpdate, plan_id: UUID) -> PlanDBModel:
@@ -106,7 +186,17 @@ async def update(db: DbSession, plan_in: PlanCreateUpdate, plan_id: UUID) -> Pla
             detail=f"The degree with the id '{plan_in.degree_id}' can not be found",
         )
 
-    return update_plan(plan, degree, plan_in)
+    # keep what the plan looked like so only the rules the edit affects are run again
+    previous = get_stored_validation(plan)
+    old_courses, old_specialisations, old_degree_id = list(plan.courses), plan.specialisations, plan.degree.degree_id
+
+    plan = update_plan(plan, degree, plan_in)
+    try:
+        await revalidate_plan(db, plan, previous, old_courses, old_specialisations, old_degree_id)
+    except Exception:
+        # the plan itself was still saved, it'll be validated again when read
+        log.exception(f"Unable to get validation results for plan {plan.plan_id}")
+    return plan
 
 
 @r.put("/{plan_id}/validate")
@@ -120,3 +210,86 @@ async def validate(db: DbSession, plan_id: UUID) -> list[dict]:
 
     result = await validate_plan(db, plan_model)
     return [to_dict(r) for r in result]
+
+
+@r.post("/{plan_id}/validate/delta")
+async def validate_delta(db: DbSession, plan_id: UUID, delta: PlanDelta) -> list[dict]:
+    """Validate a plan as if courses were added/removed, without saving the change."""
+    plan_model = await get_plan(db, plan_id)
+    if plan_model is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Plan under id '{plan_id}' could not be found."
+        )
+
+    result = await validate_plan_delta(db, plan_model, delta.added, delta.removed)
+    return [to_dict(r) for r in result]
+
+
+@r.get("/{plan_id}/complete")
+async def complete(db: DbSession, plan_id: UUID) -> bool:
+    """Whether a plan completes its degree."""
+    plan_model = await get_plan(db, plan_id)
+    if plan_model is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Plan under id '{plan_id}' could not be found."
+        )
+
+    return await get_completion(db, plan_model)
+
+
+@r.get("/{plan_id}/timeline")
+async def timeline(db: DbSession, plan_id: UUID) -> list[dict]:
+    """Check a plan's courses have their prerequisites in earlier semesters and no incompatible courses."""
+    plan_model = await get_plan(db, plan_id)
+    if plan_model is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Plan under id '{plan_id}' could not be found."
+        )
+
+    return [to_dict(r) for r in validate_timeline(plan_model.course_dates)]
+
+
+@r.post("/{plan_id}/schedule")
+async def schedule(db: DbSession, plan_id: UUID, options: ScheduleRequest) -> ScheduleRead:
+    """Propose a semester for each of a plan's courses, without changing the plan.
+
+    Prerequisites come in earlier semesters, courses are only put in semesters they're
+    offered in, and no semester goes over `max_units`.
+    """
+    plan_model = await get_plan(db, plan_id)
+    if plan_model is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Plan under id '{plan_id}' could not be found."
+        )
+
+    result = await schedule_plan(db, plan_model, options.courses, options.max_units, options.time_budget)
+    return ScheduleRead(
+        course_dates={f"{year},{sem}": courses for (year, sem), courses in result.course_dates.items()},
+        unscheduled=result.unscheduled,
+        complete=result.complete,
+        warnings=result.warnings,
+    )
+
+
+@r.get("/{plan_id}/recommend")
+async def recommend(
+    db: DbSession,
+    plan_id: UUID,
+    rule: Annotated[int | None, Query(ge=0)] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_RECOMMENDATIONS)] = 20,
+) -> list[CourseRecommendation]:
+    """Suggest courses to fill a plan's unmet SR3/SR4 rules.
+
+    Pass `rule` (its index in the validation results) to only get courses for that rule.
+    Courses are ranked by how many unmet rules they count towards, whether they're offered
+    in a semester the plan has left, whether their prerequisites are in the plan, and their
+    SECaT score.
+    """
+    plan_model = await get_plan(db, plan_id)
+    if plan_model is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Plan under id '{plan_id}' could not be found."
+        )
+
+    recommendations = await recommend_courses(db, plan_model, rule, limit)
+    return [CourseRecommendation(**rec._asdict()) for rec in recommendations]
@@ -0,0 +1,262 @@
+"""Assigns a plan's courses to semesters, respecting prerequisites, offerings and unit caps."""
+
+import logging
+import time
+from collections.abc import Mapping
+from typing import NamedTuple
+
+from api.course.prereqs import requirement_codes
+from api.plan.timeline import requirement_met
+from common.enums import CourseSemester
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_UNITS = 8  # a full time load
+DEFAULT_TIME_BUDGET = 1.0  # seconds
+
+# the plan semesters the university semesters map to
+PLAN_SEMESTERS = {CourseSemester.SEM1: 1, CourseSemester.SEM2: 2}
+
+
+def offered_semesters(semesters_str: str | None) -> frozenset[int]:
+    """Plan semesters (1 and/or 2) a course is offered in, both if we don't know."""
+    offered = set()
+    for semester in (semesters_str or "").split(","):
+        try:
+            plan_sem = PLAN_SEMESTERS.get(CourseSemester(semester.strip()))
+        except ValueError:
+            continue
+        if plan_sem is not None:
+            offered.add(plan_sem)
+    return frozenset(offered) if offered else frozenset(PLAN_SEMESTERS.values())
+
+
+def plan_semesters(start_year: int, start_sem: int, end_year: int) -> list[tuple[int, int]]:
+    """Every (year, sem) of a plan, in order."""
+    return [
+        (year, sem)
+        for year in range(start_year, end_year + 1)
+        for sem in PLAN_SEMESTERS.values()
+        if (year, sem) >= (start_year, start_sem)
+    ]
+
+
+class ScheduleCourse(NamedTuple):
+    """What the scheduler needs to know about a course."""
+
+    units: float
+    semesters: frozenset[int]  # plan semesters it's offered in
+    prerequisite: dict | None  # stored requirement, see common.reqs_parsing
+
+
+class Schedule(NamedTuple):
+    """A proposed assignment of courses to semesters."""
+
+    course_dates: dict[tuple[int, int], list[str]]
+    unscheduled: list[str]
+    complete: bool  # every course was scheduled
+    warnings: list[str]
+
+
+class _Placing:
+    """How far the search is through the semesters for one course."""
+
+    __slots__ = ("completed", "next_slot", "ready")
+
+    def __init__(self, assumed: frozenset[str]) -> None:
+        """Start from the first semester."""
+        self.next_slot = 0
+        self.completed = set(assumed)  # courses done before next_slot
+        self.ready = False  # whether the prerequisites are met by next_slot
+
+
+class Scheduler:
+    """Depth first constraint search over (course, semester) assignments.
+
+    Courses are assigned prerequisites first, most constrained first, each to the
+    earliest semester its prerequisites allow. A branch is pruned as soon as the
+    remaining courses can't all still fit. If the time budget runs out, or no full
+    schedule exists, the largest partial schedule found is topped up with whatever
+    else still fits.
+    """
+
+    def __init__(
+        self,
+        courses: Mapping[str, ScheduleCourse],
+        slots: list[tuple[int, int]],
+        max_units: float = DEFAULT_MAX_UNITS,
+        time_budget: float = DEFAULT_TIME_BUDGET,
+    ) -> None:
+        """Set up a search over the courses and semesters."""
+        self.courses = courses
+        self.slots = slots
+        self.max_units = max_units
+        self.time_budget = time_budget
+        self.warnings: list[str] = []
+
+        in_plan = frozenset(courses)
+        # prerequisites outside the plan that are assumed to have been done some other way
+        self._assumed: dict[str, frozenset[str]] = {}
+        for code, course in courses.items():
+            if not requirement_met(course.prerequisite, in_plan):
+                outside = frozenset(requirement_codes(course.prerequisite)) - in_plan
+                self._assumed[code] = outside
+                self.warnings.append(
+                    f"{code}'s prerequisites can't be met by the plan alone, assuming {', '.join(sorted(outside))} done"
+                )
+
+        self._order = self._assignment_order()
+
+    def _assignment_order(self) -> list[str]:
+        """Prerequisites before the courses needing them, then the courses offered least often first."""
+        prereqs = {
+            code: [other for other in dict.fromkeys(requirement_codes(course.prerequisite)) if other in self.courses]
+            for code, course in self.courses.items()
+        }
+
+        # longest chain of prerequisites below each course, walked with a stack so long chains
+        # can't hit the recursion limit. A prerequisite already on the stack is a cycle, skipped.
+        depth: dict[str, int] = {}
+        for root in self.courses:
+            if root in depth:
+                continue
+            on_stack = {root}
+            stack = [(root, iter(prereqs[root]))]
+            while stack:
+                code, pending = stack[-1]
+                other = next((other for other in pending if other not in depth and other not in on_stack), None)
+                if other is not None:
+                    on_stack.add(other)
+                    stack.append((other, iter(prereqs[other])))
+                    continue
+                stack.pop()
+                on_stack.discard(code)
+                depth[code] = 1 + max((depth[other] for other in prereqs[code] if other in depth), default=-1)
+
+        return sorted(self.courses, key=lambda code: (depth[code], len(self.courses[code].semesters), code))
+
+    def _fits_somewhere(self, code: str, load: list[float]) -> bool:
+        course = self.courses[code]
+        return any(
+            sem in course.semesters and used + course.units <= self.max_units
+            for (_, sem), used in zip(self.slots, load, strict=True)
+        )
+
+    def _feasible(self, remaining: list[str], load: list[float]) -> bool:
+        """Cheap necessary conditions for the remaining courses to still fit."""
+        spare = sum(self.max_units - used for used in load)
+        if sum(self.courses[code].units for code in remaining) > spare:
+            return False
+        return all(self._fits_somewhere(code, load) for code in remaining)
+
+    def _fill(self, buckets: list[list[str]]) -> list[list[str]]:
+        """Greedily add whatever else fits to a partial schedule, skipping courses that don't."""
+        load = [sum(self.courses[code].units for code in bucket) for bucket in buckets]
+        scheduled = {code for bucket in buckets for code in bucket}
+
+        for code in self._order:
+            if code in scheduled:
+                continue
+            course = self.courses[code]
+            completed = set(self._assumed.get(code, ()))
+            for s, (_, sem) in enumerate(self.slots):
+                if s > 0:
+                    completed.update(buckets[s - 1])
+                if (
+                    sem in course.semesters
+                    and load[s] + course.units <= self.max_units
+                    and requirement_met(course.prerequisite, completed)
+                ):
+                    buckets[s].append(code)
+                    load[s] += course.units
+                    scheduled.add(code)
+                    break
+        return buckets
+
+    def _next_slot(self, code: str, placing: _Placing, buckets: list[list[str]], load: list[float]) -> int | None:
+        """The next semester the course can go in, None once there are none left to try."""
+        course = self.courses[code]
+        while placing.next_slot < len(self.slots):
+            s = placing.next_slot
+            placing.next_slot += 1
+            if s > 0:
+                placing.completed.update(buckets[s - 1])
+            # once the prerequisites are met they stay met in every later semester
+            placing.ready = placing.ready or requirement_met(course.prerequisite, placing.completed)
+            if placing.ready and self.slots[s][1] in course.semesters and load[s] + course.units <= self.max_units:
+                return s
+        return None
+
+    def _search(self, deadline: float) -> tuple[bool, list[list[str]]]:
+        """Place the courses in order, backtracking when one can't go anywhere.
+
+        Walked with explicit stacks rather than recursion, so long plans can't hit the
+        recursion limit.
+
+        Returns:
+            tuple[bool, list[list[str]]]: Whether every course was placed, and the courses
+                in each semester of the schedule, or of the largest partial one if not.
+        """
+        load = [0.0] * len(self.slots)
+        buckets: list[list[str]] = [[] for _ in self.slots]
+        best: list[list[str]] = [[] for _ in self.slots]
+        best_count = 0
+        placed: list[int] = []  # the semester of each course placed so far
+        placing: list[_Placing] = []  # the search's progress for each of those, and the next
+
+        while len(placed) < len(self._order):
+            if time.monotonic() > deadline:
+                log.info(f"Scheduling {len(self._order)} courses ran out of time")
+                return False, best
+
+            i = len(placed)
+            code = self._order[i]
+            if len(placing) == i:
+                placing.append(_Placing(self._assumed.get(code, frozenset())))
+
+            s = self._next_slot(code, placing[i], buckets, load)
+            if s is None:
+                # nowhere left to put this course, so move the one before it
+                placing.pop()
+                if not placed:
+                    return False, best
+                s = placed.pop()
+                buckets[s].pop()
+                load[s] -= self.courses[self._order[i - 1]].units
+                continue
+
+            buckets[s].append(code)
+            load[s] += self.courses[code].units
+            if not self._feasible(self._order[i + 1 :], load):
+                buckets[s].pop()
+                load[s] -= self.courses[code].units
+                continue
+
+            placed.append(s)
+            if len(placed) > best_count:
+                best, best_count = [list(bucket) for bucket in buckets], len(placed)
+        return True, buckets
+
+    def solve(self) -> Schedule:
+        """Search for a schedule, within the time budget."""
+        complete, assignment = self._search(time.monotonic() + self.time_budget)
+        if not complete:
+            assignment = self._fill(assignment)
+
+        scheduled = {code for bucket in assignment for code in bucket}
+        return Schedule(
+            course_dates={slot: bucket for slot, bucket in zip(self.slots, assignment, strict=True) if bucket},
+            unscheduled=[code for code in self._order if code not in scheduled],
+            complete=complete,
+            warnings=self.warnings,
+        )
+
+
+def schedule(
+    courses: Mapping[str, ScheduleCourse],
+    slots: list[tuple[int, int]],
+    max_units: float = DEFAULT_MAX_UNITS,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+) -> Schedule:
+    """Search for a schedule of the courses, plain data in and out so it can run in a worker process."""
+    return Scheduler(courses, slots, max_units, time_budget).solve()
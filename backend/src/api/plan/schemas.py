@@ -3,7 +3,10 @@
 from typing import Literal
 from uuid import UUID
 
+from pydantic import Field
+
 from api.degree.schemas import DegreeRead
+from api.plan.scheduler import DEFAULT_MAX_UNITS, DEFAULT_TIME_BUDGET
 from common.schemas import UQRoadmapBase
 from degree.validate_result import ValidateResult
 
@@ -51,3 +54,57 @@ class PlanCreateUpdate(UQRoadmapBase):
 
     # maps (part) -> degree code (e.g., "2525")
     specialisations: dict[str, list[str]]
+
+
+class PlanDelta(UQRoadmapBase):
+    """Courses added to and removed from a plan."""
+
+    added: list[str] = Field(default_factory=list)
+    removed: list[str] = Field(default_factory=list)
+
+
+MAX_BATCH_PLANS = 1000  # plans that can be validated in one batch request
+
+
+class PlanBatchValidate(UQRoadmapBase):
+    """Plans to validate in one go, either saved plans by id or unsaved plans."""
+
+    plan_ids: list[UUID] = Field(default_factory=list, max_length=MAX_BATCH_PLANS)
+    plans: list[PlanCreateUpdate] = Field(default_factory=list, max_length=MAX_BATCH_PLANS)
+
+
+MAX_SCHEDULE_TIME_BUDGET = 10.0  # seconds
+MAX_SCHEDULE_COURSES = 200  # a long double degree is well under this
+
+
+class ScheduleRequest(UQRoadmapBase):
+    """Options for scheduling a plan's courses."""
+
+    courses: list[str] | None = Field(default=None, max_length=MAX_SCHEDULE_COURSES)  # defaults to the plan's courses
+    max_units: float = Field(default=DEFAULT_MAX_UNITS, gt=0)
+    time_budget: float = Field(default=DEFAULT_TIME_BUDGET, gt=0, le=MAX_SCHEDULE_TIME_BUDGET)
+
+
+class ScheduleRead(UQRoadmapBase):
+    """A proposed schedule for a plan's courses."""
+
+    # maps "year,sem" -> course codes, like the frontend's course_dates
+    course_dates: dict[str, list[str]]
+    unscheduled: list[str]
+    complete: bool
+    warnings: list[str]
+
+
+MAX_RECOMMENDATIONS = 100
+
+
+class CourseRecommendation(UQRoadmapBase):
+    """A course suggested to fill a plan's unmet rules, and why."""
+
+    full_code: str
+    name: str | None
+    rank: float
+    secat_score: float | None
+    available: bool  # offered in a semester the plan still has left
+    prereqs_met: bool  # by the courses already in the plan
+    unmet_rules: int  # unmet rules it counts towards
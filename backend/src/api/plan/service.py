@@ -1,28 +1,73 @@
 """Plans service."""
 
-from collections.abc import Awaitable, Callable
+import asyncio
+import hashlib
+import logging
+from collections.abc import AsyncGenerator, Mapping
+from typing import Any
 from uuid import UUID
 
-from serde.json import from_dict
-from sqlalchemy import select
+import orjson
+from serde import from_dict, to_dict
+from sqlalchemy import Row, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.course.models import CourseDBModel
-from api.course.service import get_course_by_full_code
+from api.config import CONFIG
+from api.course.prereqs import prerequisite_graph
+from api.course.service import get_courses_by_full_codes
 from api.degree.models import DegreeDBModel
-from api.degree.service import get_degree
+from api.degree.service import get_degrees_by_ids
+from api.plan.evaluate import DegreeLoadError, PlanInputs, ValidationPool, evaluate_plan, reevaluate_plan
 from api.plan.model import PlanDBModel
-from api.plan.plan import Plan
+from api.plan.plan import DEFAULT_COURSE_UNITS
+from api.plan.recommend import Recommendation, current_semester, rank_courses
+from api.plan.scheduler import Schedule, ScheduleCourse, offered_semesters, plan_semesters, schedule
 from api.plan.schemas import PlanCreateUpdate
-from degree.aux_rule import create_ar_from_dict
-from degree.degree import Degree
-from degree.sr_rule import create_sr_from_dict
-from degree.validate_result import ValidateResult
+from degree.cache import degree_cache
+from degree.compiled import CompiledDegree, hash_degree_details
+from degree.sr_rule import SR3, SR4, CourseSR
+from degree.validate_result import Status, ValidateResult
 
+log = logging.getLogger(__name__)
 
-async def get_plans(session: AsyncSession) -> list[PlanDBModel]:
-    """Get plan with id."""
-    result = await session.execute(select(PlanDBModel))
+# hash_degree_details of each degree seen so far in a call, by degree id, so plans
+# sharing a degree don't each serialise its whole details again
+type DegreeHashes = dict[UUID, str]
+
+# rule evaluation is CPU bound, so it runs in these worker processes rather than on the event loop
+validation_pool = ValidationPool(CONFIG.validation_workers)
+# scheduling can search for seconds at a time, so it gets its own workers rather than holding up validation
+schedule_pool = ValidationPool(CONFIG.schedule_workers, "schedule")
+
+
+async def get_plans(
+    session: AsyncSession,
+    degree_id: UUID | None = None,
+    degree_code: str | None = None,
+    after: UUID | None = None,
+    limit: int | None = None,
+) -> list[PlanDBModel]:
+    """Get plans, with their degrees, ordered by id.
+
+    Args:
+        session (AsyncSession): Database session.
+        degree_id (UUID | None): Only get plans for this degree.
+        degree_code (str | None): Only get plans for any year of this degree code.
+        after (UUID | None): Only get plans with an id after this one.
+        limit (int | None): Maximum number of plans to get.
+
+    Returns:
+        list[PlanDBModel]: The plans.
+    """
+    query = select(PlanDBModel)
+    if degree_id is not None:
+        query = query.where(PlanDBModel.degree_id == degree_id)
+    if degree_code is not None:
+        query = query.where(PlanDBModel.degree.has(DegreeDBModel.degree_code == degree_code))
+    if after is not None:
+        query = query.where(PlanDBModel.plan_id > after)
+
+    result = await session.execute(query.order_by(PlanDBModel.plan_id).limit(limit))
     return list(result.scalars().unique().all())
 
 
@@ -31,6 +76,14 @@ async def get_plan(session: AsyncSession, plan_id: UUID) -> PlanDBModel | None:
     return await session.get(PlanDBModel, plan_id)
 
 
+async def get_plans_by_ids(session: AsyncSession, plan_ids: list[UUID]) -> dict[UUID, PlanDBModel]:
+    """Get many plans, with their degrees, in a single query."""
+    if not plan_ids:
+        return {}
+    result = await session.execute(select(PlanDBModel).where(PlanDBModel.plan_id.in_(plan_ids)))
+    return {plan.plan_id: plan for plan in result.scalars().unique()}
+
+
 async def create_plan(session: AsyncSession, degree: DegreeDBModel, plan_in: PlanCreateUpdate) -> PlanDBModel:
     """Create a plan."""
     if plan_in.start_year > plan_in.end_year:
@@ -68,50 +121,441 @@ def update_plan(plan: PlanDBModel, degree: DegreeDBModel, plan_in: PlanCreateUpd
     return plan
 
 
-def _get_degree_wrapper(
+def _build_plan(plan_model: PlanDBModel, courses: Mapping[str, Row], codes: list[str] | None = None) -> PlanInputs:
+    """Get what the plan the rules are run against is built from, optionally with a different set of courses."""
+    codes = plan_model.courses if codes is None else codes
+    return PlanInputs(
+        plan_model.name,
+        plan_model.course_dates,
+        plan_model.course_reqs,
+        codes,
+        plan_model.degree.degree_code,
+        plan_model.specialisations,
+        {code: courses[code].num_units for code in codes if code in courses},
+    )
+
+
+def _plan_from_schema(plan_in: PlanCreateUpdate, degree: DegreeDBModel, courses: Mapping[str, Row]) -> PlanInputs:
+    """Get what the plan the rules are run against is built from for an unsaved plan."""
+    codes = [code for course_list in plan_in.course_dates.values() for code in course_list]
+    return PlanInputs(
+        plan_in.name,
+        plan_in.course_dates,
+        plan_in.course_reqs,
+        codes,
+        degree.degree_code,
+        plan_in.specialisations,
+        {code: courses[code].num_units for code in codes if code in courses},
+    )
+
+
+def degree_hash(degree: DegreeDBModel, hashes: DegreeHashes | None = None) -> str:
+    """The degree's hash_degree_details, only hashed once per call sharing the same hashes."""
+    if hashes is None:
+        return hash_degree_details(degree.details)
+    content_hash = hashes.get(degree.degree_id)
+    if content_hash is None:
+        content_hash = hashes[degree.degree_id] = hash_degree_details(degree.details)
+    return content_hash
+
+
+async def _run_validation(
+    plan: PlanInputs, degree: DegreeDBModel, hashes: DegreeHashes | None = None
+) -> list[ValidateResult]:
+    """Evaluate the plan on the validation pool so the event loop stays free."""
+    return await validation_pool.run(evaluate_plan, plan, degree.degree_id, degree.details, degree_hash(degree, hashes))
+
+
+async def _run_revalidation(  # noqa: PLR0913
+    plan: PlanInputs,
+    degree: DegreeDBModel,
+    previous: list[ValidateResult],
+    changed: set[str],
+    specs_changed: bool,  # noqa: FBT001
+    *,
+    hashes: DegreeHashes | None = None,
+) -> list[ValidateResult]:
+    """Re-evaluate the plan on the validation pool so the event loop stays free."""
+    return await validation_pool.run(
+        reevaluate_plan,
+        plan,
+        degree.degree_id,
+        degree.details,
+        degree_hash(degree, hashes),
+        previous,
+        changed,
+        specs_changed,
+    )
+
+
+def validation_inputs_hash(plan_model: PlanDBModel, hashes: DegreeHashes | None = None) -> str:
+    """Hash everything a plan's validation results depend on.
+
+    That's the plan's courses and specialisations along with its degree's details.
+    """
+    inputs = [
+        {str(key): courses for key, courses in plan_model.course_dates.items()},
+        plan_model.specialisations,
+        degree_hash(plan_model.degree, hashes),
+    ]
+    return hashlib.blake2b(orjson.dumps(inputs, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
+def _store_validation(
+    plan_model: PlanDBModel, results: list[ValidateResult], hashes: DegreeHashes | None = None
+) -> None:
+    plan_model.validation_hash = validation_inputs_hash(plan_model, hashes)
+    plan_model.validation_results = [to_dict(result) for result in results]
+
+
+def get_stored_validation(plan_model: PlanDBModel, hashes: DegreeHashes | None = None) -> list[ValidateResult] | None:
+    """Get the stored validation results if they're still up to date."""
+    if plan_model.validation_results is None:
+        return None
+    if plan_model.validation_hash != validation_inputs_hash(plan_model, hashes):
+        return None
+    return [from_dict(ValidateResult, result) for result in plan_model.validation_results]
+
+
+async def validate_plan(
+    session: AsyncSession, plan_model: PlanDBModel, hashes: DegreeHashes | None = None
+) -> list[ValidateResult]:
+    """Validate plan, storing the results on it."""
+    # resolve every course up front so the rules never have to hit the db
+    courses = await get_courses_by_full_codes(session, plan_model.courses)
+    results = await _run_validation(_build_plan(plan_model, courses), plan_model.degree, hashes)
+    _store_validation(plan_model, results, hashes)
+    return results
+
+
+async def get_validation(
+    session: AsyncSession, plan_model: PlanDBModel, hashes: DegreeHashes | None = None
+) -> list[ValidateResult]:
+    """Get the plan's validation results, only validating again if the plan or its degree changed."""
+    stored = get_stored_validation(plan_model, hashes)
+    if stored is not None:
+        return stored
+    return await validate_plan(session, plan_model, hashes)
+
+
+async def _get_compiled(plan_model: PlanDBModel, hashes: DegreeHashes) -> CompiledDegree:
+    """The plan's compiled degree in this process, which may have to compile it too."""
+    degree = plan_model.degree
+    return await asyncio.to_thread(degree_cache.get, degree.degree_id, degree.details, degree_hash(degree, hashes))
+
+
+async def get_completion(session: AsyncSession, plan_model: PlanDBModel) -> bool:
+    """Whether the plan completes its degree, going by the degree's rule logic."""
+    hashes: DegreeHashes = {}
+    results = await get_validation(session, plan_model, hashes)
+    compiled = await _get_compiled(plan_model, hashes)
+    return compiled.completed_by(results)
+
+
+async def schedule_plan(
     session: AsyncSession,
-) -> Callable[[str, int], Awaitable[DegreeDBModel | None]]:
-    async def func(degree_code: str, year: int) -> DegreeDBModel | None:
-        return await get_degree(session, degree_code, year)
+    plan_model: PlanDBModel,
+    courses: list[str] | None,
+    max_units: float,
+    time_budget: float,
+) -> Schedule:
+    """Propose which semester of the plan to take each course in.
+
+    Args:
+        session (AsyncSession): Database session.
+        plan_model (PlanDBModel): The plan, whose start/end give the semesters available.
+        courses (list[str] | None): Courses to schedule, the plan's courses if None.
+        max_units (float): Most units to take in one semester.
+        time_budget (float): Seconds to search for before settling for a partial schedule.
+
+    Returns:
+        Schedule: The proposed schedule.
+    """
+    codes = list(dict.fromkeys(plan_model.courses if courses is None else courses))
+    rows = await get_courses_by_full_codes(session, codes)
+    schedule_courses = {
+        code: ScheduleCourse(
+            rows[code].num_units if code in rows else DEFAULT_COURSE_UNITS,
+            offered_semesters(rows[code].semesters_str if code in rows else None),
+            prerequisite_graph.prerequisite(code),
+        )
+        for code in codes
+    }
+
+    slots = plan_semesters(plan_model.start_year, plan_model.start_sem, plan_model.end_year)
+    return await schedule_pool.run(schedule, schedule_courses, slots, max_units, time_budget)
+
+
+async def recommend_courses(
+    session: AsyncSession, plan_model: PlanDBModel, rule: int | None, limit: int
+) -> list[Recommendation]:
+    """Suggest courses to fill the plan's unmet SR3/SR4 rules.
+
+    Args:
+        session (AsyncSession): Database session.
+        plan_model (PlanDBModel): The plan.
+        rule (int | None): Only suggest courses for this rule (its index in the validation results).
+        limit (int): Maximum number of courses.
 
-    return func
+    Returns:
+        list[Recommendation]: The best courses to add, best first.
+    """
+    hashes: DegreeHashes = {}
+    results = await get_validation(session, plan_model, hashes)
+    compiled = await _get_compiled(plan_model, hashes)
+    rules = [*compiled.degree.aux, *compiled.degree.srs]
 
+    unmet = {
+        i
+        for i, (sr, result) in enumerate(zip(rules, results, strict=False))
+        if isinstance(sr, CourseSR) and result.status == Status.ERROR
+    }
+    targets = [i for i in sorted(unmet) if isinstance(rules[i], SR3 | SR4) and rule in {None, i}]
 
-def _get_course_wrapper(
+    plan_courses = frozenset(plan_model.courses)
+    candidates = {
+        option.code
+        for i in targets
+        for option in rules[i].options  # type: ignore[attr-defined]
+        if option.code not in plan_courses
+    }
+    if not candidates:
+        return []
+
+    # count every unmet rule each candidate is an option of, not just the targeted ones
+    unmet_counts = {code: sum(i in unmet for i in compiled.option_rules.get(code, ())) for code in candidates}
+    courses = await get_courses_by_full_codes(session, candidates)
+    now = current_semester()
+    remaining_sems = frozenset(
+        sem
+        for year, sem in plan_semesters(plan_model.start_year, plan_model.start_sem, plan_model.end_year)
+        if (year, sem) >= now
+    )
+
+    return rank_courses(
+        candidates,
+        unmet_counts,
+        courses,
+        {code: prerequisite_graph.prerequisite(code) for code in candidates},
+        plan_courses,
+        remaining_sems,
+        limit,
+    )
+
+
+async def revalidate_plan(  # noqa: PLR0913, PLR0917
     session: AsyncSession,
-) -> Callable[[str], Awaitable[CourseDBModel | None]]:
-    async def func(course_code: str) -> CourseDBModel | None:
-        return await get_course_by_full_code(session, course_code)
+    plan_model: PlanDBModel,
+    previous: list[ValidateResult] | None,
+    old_courses: list[str],
+    old_specialisations: dict[str, list[str]],
+    old_degree_id: UUID,
+) -> list[ValidateResult]:
+    """Validate an edited plan, reusing the results of any rules the edit can't have affected.
 
-    return func
+    Args:
+        session (AsyncSession): Database session.
+        plan_model (PlanDBModel): The plan after the edit.
+        previous (list[ValidateResult] | None): Up to date results from before the edit, if there were any.
+        old_courses (list[str]): The plan's courses before the edit.
+        old_specialisations (dict[str, list[str]]): The plan's specialisations before the edit.
+        old_degree_id (UUID): The plan's degree before the edit.
 
+    Returns:
+        list[ValidateResult]: Results for the edited plan, which are also stored on it.
+    """
+    if previous is None or old_degree_id != plan_model.degree.degree_id:
+        return await validate_plan(session, plan_model)
 
-async def validate_plan(session: AsyncSession, plan_model: PlanDBModel) -> list[ValidateResult]:
-    """Validate plan."""
-    plan = Plan(
-        plan_model.name,
-        plan_model.course_dates,
-        plan_model.course_reqs,
-        plan_model.courses,
-        plan_model.degree.degree_code,
-        plan_model.specialisations,
+    hashes: DegreeHashes = {}
+    changed = set(old_courses) ^ set(plan_model.courses)
+    specs_changed = old_specialisations != plan_model.specialisations
+    courses = await get_courses_by_full_codes(session, plan_model.courses)
+    results = await _run_revalidation(
+        _build_plan(plan_model, courses), plan_model.degree, previous, changed, specs_changed, hashes=hashes
     )
+    _store_validation(plan_model, results, hashes)
+    return results
+
+
+async def validate_plan_delta(
+    session: AsyncSession, plan_model: PlanDBModel, added: list[str], removed: list[str]
+) -> list[ValidateResult]:
+    """Validate the plan as if courses were added/removed, without changing it.
+
+    Only the rules depending on the added/removed courses are run again, everything
+    else reuses the plan's stored results.
+
+    Args:
+        session (AsyncSession): Database session.
+        plan_model (PlanDBModel): The plan.
+        added (list[str]): Courses to add.
+        removed (list[str]): Courses to remove.
+
+    Returns:
+        list[ValidateResult]: Results for the plan with the courses added/removed.
+    """
+    hashes: DegreeHashes = {}
+    previous = await get_validation(session, plan_model, hashes)
+
+    removed_codes = set(removed)
+    codes = [code for code in plan_model.courses if code not in removed_codes]
+    codes.extend(code for code in dict.fromkeys(added) if code not in codes)
+
+    changed = set(codes) ^ set(plan_model.courses)
+    if not changed:
+        return previous
+
+    courses = await get_courses_by_full_codes(session, codes)
+    return await _run_revalidation(
+        _build_plan(plan_model, courses, codes),
+        plan_model.degree,
+        previous,
+        changed,
+        specs_changed=False,
+        hashes=hashes,
+    )
+
+
+async def validate_plans(
+    session: AsyncSession, plan_models: list[PlanDBModel], hashes: DegreeHashes | None = None
+) -> list[list[ValidateResult] | None]:
+    """Validate many plans at once.
+
+    Every course referenced by any of the plans is resolved in a single query, then the
+    plans are evaluated on the bounded validation pool.
+
+    Args:
+        session (AsyncSession): Database session, only used before any rules are run.
+        plan_models (list[PlanDBModel]): Plans to validate, with their degrees loaded.
+        hashes (DegreeHashes | None): Degree hashes already worked out, added to as degrees are hashed.
+
+    Returns:
+        list[list[ValidateResult] | None]: Results for each plan, or None if it couldn't be validated.
+    """
+    hashes = {} if hashes is None else hashes
+    courses = await get_courses_by_full_codes(session, {code for plan in plan_models for code in plan.courses})
+
+    results = await asyncio.gather(
+        *(_run_validation(_build_plan(plan, courses), plan.degree, hashes) for plan in plan_models),
+        return_exceptions=True,
+    )
+
+    validated: list[list[ValidateResult] | None] = []
+    for plan, result in zip(plan_models, results, strict=True):
+        if isinstance(result, BaseException):
+            log.error(f"Unable to get validation results for plan {plan.plan_id}", exc_info=result)
+            validated.append(None)
+        else:
+            _store_validation(plan, result, hashes)
+            validated.append(result)
+    return validated
+
+
+async def get_validations(session: AsyncSession, plan_models: list[PlanDBModel]) -> list[list[ValidateResult] | None]:
+    """Get the validation results of many plans, only validating the ones that changed.
+
+    Args:
+        session (AsyncSession): Database session.
+        plan_models (list[PlanDBModel]): Plans to get the results of, with their degrees loaded.
+
+    Returns:
+        list[list[ValidateResult] | None]: Results for each plan, or None if it couldn't be validated.
+    """
+    hashes: DegreeHashes = {}
+    results = [get_stored_validation(plan, hashes) for plan in plan_models]
+
+    stale = [i for i, result in enumerate(results) if result is None]
+    if stale:
+        fresh = await validate_plans(session, [plan_models[i] for i in stale], hashes)
+        for i, result in zip(stale, fresh, strict=True):
+            results[i] = result
+    return results
+
+
+async def clear_validations(session: AsyncSession) -> None:
+    """Forget every stored validation result, e.g., after the courses or degrees are reseeded."""
+    await session.execute(update(PlanDBModel).values(validation_hash=None, validation_results=None))
+
+
+async def _validate_batch_item(
+    key: dict[str, Any], degree: DegreeDBModel, plan: PlanInputs, plan_model: PlanDBModel | None, hashes: DegreeHashes
+) -> dict[str, Any]:
+    """Validate one plan of a batch, storing the results if it's a saved plan."""
+    try:
+        results = await _run_validation(plan, degree, hashes)
+    except DegreeLoadError:
+        log.exception(f"Unable to load the degree of batch plan {key}")
+        return {**key, "error": "The plan's degree could not be loaded."}
+    except Exception:
+        log.exception(f"Unable to get validation results for batch plan {key}")
+        return {**key, "error": "Unable to validate the plan."}
+
+    if plan_model is not None:
+        _store_validation(plan_model, results, hashes)
+    return {**key, "results": [to_dict(result) for result in results]}
+
+
+async def validate_batch(
+    session: AsyncSession, plan_ids: list[UUID], plans_in: list[PlanCreateUpdate]
+) -> AsyncGenerator[dict[str, Any]]:
+    """Validate many saved and/or unsaved plans, yielding each plan's results as soon as they're ready.
+
+    Each worker compiles every distinct degree at most once (see degree.cache), and all the
+    plans' courses are looked up in a single query. Saved plans with up to date stored
+    results aren't validated again, and fresh results are stored on the saved plans
+    (the caller commits them).
+
+    Args:
+        session (AsyncSession): Database session.
+        plan_ids (list[UUID]): Saved plans to validate.
+        plans_in (list[PlanCreateUpdate]): Unsaved plans to validate.
+
+    Yields:
+        dict[str, Any]: The `plan_id` of a saved plan or `index` of an unsaved one, along
+            with either its `results` or an `error`.
+    """
+    saved = await get_plans_by_ids(session, plan_ids)
+    degrees = await get_degrees_by_ids(session, {plan_in.degree_id for plan_in in plans_in})
+    for plan_model in saved.values():
+        degrees.setdefault(plan_model.degree_id, plan_model.degree)
+
+    codes = {code for plan in saved.values() for code in plan.courses}
+    codes.update(code for plan_in in plans_in for course_list in plan_in.course_dates.values() for code in course_list)
+    courses = await get_courses_by_full_codes(session, codes)
+
+    hashes: DegreeHashes = {}
+    pending = []
+    for plan_id in dict.fromkeys(plan_ids):
+        key: dict[str, Any] = {"plan_id": str(plan_id)}
+        plan_model = saved.get(plan_id)
+        if plan_model is None:
+            yield {**key, "error": f"Plan under id '{plan_id}' could not be found."}
+            continue
+
+        stored = get_stored_validation(plan_model, hashes)
+        if stored is not None:
+            yield {**key, "results": [to_dict(result) for result in stored]}
+            continue
+
+        plan = _build_plan(plan_model, courses)
+        pending.append(_validate_batch_item(key, plan_model.degree, plan, plan_model, hashes))
+
+    for index, plan_in in enumerate(plans_in):
+        key = {"index": index}
+        degree = degrees.get(plan_in.degree_id)
+        if degree is None:
+            yield {**key, "error": f"The degree with the id '{plan_in.degree_id}' can not be found"}
+            continue
+
+        plan = _plan_from_schema(plan_in, degree, courses)
+        pending.append(_validate_batch_item(key, degree, plan, None, hashes))
 
-    vals = plan_model.degree.details
-    pre_sem = vals["sem"]
-    sem: int
-    if isinstance(pre_sem, str):
-        sem = 0 if pre_sem == "" else int(pre_sem)
-    elif isinstance(pre_sem, int):
-        sem = pre_sem
-    else:
-        raise Exception("WHAT!!!!")
-
-    vals["sem"] = sem
-    degree: Degree = from_dict(Degree, vals)
-    if "aux" in vals:
-        degree.aux = [create_ar_from_dict(ar_data) for ar_data in vals["aux"]]
-    if "srs" in vals:
-        degree.srs = [create_sr_from_dict(sr_data) for sr_data in vals["srs"]]
-
-    return degree.validate(plan, _get_course_wrapper(session), _get_degree_wrapper(session))
+    tasks = [asyncio.ensure_future(item) for item in pending]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # the client may stop reading part way through
+        for task in tasks:
+            task.cancel()
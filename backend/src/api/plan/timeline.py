@@ -0,0 +1,112 @@
+"""Checks that a plan's semester order respects course prerequisites and incompatibilities."""
+
+import logging
+import re
+from collections.abc import Mapping
+from collections.abc import Set as AbstractSet
+
+from api.course.prereqs import COURSE_CODE_PATTERN, PrerequisiteGraph, prerequisite_graph, requirement_codes
+from common.enums import CourseRequirementKind
+from degree.validate_result import Status, ValidateResult
+
+log = logging.getLogger(__name__)
+
+SEMESTER_KEY_PATTERN = re.compile(r"\d+")
+
+
+def parse_semester_key(key: object) -> tuple[int, int] | None:
+    """Read a course_dates key, a (year, sem) tuple or the "2024,1" string it becomes as JSON."""
+    if isinstance(key, tuple | list) and len(key) == 2:  # noqa: PLR2004
+        try:
+            return int(key[0]), int(key[1])
+        except (TypeError, ValueError):
+            return None
+    if isinstance(key, str):
+        numbers = SEMESTER_KEY_PATTERN.findall(key)
+        if len(numbers) == 2:  # noqa: PLR2004
+            return int(numbers[0]), int(numbers[1])
+    return None
+
+
+def requirement_met(requirement: dict | None, completed: AbstractSet[str]) -> bool:
+    """Whether the courses completed meet a stored requirement (see common.reqs_parsing).
+
+    Anything that isn't a course code (e.g., unparsed text or "Part A") can't be
+    checked against the plan, so it's assumed to be met.
+    """
+    if requirement is None:
+        return True
+
+    kind, value = requirement.get("kind"), requirement.get("value")
+    if kind == CourseRequirementKind.ATOMIC:
+        code = str(value).strip().upper()
+        return code in completed or not COURSE_CODE_PATTERN.fullmatch(code)
+    if kind == CourseRequirementKind.AND:
+        return all(requirement_met(child, completed) for child in value)  # type: ignore[union-attr]
+    if kind == CourseRequirementKind.OR:
+        return any(requirement_met(child, completed) for child in value)  # type: ignore[union-attr]
+    return True
+
+
+def validate_timeline(
+    course_dates: Mapping[object, list[str]], graph: PrerequisiteGraph = prerequisite_graph
+) -> list[ValidateResult]:
+    """Check every course in the plan has its prerequisites in earlier semesters, and no incompatible courses.
+
+    The semesters are swept once in order, growing the set of courses completed
+    before each one, so each course's requirement is only evaluated once.
+
+    Args:
+        course_dates (Mapping[object, list[str]]): The plan's (year, sem) -> courses.
+        graph (PrerequisiteGraph): Where to get each course's requirements from.
+
+    Returns:
+        list[ValidateResult]: One error for each course with missing prerequisites or incompatible courses.
+    """
+    semesters: list[tuple[tuple[int, int], list[str]]] = []
+    for key, courses in course_dates.items():
+        semester = parse_semester_key(key)
+        if semester is None:
+            log.warning(f"Skipping unreadable plan semester {key!r}")
+            continue
+        semesters.append((semester, courses))
+    semesters.sort(key=lambda item: item[0])
+
+    in_plan = frozenset(code for _, courses in semesters for code in courses)
+    results: list[ValidateResult] = []
+    completed: frozenset[str] = frozenset()
+    clashed: set[frozenset[str]] = set()  # incompatible pairs already reported
+
+    for (year, sem), courses in semesters:
+        for code in courses:
+            prerequisite = graph.prerequisite(code)
+            if not requirement_met(prerequisite, completed):
+                missing = [other for other in dict.fromkeys(requirement_codes(prerequisite)) if other not in completed]
+                results.append(
+                    ValidateResult(
+                        Status.ERROR,
+                        None,
+                        f"{code} in {year} semester {sem} needs prerequisites from earlier semesters: "
+                        f"{', '.join(missing)}",
+                        [code, *missing],
+                    )
+                )
+
+            # both courses usually list each other, but each pair is only reported once
+            clashes = [
+                other
+                for other in dict.fromkeys(requirement_codes(graph.incompatible(code)))
+                if other in in_plan and frozenset((code, other)) not in clashed
+            ]
+            clashed.update(frozenset((code, other)) for other in clashes)
+            if clashes:
+                results.append(
+                    ValidateResult(
+                        Status.ERROR, None, f"{code} is incompatible with {', '.join(clashes)}", [code, *clashes]
+                    )
+                )
+
+        # courses in the same semester don't count towards each other's prerequisites
+        completed |= frozenset(courses)
+
+    return results
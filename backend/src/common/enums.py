@@ -77,3 +77,22 @@ class CourseMode(StrEnum):
     WEB_BASED = "Web Based"
     REMOTE = "Remote"
     FLEXIBLE = "Flexible Delivery"
+
+
+class CourseField(StrEnum):
+    """Course columns that can be projected when listing courses."""
+
+    COURSE_ID = "course_id"
+    CATEGORY = "category"
+    CODE = "code"
+    FULL_CODE = "full_code"
+    NAME = "name"
+    DESCRIPTION = "description"
+    LEVEL = "level"
+    NUM_UNITS = "num_units"
+    ACTIVE = "active"
+    SEMESTERS_STR = "semesters_str"
+    ATTENDANCE_MODE = "attendance_mode"
+    FACULTY = "faculty"
+    SCHOOL = "school"
+    SCORE = "score"
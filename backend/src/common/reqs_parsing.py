@@ -1,6 +1,11 @@
 """Course prereqs / degree requirements module."""
 
 import logging
+import multiprocessing
+from collections.abc import Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
 
 from lark import Lark, Token, Transformer
 from lark.exceptions import LarkError
@@ -10,6 +15,12 @@ from common.schemas import UQRoadmapBase
 
 log = logging.getLogger(__name__)
 
+# where the generated parse tables are kept between runs, gitignored
+CACHE_DIR = Path(__file__).parent.parent / "cache"
+PARSE_CACHE_SIZE = 8192  # distinct requirement strings kept parsed
+BULK_PARSE_CHUNK_SIZE = 256  # strings sent to a worker at a time
+BULK_PARSE_MIN_PARALLEL = 1024  # fewer unique strings than this aren't worth starting processes for
+
 GRAMMAR = """
     ?start: expr
 
@@ -38,7 +49,18 @@ GRAMMAR = """
     %ignore WS
 """
 
-parser = Lark(GRAMMAR)
+
+def load_parser(grammar: str, name: str) -> Lark:
+    """Build an LALR parser, reusing the parse tables cached by a previous run if the grammar is unchanged."""
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+    except OSError:
+        log.warning(f"Couldn't create the parser cache directory {CACHE_DIR}")
+        return Lark(grammar, parser="lalr")
+    return Lark(grammar, parser="lalr", cache=str(CACHE_DIR / f"{name}.lark"))
+
+
+parser = load_parser(GRAMMAR, "reqs_parser")
 
 
 class RequirementRead[T](UQRoadmapBase):
@@ -107,15 +129,68 @@ class RequirementTransformer(Transformer):
         return items[0]
 
 
-# Create the parser
-parser = Lark(GRAMMAR)
-
-
-def parse_requirement(text: str) -> RequirementRead:
-    """Parse a requirements string and turn it into something structured."""
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_normalised(text: str) -> RequirementRead:
     try:
         tree = parser.parse(text)
         return RequirementTransformer().transform(tree)
     except LarkError:
         log.warning(f"Couldn't parse requirements - {text}")
         return OtherRequirement(value=text)
+
+
+def parse_requirement(text: str) -> RequirementRead:
+    """Parse a requirements string and turn it into something structured.
+
+    Many courses share the same requirements, so results are memoised on the text with
+    its whitespace normalised. The same result may be returned for equal strings, so
+    don't modify it.
+    """
+    return _parse_normalised(" ".join(text.split()))
+
+
+def _parse_chunk(texts: list[str]) -> list[RequirementRead]:
+    return [_parse_normalised(text) for text in texts]
+
+
+def requirement_pool(max_workers: int | None = None) -> ProcessPoolExecutor:
+    """A process pool for parse_requirements_bulk, to share across many calls.
+
+    Spawned rather than forked, as it's started while seeding, from a thread of a process
+    with an event loop and db connections open. The processes only start once it's used.
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def parse_requirements_bulk(
+    texts: Iterable[str], max_workers: int | None = None, pool: Executor | None = None
+) -> list[RequirementRead]:
+    """Parse many requirement strings at once, e.g., the whole catalogue after a grammar change.
+
+    Each distinct (normalised) string is only parsed once, and if there are enough of
+    them they're split across a process pool.
+
+    Args:
+        texts (Iterable[str]): Requirement strings, duplicates are fine.
+        max_workers (int | None): Most processes to use, defaults to one per CPU.
+        pool (Executor | None): Pool to parse in (see requirement_pool), otherwise one is
+            started for just this call.
+
+    Returns:
+        list[RequirementRead]: The parsed requirements, in the same order as texts.
+    """
+    normalised = [" ".join(text.split()) for text in texts]
+    unique = list(dict.fromkeys(normalised))
+
+    if len(unique) < BULK_PARSE_MIN_PARALLEL or max_workers == 1:
+        parsed = _parse_chunk(unique)
+    else:
+        chunks = [unique[i : i + BULK_PARSE_CHUNK_SIZE] for i in range(0, len(unique), BULK_PARSE_CHUNK_SIZE)]
+        if pool is not None:
+            parsed = [requirement for chunk in pool.map(_parse_chunk, chunks) for requirement in chunk]
+        else:
+            with requirement_pool(max_workers) as own_pool:
+                parsed = [requirement for chunk in own_pool.map(_parse_chunk, chunks) for requirement in chunk]
+
+    by_text = dict(zip(unique, parsed, strict=True))
+    return [by_text[text] for text in normalised]
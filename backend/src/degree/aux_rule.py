@@ -8,6 +8,11 @@ from degree.params import CourseRef, ProgramRef
 from degree.validate_result import Status, ValidateResult
 
 
+def _codes_in_plan(course_list: list[CourseRef], plan: Plan) -> list[str]:
+    """Codes of the referenced courses that are in the plan."""
+    return [ref.code for ref in course_list if plan.index.has(ref.code)]
+
+
 @serde
 class AR:
     # Part, e.g. A or A.1
@@ -27,24 +32,18 @@ class AR1(AR):
     type: str = "AR1"
 
     def validate(self, plan: Plan) -> ValidateResult:
-        count = 0
-        exceptionCourse = ""
-        try:
-            for course in plan.courses:
-                exceptionCourse = course
-                course_level = int(course[4])
-                if course_level == self.level or (course_level > self.level and self.or_higher):
-                    count += 2  # change to units (ask lucas)
-            if count >= self.n:
-                return ValidateResult(Status.OK, 100, "", [])
-            return ValidateResult(
-                Status.ERROR,
-                count / self.n * 100,
-                f"Expected at least {self.n} units at level {self.level}{' or higher' if self.or_higher else ''}, found {count}.",
-                plan.courses,
-            )
-        except ValueError:
-            return ValidateResult(Status.ERROR, None, "Invalid course level format", [exceptionCourse])
+        if plan.index.invalid_level:
+            return ValidateResult(Status.ERROR, None, "Invalid course level format", plan.index.invalid_level[:1])
+        count = plan.index.units_at_level(self.level, self.or_higher)
+        if count >= self.n:
+            return ValidateResult(Status.OK, 100, "", [])
+        return ValidateResult(
+            Status.ERROR,
+            count / self.n * 100,
+            f"Expected at least {self.n} units at level {self.level}{' or higher' if self.or_higher else ''}, "
+            f"found {count:g}.",
+            plan.courses,
+        )
 
 
 @serde
@@ -56,26 +55,17 @@ class AR2(AR):
     type: str = "AR2"
 
     def validate(self, plan: Plan) -> ValidateResult:
-        count = 0
-        badcourses = []
-        exceptionCourse = ""
-        try:
-            for course in plan.courses:
-                exceptionCourse = course
-                course_level = int(course[4])
-                if course_level == self.level:
-                    count += 2  # change to units (ask lucas)
-                    badcourses.append(course)
-            if count < self.n:
-                return ValidateResult(Status.OK, 100, "", [])
-            return ValidateResult(
-                Status.ERROR,
-                count / self.n * 100,
-                f"Expected at most {self.n} units at level {self.level}, found {count}.",
-                badcourses,
-            )
-        except ValueError:
-            return ValidateResult(Status.ERROR, None, "Invalid course level format", [exceptionCourse])
+        if plan.index.invalid_level:
+            return ValidateResult(Status.ERROR, None, "Invalid course level format", plan.index.invalid_level[:1])
+        count = plan.index.units_at_level(self.level)
+        if count < self.n:
+            return ValidateResult(Status.OK, 100, "", [])
+        return ValidateResult(
+            Status.ERROR,
+            count / self.n * 100,
+            f"Expected at most {self.n} units at level {self.level}, found {count:g}.",
+            plan.index.courses_at_level(self.level),
+        )
 
 
 @serde
@@ -88,26 +78,17 @@ class AR3(AR):
     type: str = "AR3"
 
     def validate(self, plan: Plan) -> ValidateResult:
-        count = 0
-        badcourses = []
-        exceptionCourse = ""
-        try:
-            for course in plan.courses:
-                exceptionCourse = course
-                course_level = int(course[4])
-                if course_level == self.level or (course_level > self.level and self.or_higher):
-                    count += 2  # change to units (ask lucas)
-                    badcourses.append(course)
-            if count == self.n:
-                return ValidateResult(Status.OK, 100, "", [])
-            return ValidateResult(
-                Status.ERROR,
-                count / self.n * 100,
-                f"Expected at most {self.n} units at level {self.level}, found {count}.",
-                badcourses,
-            )
-        except ValueError:
-            return ValidateResult(Status.ERROR, None, "Invalid course level format", [exceptionCourse])
+        if plan.index.invalid_level:
+            return ValidateResult(Status.ERROR, None, "Invalid course level format", plan.index.invalid_level[:1])
+        count = plan.index.units_at_level(self.level, self.or_higher)
+        if count == self.n:
+            return ValidateResult(Status.OK, 100, "", [])
+        return ValidateResult(
+            Status.ERROR,
+            count / self.n * 100,
+            f"Expected at most {self.n} units at level {self.level}, found {count:g}.",
+            plan.index.courses_at_level(self.level, self.or_higher),
+        )
 
 
 @serde
@@ -121,33 +102,25 @@ class AR4(AR):
     type: str = "AR4"
 
     def validate(self, plan: Plan) -> ValidateResult:
-        count = 0
-        badcourses = []
-        exceptionCourse = ""
-        try:
-            for course in plan.courses:
-                exceptionCourse = course
-                course_level = int(course[4])
-                if course_level == self.level or (course_level > self.level and self.or_higher):
-                    count += 2  # change to units (ask lucas)
-                    badcourses.append(course)
-            if count >= self.n and count <= self.m:
-                return ValidateResult(Status.OK, 100, "", [])
-            if count < self.n:
-                return ValidateResult(
-                    Status.ERROR,
-                    count / self.n * 100,
-                    f"Expected at least {self.n} units at level {self.level}, found {count}.",
-                    badcourses,
-                )
+        if plan.index.invalid_level:
+            return ValidateResult(Status.ERROR, None, "Invalid course level format", plan.index.invalid_level[:1])
+        count = plan.index.units_at_level(self.level, self.or_higher)
+        if count >= self.n and count <= self.m:
+            return ValidateResult(Status.OK, 100, "", [])
+        badcourses = plan.index.courses_at_level(self.level, self.or_higher)
+        if count < self.n:
             return ValidateResult(
                 Status.ERROR,
-                count / self.m * 100,
-                f"Expected at most {self.m} units at level {self.level}, found {count}.",
+                count / self.n * 100,
+                f"Expected at least {self.n} units at level {self.level}, found {count:g}.",
                 badcourses,
             )
-        except ValueError:
-            return ValidateResult(Status.ERROR, None, "Invalid course level format", [exceptionCourse])
+        return ValidateResult(
+            Status.ERROR,
+            count / self.m * 100,
+            f"Expected at most {self.m} units at level {self.level}, found {count:g}.",
+            badcourses,
+        )
 
 
 @serde
@@ -204,19 +177,17 @@ class AR7(AR):
     type: str = "AR7"
 
     def validate(self, plan: Plan) -> ValidateResult:
-        discipline_count = {}
-        discipline_lists = {}
-        badlist = []
-        totalcount = 0
-        for course in plan.courses:
-            discipline = course[:4]
-            discipline_count[discipline] = discipline_count.get(discipline, 0) + 2  # REPLACE WITH UNITS
-            discipline_lists[discipline].append(course)
-        if any(count > self.n for count in discipline_count.values()):
-            greater_than_n = [d for d, count in discipline_count.items() if count > self.n]
-            for discipline in greater_than_n:
-                badlist.extend(discipline_lists[discipline])
-            return ValidateResult(Status.ERROR, totalcount / self.n * 100, "", badlist)
+        greater_than_n = [d for d, count in plan.index.discipline_units.items() if count > self.n]
+        if greater_than_n:
+            badlist = [course for d in greater_than_n for course in plan.index.discipline_courses[d]]
+            most = max(plan.index.discipline_units[d] for d in greater_than_n)
+            return ValidateResult(
+                Status.ERROR,
+                most / self.n * 100,
+                f"Expected at most {self.n} units from the same discipline, "
+                f"found too many in {', '.join(greater_than_n)}.",
+                badlist,
+            )
         return ValidateResult(Status.OK, 100, "", [])
 
 
@@ -228,10 +199,7 @@ class AR9(AR):
     type: str = "AR9"
 
     def validate(self, plan: Plan) -> ValidateResult:
-        badcourses = []
-        for course in plan.courses:
-            if course in self.course_list:
-                badcourses.append(course)
+        badcourses = _codes_in_plan(self.course_list, plan)
         if badcourses:
             return ValidateResult(Status.ERROR, None, f"No credit for {self.course_list}.", badcourses)
         return ValidateResult(Status.OK, 100, "", [])
@@ -248,13 +216,13 @@ class AR10(AR):
     def validate(self, plan: Plan) -> ValidateResult:
         for plan_ref in self.plan_list:
             if plan_ref.code in plan.specialisations[self.part]:
-                overlap = set(self.course_list) & set(plan.courses)
+                overlap = _codes_in_plan(self.course_list, plan)
                 if overlap:
                     return ValidateResult(
                         Status.ERROR,
                         0,
                         f"No credit for {overlap} for students completing {plan_ref}.",
-                        list(overlap),
+                        overlap,
                     )
                 return ValidateResult(Status.OK, 100, "", [])
         return ValidateResult(Status.ERROR, None, "Unreachable", [])
@@ -269,14 +237,14 @@ class AR11(AR):
     type: str = "AR11"
 
     def validate(self, plan: Plan) -> ValidateResult:
-        overlap = set(self.course_list) & set(plan.courses)
+        overlap = _codes_in_plan(self.course_list, plan)
         if overlap:
             if all(plan_ref.code not in plan.specialisations[self.part] for plan_ref in self.plan_list):
                 return ValidateResult(
                     Status.ERROR,
                     0,
                     f"No credit for {overlap} for students not completing {self.plan_list}.",
-                    list(overlap),
+                    overlap,
                 )
             return ValidateResult(Status.OK, 100, "", [])
         return ValidateResult(Status.ERROR, None, "Unreachable", [])
@@ -303,13 +271,13 @@ class AR13(AR):
     def validate(self, plan: Plan) -> ValidateResult:
         for plan_ref in self.plan_list:
             if plan_ref.code in plan.specialisations[self.part]:
-                overlap = set(self.course_list) & set(plan.courses)
+                overlap = _codes_in_plan(self.course_list, plan)
                 if overlap:
                     return ValidateResult(
                         Status.ERROR,
                         0,
                         f"Students completing {plan_ref} are exempt from {overlap} in {self.program_plan_list}.",
-                        list(overlap),
+                        overlap,
                     )
                 return ValidateResult(Status.OK, 100, "", [])
 
@@ -327,17 +295,17 @@ class AR15(AR):
     def validate(self, plan: Plan) -> ValidateResult:
         if self.must:
             # If it's a MUST, then we need to check that the course_list is in the program_plan_list
-            overlap = set(self.course_list) & set(plan.courses)
+            overlap = _codes_in_plan(self.course_list, plan)
             if not overlap:
                 return ValidateResult(
                     Status.ERROR,
                     0,
                     f"Expected {self.course_list} to be substituted in {self.program_plan_list} by a course from {self.lists}.",
-                    list(overlap),
+                    overlap,
                 )
             return ValidateResult(Status.OK, 100, "", [])
         # If it's a MAY, we don't need to check anything
-        overlap = set(self.course_list) & set(plan.courses)
+        overlap = _codes_in_plan(self.course_list, plan)
         if overlap:
             return ValidateResult(
                 Status.OK,
@@ -361,17 +329,17 @@ class AR16(AR):
 
     def validate(self, plan: Plan) -> ValidateResult:
         if self.must:
-            overlap = set(self.course_list_1) & set(plan.courses)
+            overlap = _codes_in_plan(self.course_list_1, plan)
             if not overlap:
                 return ValidateResult(
                     Status.ERROR,
                     0,
                     f"Expected {self.course_list_1} to be substituted in {self.plan_list} by a course from {self.course_list_2} in {self.program_plan_list}.",
-                    list(overlap),
+                    overlap,
                 )
             return ValidateResult(Status.OK, 100, "", [])
         # If it's a MAY, we don't need to check anything
-        overlap = set(self.course_list_1) & set(plan.courses)
+        overlap = _codes_in_plan(self.course_list_1, plan)
         if overlap:
             return ValidateResult(
                 Status.OK,
@@ -397,17 +365,17 @@ class AR17(AR):
 
     def validate(self, plan: Plan) -> ValidateResult:
         if self.must:
-            overlap = set(self.course_list) & set(plan.courses)
+            overlap = _codes_in_plan(self.course_list, plan)
             if not overlap:
                 return ValidateResult(
                     Status.ERROR,
                     0,
                     f"Expected {self.course_list} to be substituted in {self.plan_list} by a course from {self.lists} in {self.program_plan_list}.",
-                    list(overlap),
+                    overlap,
                 )
             return ValidateResult(Status.OK, 100, "", [])
         # If it's a MAY, we don't need to check anything
-        overlap = set(self.course_list) & set(plan.courses)
+        overlap = _codes_in_plan(self.course_list, plan)
         if overlap:
             return ValidateResult(
                 Status.OK,
@@ -429,15 +397,14 @@ class AR18(AR):
     type: str = "AR18"
 
     def validate(self, plan: Plan) -> ValidateResult:
-        for course in plan.courses:
-            if course in self.course_list:
-                if self.program.code not in plan.specialisations[self.part]:
-                    return ValidateResult(
-                        Status.ERROR,
-                        0,
-                        f"{course} can only be counted towards the {self.program.name} component of a dual.",
-                        [course],
-                    )
+        for course in _codes_in_plan(self.course_list, plan):
+            if self.program.code not in plan.specialisations[self.part]:
+                return ValidateResult(
+                    Status.ERROR,
+                    0,
+                    f"{course} can only be counted towards the {self.program.name} component of a dual.",
+                    [course],
+                )
         return ValidateResult(Status.OK, 100, "", [])
 
 
@@ -453,15 +420,15 @@ class AR19(AR):
     def validate(self, plan: Plan) -> ValidateResult:
         for plan_ref in self.plan_list:
             if plan_ref.code == plan.degree:
-                for course in plan.courses:
-                    if course in self.course_list:
-                        if self.program.code not in plan.specialisations[self.part]:
-                            return ValidateResult(
-                                Status.ERROR,
-                                0,
-                                f"{course} only counts towards the {self.program.name} component for students completing {plan_ref}",
-                                [course],
-                            )
+                for course in _codes_in_plan(self.course_list, plan):
+                    if self.program.code not in plan.specialisations[self.part]:
+                        return ValidateResult(
+                            Status.ERROR,
+                            0,
+                            f"{course} only counts towards the {self.program.name} component "
+                            f"for students completing {plan_ref}",
+                            [course],
+                        )
 
         return ValidateResult(Status.OK, 100, "", [])
 
@@ -480,15 +447,14 @@ class AR20(AR):
         if plan.degree == self.plan_1.code:
             for plan_ref in self.plan_list_1:
                 if plan_ref.code in plan.specialisations[self.part]:
-                    for course in plan.courses:
-                        if course in self.course_list:
-                            if plan.specialisations[self.part] not in self.plan_list_2:
-                                return ValidateResult(
-                                    Status.ERROR,
-                                    0,
-                                    f"{course} only counts towards {self.plan_list_2} for students completing {plan_ref}.",
-                                    [course],
-                                )
+                    for course in _codes_in_plan(self.course_list, plan):
+                        if plan.specialisations[self.part] not in self.plan_list_2:
+                            return ValidateResult(
+                                Status.ERROR,
+                                0,
+                                f"{course} only counts towards {self.plan_list_2} for students completing {plan_ref}.",
+                                [course],
+                            )
 
         return ValidateResult(Status.OK, 100, "", [])
 
@@ -0,0 +1,71 @@
+"""Process wide cache of compiled degrees."""
+
+import logging
+import threading
+from collections import OrderedDict
+from uuid import UUID
+
+from degree.compiled import CompiledDegree, compile_degree, hash_degree_details
+
+log = logging.getLogger(__name__)
+
+DEGREE_CACHE_SIZE = 512  # number of compiled degrees kept around
+
+
+class DegreeCache:
+    """Bounded LRU cache of compiled degrees keyed by (degree_id, content hash)."""
+
+    def __init__(self, maxsize: int = DEGREE_CACHE_SIZE) -> None:
+        """Create an empty cache holding at most `maxsize` compiled degrees."""
+        self._maxsize = maxsize
+        self._entries: OrderedDict[tuple[UUID, str], CompiledDegree] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of compiled degrees currently cached."""
+        return len(self._entries)
+
+    def get(self, degree_id: UUID, details: dict, content_hash: str | None = None) -> CompiledDegree:
+        """Get the compiled degree for a degree row, compiling it on a miss.
+
+        Args:
+            degree_id (UUID): ID of the degree row.
+            details (dict): The `details` column of the degree row.
+            content_hash (str | None): Precomputed hash_degree_details of `details`, computed if not given.
+
+        Returns:
+            CompiledDegree: The compiled degree.
+        """
+        if content_hash is None:
+            content_hash = hash_degree_details(details)
+        key = (degree_id, content_hash)
+
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                return compiled
+
+        # compile outside the lock, worst case two callers compile the same degree
+        compiled = compile_degree(details, content_hash)
+
+        with self._lock:
+            # anything cached under an older version of this degree is now stale
+            for stale in [k for k in self._entries if k[0] == degree_id and k != key]:
+                del self._entries[stale]
+
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+        return compiled
+
+    def clear(self) -> None:
+        """Drop every compiled degree, e.g., after the degree rows are rewritten."""
+        with self._lock:
+            log.info(f"Clearing {len(self._entries)} compiled degrees from the cache")
+            self._entries.clear()
+
+
+degree_cache = DegreeCache()
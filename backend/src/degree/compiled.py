@@ -0,0 +1,182 @@
+"""Compiled degrees that are ready to validate plans against."""
+
+import hashlib
+from collections.abc import Callable
+
+import orjson
+from serde.json import from_dict
+
+from api.plan.plan import Plan
+from degree.aux_rule import create_ar_from_dict
+from degree.degree import Degree
+from degree.dependencies import RuleDeps, rule_deps
+from degree.rule_logic import AllNode, LogicNode, compile_rule_logic, parent_part
+from degree.sr_rule import CourseSR, create_sr_from_dict
+from degree.validate_result import Status, ValidateResult
+
+
+def hash_degree_details(details: dict) -> str:
+    """Get a stable content hash of a degree's JSON details."""
+    return hashlib.blake2b(orjson.dumps(details, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
+def _normalise_sem(value: object) -> int:
+    """Older degree rows store the semester as a (possibly empty) string."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        return 0 if value == "" else int(value)
+    raise ValueError(f"Unexpected degree semester value: {value!r}")
+
+
+class CompiledDegree:
+    """A degree with all of its AR/SR rules deserialised."""
+
+    content_hash: str
+    degree: Degree
+    # what each rule depends on, in the same order as Degree.validate's results
+    rule_deps: list[RuleDeps]
+    # part -> its rule logic, "" for the degree's own, None if any can't be parsed and every rule applies
+    logic: dict[str, LogicNode] | None
+    # part (e.g., "A.1") -> indices of its rules in Degree.validate's results
+    part_rules: dict[str, list[int]]
+    # part -> the parts directly under it, "" for the top level parts
+    sub_parts: dict[str, list[str]]
+    # course code -> indices of the SR1-SR5 rules it's an option of
+    option_rules: dict[str, list[int]]
+
+    def __init__(self, content_hash: str, degree: Degree) -> None:
+        """Wrap a deserialised degree along with the hash of the details it came from."""
+        self.content_hash = content_hash
+        self.degree = degree
+        self.rule_deps = [rule_deps(rule) for rule in (*degree.aux, *degree.srs)]
+
+        self.part_rules = {}
+        self.option_rules = {}
+        for i, rule in enumerate((*degree.aux, *degree.srs)):
+            self.part_rules.setdefault(rule.part.upper(), []).append(i)
+            if isinstance(rule, CourseSR):
+                for code in dict.fromkeys(option.code for option in rule.options):  # type: ignore[attr-defined]
+                    self.option_rules.setdefault(code, []).append(i)
+
+        self.logic = self._compile_logic(degree)
+
+        parts = {part.upper() for part in degree.part_references} | self.part_rules.keys()
+        for node in (self.logic or {}).values():
+            parts |= node.parts()
+        self.sub_parts = {}
+        for part in sorted(parts):
+            self.sub_parts.setdefault(parent_part(part), []).append(part)
+
+    @staticmethod
+    def _compile_logic(degree: Degree) -> dict[str, LogicNode] | None:
+        """Compile each part's rule logic.
+
+        Degrees converted before the owners were kept only have the list of expressions,
+        so each is given to the deepest part all of its parts are under instead.
+        """
+        if degree.part_logic:
+            logic = {part.upper(): compile_rule_logic(text) for part, text in degree.part_logic.items()}
+            return logic if None not in logic.values() else None  # type: ignore[return-value]
+
+        nodes = [compile_rule_logic(text) for text in degree.rule_logic]
+        if None in nodes:
+            return None
+        owned: dict[str, list[LogicNode]] = {}
+        for node in nodes:
+            owned.setdefault(node.owner(), []).append(node)  # type: ignore[union-attr]
+        return {part: group[0] if len(group) == 1 else AllNode(group) for part, group in owned.items()}
+
+    def _complete(self, rule_met: Callable[[int], bool]) -> bool:
+        """Evaluate the rule logic top down, only checking the rules of the parts it needs.
+
+        A part is met when its own rules are, along with its logic, or every part under it
+        if it has no logic.
+        """
+        if self.logic is None:
+            return all(rule_met(i) for i in range(len(self.rule_deps)))
+        logic = self.logic
+
+        met: dict[str, bool] = {}
+
+        def part_met(part: str) -> bool:
+            if part not in met:
+                # logic referring back to its own part only sees the part's own rules
+                met[part] = all(rule_met(i) for i in self.part_rules.get(part, ()))
+                if met[part]:
+                    node = logic.get(part)
+                    met[part] = (
+                        node.evaluate(part_met)
+                        if node is not None
+                        else all(part_met(sub) for sub in self.sub_parts.get(part, ()))
+                    )
+            return met[part]
+
+        return part_met("")
+
+    def is_complete(self, plan: Plan) -> bool:
+        """Whether the plan completes the degree.
+
+        Rules are only run for the parts the rule logic gets to, e.g., for "A or B"
+        part B's rules are never run if part A is met.
+        """
+        rules = [*self.degree.aux, *self.degree.srs]
+        return self._complete(lambda i: rules[i].validate(plan).status != Status.ERROR)
+
+    def completed_by(self, results: list[ValidateResult]) -> bool:
+        """Whether already computed validation results complete the degree."""
+        return self._complete(lambda i: results[i].status != Status.ERROR)
+
+    def revalidate(
+        self,
+        plan: Plan,
+        previous: list[ValidateResult],
+        changed_codes: set[str],
+        specialisations_changed: bool = False,  # noqa: FBT001, FBT002
+    ) -> list[ValidateResult]:
+        """Validate an edited plan, only re-running the rules the edit could affect.
+
+        Args:
+            plan (Plan): The plan after the edit.
+            previous (list[ValidateResult]): Results from before the edit.
+            changed_codes (set[str]): Courses added to or removed from the plan.
+            specialisations_changed (bool): Whether the plan's specialisations changed.
+
+        Returns:
+            list[ValidateResult]: Results for the edited plan.
+        """
+        rules = [*self.degree.aux, *self.degree.srs]
+        # results from another version of the degree can't be matched up with its rules
+        if len(previous) != len(rules):
+            return self.degree.validate(plan)
+
+        return [
+            rule.validate(plan) if deps.affected_by(changed_codes, specialisations_changed) else result
+            for rule, deps, result in zip(rules, self.rule_deps, previous, strict=True)
+        ]
+
+
+def compile_degree(details: dict, content_hash: str | None = None) -> CompiledDegree:
+    """Deserialise a degree's JSON details into a ready to use degree.
+
+    Args:
+        details (dict): The `details` column of a degree row.
+        content_hash (str | None): Precomputed hash of `details`, computed if not given.
+
+    Returns:
+        CompiledDegree: The compiled degree.
+    """
+    if content_hash is None:
+        content_hash = hash_degree_details(details)
+
+    # copy so the caller's (possibly ORM tracked) dict is never mutated
+    vals = dict(details)
+    vals["sem"] = _normalise_sem(vals["sem"])
+
+    degree: Degree = from_dict(Degree, vals)
+    if "aux" in vals:
+        degree.aux = [create_ar_from_dict(ar_data) for ar_data in vals["aux"]]
+    if "srs" in vals:
+        degree.srs = [create_sr_from_dict(sr_data) for sr_data in vals["srs"]]
+
+    return CompiledDegree(content_hash, degree)
@@ -600,9 +600,9 @@ def convert_degree(parsed_degree: ParsedDegree, raw_json: dict = None) -> FlatDe
                     for ar in header.auxiliaryRules:
                         ars.append(process_ar(ar, current_part))
 
-            # Rule logic for this part (if any)
-            if pr and header.ruleLogic:
-                rule_logic_by_part[pr] = header.ruleLogic
+            # Rule logic for this part (if any), or the degree itself outside of any part
+            if header.ruleLogic:
+                rule_logic_by_part[part_stack[-1] if part_stack else ""] = header.ruleLogic
 
         # Split leaves vs child payloads
         sibling_leaves: list[ComponentPayloadLeaf] = []
@@ -663,6 +663,7 @@ def convert_degree(parsed_degree: ParsedDegree, raw_json: dict = None) -> FlatDe
     flat_degree.srs = srs
     # Flatten rule logic to a unique list of strings
     flat_degree.rule_logic = list({v for v in rule_logic_by_part.values() if v})
+    flat_degree.part_logic = rule_logic_by_part
     flat_degree.part_references = part_references
     return flat_degree
 
@@ -1,19 +1,12 @@
 """Degree requirements representation."""
 
-from collections.abc import Awaitable, Callable
+from serde import field, serde
 
-from serde import serde
-
-from api.course.models import CourseDBModel
-from api.degree.models import DegreeDBModel
 from api.plan.plan import Plan
 from degree.aux_rule import AR
 from degree.sr_rule import SR
 from degree.validate_result import ValidateResult
 
-CourseCallback = Callable[[str], Awaitable[CourseDBModel | None]]
-DegreeCallback = Callable[[str, int], Awaitable[DegreeDBModel | None]]
-
 
 @serde
 class Degree:
@@ -38,11 +31,14 @@ class Degree:
     # An entry might be A and B or A.1 OR B.1
     rule_logic: list[str]
 
-    def validate(
-        self, plan: Plan, course_getter: CourseCallback, degree_getter: DegreeCallback
-    ) -> list[ValidateResult]:
-        # Things to do:
-        # -
+    # The same rule logic by the part it belongs to, "" for the degree itself
+    # e.g. "A" -> "A.1 or A.2" says which of part A's sub-parts complete it.
+    # Older degrees don't have this, so the owners are worked out from the parts instead.
+    part_logic: dict[str, str] = field(default_factory=dict)
+
+    def validate(self, plan: Plan) -> list[ValidateResult]:
+        # Everything the rules need (e.g., course units) is resolved onto the
+        # plan beforehand, so this never touches the db and can run off the event loop.
         results = []
         for aux in self.aux:
             results.append(aux.validate(plan))
@@ -62,4 +58,5 @@ class Degree:
             srs=list(),
             part_references=dict(),
             rule_logic=list(),
+            part_logic=dict(),
         )
@@ -0,0 +1,109 @@
+"""What each rule's validation result depends on."""
+
+from collections.abc import Iterable
+
+from degree.aux_rule import (
+    AR,
+    AR1,
+    AR2,
+    AR3,
+    AR4,
+    AR5,
+    AR6,
+    AR7,
+    AR9,
+    AR10,
+    AR11,
+    AR13,
+    AR15,
+    AR16,
+    AR17,
+    AR18,
+    AR19,
+    AR20,
+)
+from degree.sr_rule import SR, SR1, SR2, SR3, SR4, SR5, SR6, SR7, SR8
+
+
+class RuleDeps:
+    """The plan inputs a rule reads.
+
+    A rule only needs to be re-evaluated when a course it depends on is added or
+    removed, or (for rules reading them) when the plan's specialisations change.
+    """
+
+    codes: frozenset[str]  # specific courses, e.g., the options of an SR
+    level: int | None  # any course at this level
+    or_higher: bool  # ...or any higher level
+    any_course: bool  # any course at all, e.g., discipline totals
+    specialisations: bool
+
+    def __init__(
+        self,
+        codes: Iterable[str] = (),
+        level: int | None = None,
+        or_higher: bool = False,  # noqa: FBT001, FBT002
+        any_course: bool = False,  # noqa: FBT001, FBT002
+        specialisations: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Describe what a rule depends on, a rule with no dependencies never changes."""
+        self.codes = frozenset(codes)
+        self.level = level
+        self.or_higher = or_higher
+        self.any_course = any_course
+        self.specialisations = specialisations
+
+    def _matches_level(self, code: str) -> bool:
+        try:
+            level = int(code[4])
+        except (IndexError, ValueError):
+            return True  # level rules report courses with unreadable levels
+        return level == self.level or (self.or_higher and level > self.level)  # type: ignore[operator]
+
+    def affected_by(self, changed_codes: Iterable[str], specialisations_changed: bool = False) -> bool:  # noqa: FBT001, FBT002
+        """Whether adding/removing the courses (or changing specialisations) can change the rule's result."""
+        if specialisations_changed and self.specialisations:
+            return True
+        for code in changed_codes:
+            if self.any_course or code in self.codes:
+                return True
+            if self.level is not None and self._matches_level(code):
+                return True
+        return False
+
+
+def _codes(*course_lists: Iterable) -> list[str]:
+    return [ref.code for course_list in course_lists for ref in course_list]
+
+
+def rule_deps(rule: object) -> RuleDeps:  # noqa: PLR0911
+    """Work out what a rule's result depends on.
+
+    Args:
+        rule (object): An AR or SR.
+
+    Returns:
+        RuleDeps: The rule's dependencies.
+    """
+    match rule:
+        case SR1() | SR2() | SR3() | SR4() | SR5():
+            return RuleDeps(codes=_codes(rule.options))
+        case SR6() | SR7() | SR8() | AR5() | AR6():
+            return RuleDeps(specialisations=True)
+        case AR3() | AR4():
+            return RuleDeps(level=rule.level, or_higher=rule.or_higher)
+        case AR2():
+            return RuleDeps(level=rule.level)
+        case AR1() | AR7():
+            # AR1 reports every course in the plan when it isn't met, AR7 totals every discipline
+            return RuleDeps(any_course=True)
+        case AR9() | AR15() | AR17():
+            return RuleDeps(codes=_codes(rule.course_list))
+        case AR16():
+            return RuleDeps(codes=_codes(rule.course_list_1))
+        case AR10() | AR11() | AR13() | AR18() | AR19() | AR20():
+            return RuleDeps(codes=_codes(rule.course_list), specialisations=True)
+        case AR() | SR():
+            # anything else falls back to the abstract rules, which report every course in the plan
+            return RuleDeps(any_course=True)
+    return RuleDeps()
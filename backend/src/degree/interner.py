@@ -0,0 +1,95 @@
+"""Dense integer ids for course codes, so sets of courses can be bitsets."""
+
+import logging
+import threading
+from collections.abc import Iterable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.course.models import CourseDBModel
+
+log = logging.getLogger(__name__)
+
+
+class CourseInterner:
+    """Assigns each course code a small integer id, the code's bit in a course bitset.
+
+    A set of courses is then a plain int, so intersecting an option list with a plan
+    is `&` and counting how many of the options are in the plan is `bit_count()`.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty interner, see `load`."""
+        self._ids: dict[str, int] = {}
+        self._codes: list[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of interned codes."""
+        return len(self._codes)
+
+    def __iter__(self) -> Iterator[str]:
+        """Every interned code, in id order."""
+        return iter(list(self._codes))
+
+    def intern(self, code: str) -> int:
+        """Get the id of a course code, assigning the next id if it's new.
+
+        Only for codes from the catalogue, as interned codes are never dropped. Codes from
+        users (e.g., in a plan) go through `lookup`, so they can't grow the interner.
+        """
+        course_id = self._ids.get(code)
+        if course_id is not None:
+            return course_id
+
+        with self._lock:
+            course_id = self._ids.get(code)
+            if course_id is None:
+                course_id = len(self._codes)
+                self._codes.append(code)
+                self._ids[code] = course_id
+            return course_id
+
+    def lookup(self, code: str) -> int | None:
+        """Get the id of a course code, None if it hasn't been interned."""
+        return self._ids.get(code)
+
+    def intern_all(self, codes: Iterable[str]) -> None:
+        """Assign ids to many codes up front, sorted so related codes sit near each other."""
+        for code in sorted(set(codes)):
+            self.intern(code)
+
+    async def load(self, session: AsyncSession) -> None:
+        """Assign ids to every course in the db."""
+        result = await session.execute(select(CourseDBModel.full_code))
+        self.intern_all(result.scalars())
+        log.info(f"Interned {len(self)} course codes")
+
+    def split(self, codes: Iterable[str]) -> tuple[int, frozenset[str]]:
+        """Get the bitset of the interned courses, and the codes that aren't interned."""
+        mask = 0
+        unknown = set()
+        for code in codes:
+            course_id = self._ids.get(code)
+            if course_id is None:
+                unknown.add(code)
+            else:
+                mask |= 1 << course_id
+        return mask, frozenset(unknown)
+
+    def mask(self, codes: Iterable[str]) -> int:
+        """Get the bitset of the courses, leaving out any that aren't interned (see `split`)."""
+        return self.split(codes)[0]
+
+    def codes(self, mask: int) -> list[str]:
+        """Get the courses in a bitset, in id order."""
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(self._codes[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+
+course_interner = CourseInterner()
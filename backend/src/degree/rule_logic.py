@@ -0,0 +1,144 @@
+"""Degree rule logic, e.g., "A and B or A.1", compiled into a short circuiting tree over parts."""
+
+import logging
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+
+from lark import Token, Transformer
+from lark.exceptions import LarkError
+
+from common.reqs_parsing import load_parser
+
+log = logging.getLogger(__name__)
+
+GRAMMAR = """
+    ?start: expr
+
+    ?expr: term
+         | expr OR term    -> or_expr
+
+    ?term: factor
+         | term AND factor -> and_expr
+
+    ?factor: part
+           | "(" expr ")"
+
+    part: PART_PREFIX? PART_REF
+
+    PART_PREFIX.3: /part\\b/i
+    OR.2: /or\\b/i
+    AND.2: /and\\b/i
+    PART_REF: /[a-zA-Z](\\.[a-zA-Z0-9]+)*/
+
+    %import common.WS
+    %ignore WS
+"""
+
+parser = load_parser(GRAMMAR, "rule_logic_parser")
+
+
+def parent_part(part: str) -> str:
+    """The part a part is under, e.g., "A" for "A.1", "" for a top level part like "A"."""
+    return part.rpartition(".")[0]
+
+
+class LogicNode(ABC):
+    """A node of a compiled rule logic expression."""
+
+    @abstractmethod
+    def evaluate(self, part_met: Callable[[str], bool]) -> bool:
+        """Whether the expression holds, only asking about the parts it has to."""
+
+    @abstractmethod
+    def parts(self) -> set[str]:
+        """Every part the expression refers to."""
+
+    def owner(self) -> str:
+        """The deepest part every part of the expression is under, "" if that's the degree itself.
+
+        e.g., "A.1 or A.2" belongs to part A while "A and B" belongs to the degree.
+        """
+        parents = [parent_part(part).split(".") for part in self.parts()]
+        common: list[str] = []
+        for segments in zip(*parents, strict=False):
+            if len(set(segments)) > 1:
+                break
+            common.append(segments[0])
+        return ".".join(common)
+
+
+class PartNode(LogicNode):
+    """A single part, e.g., "A.1"."""
+
+    def __init__(self, part: str) -> None:
+        """Refer to the part."""
+        self.part = part
+
+    def evaluate(self, part_met: Callable[[str], bool]) -> bool:
+        """Whether the part is met."""
+        return part_met(self.part)
+
+    def parts(self) -> set[str]:
+        """Just this part."""
+        return {self.part}
+
+
+class AllNode(LogicNode):
+    """Every child has to hold, stopping at the first that doesn't."""
+
+    def __init__(self, children: list[LogicNode]) -> None:
+        """Combine the children."""
+        self.children = children
+
+    def evaluate(self, part_met: Callable[[str], bool]) -> bool:
+        """Whether every child holds."""
+        return all(child.evaluate(part_met) for child in self.children)
+
+    def parts(self) -> set[str]:
+        """Every part of the children."""
+        return set().union(*(child.parts() for child in self.children))
+
+
+class AnyNode(AllNode):
+    """Any child has to hold, stopping at the first that does."""
+
+    def evaluate(self, part_met: Callable[[str], bool]) -> bool:
+        """Whether any child holds."""
+        return any(child.evaluate(part_met) for child in self.children)
+
+
+class RuleLogicTransformer(Transformer):
+    """Transform a parsed rule logic expression into logic nodes."""
+
+    def part(self, items: list[Token]) -> PartNode:
+        """Drop any "Part" prefix, parts are stored uppercase e.g., "A.1"."""
+        return PartNode(items[-1].value.upper())
+
+    def and_expr(self, items: list[Token | LogicNode]) -> LogicNode:
+        """Flatten chained ANDs into one node."""
+        children: list[LogicNode] = []
+        for item in items:
+            if type(item) is AllNode:
+                children.extend(item.children)
+            elif isinstance(item, LogicNode):
+                children.append(item)
+        return AllNode(children)
+
+    def or_expr(self, items: list[Token | LogicNode]) -> LogicNode:
+        """Flatten chained ORs into one node."""
+        children: list[LogicNode] = []
+        for item in items:
+            if isinstance(item, AnyNode):
+                children.extend(item.children)
+            elif isinstance(item, LogicNode):
+                children.append(item)
+        return AnyNode(children)
+
+
+def compile_rule_logic(text: str) -> LogicNode | None:
+    """Parse a rule logic expression, None if it can't be parsed."""
+    try:
+        return RuleLogicTransformer().transform(parser.parse(text))
+    except LarkError:
+        log.warning(f"Couldn't parse rule logic - {text}")
+        return None
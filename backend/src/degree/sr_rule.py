@@ -1,7 +1,10 @@
+from functools import cached_property
+
 from serde import serde
 from serde.json import from_dict
 
 from api.plan.plan import Plan
+from degree.interner import course_interner
 from degree.params import CourseRef, ProgramRef
 from degree.validate_result import Status, ValidateResult
 
@@ -15,8 +18,29 @@ class SR:
         return ValidateResult(Status.ERROR, None, "Should not be seeing this - validating abstract SR", plan.courses)
 
 
+class CourseSR(SR):
+    """An SR picking from a list of courses, with the options kept as a course bitset."""
+
+    @cached_property
+    def option_mask(self) -> int:
+        """Bitset of the option courses."""
+        return course_interner.split(option.code for option in self.options)[0]  # type: ignore[attr-defined]
+
+    @cached_property
+    def option_unknown(self) -> frozenset[str]:
+        """Option courses that aren't in the catalogue, so aren't in the bitset."""
+        return course_interner.split(option.code for option in self.options)[1]  # type: ignore[attr-defined]
+
+    def split_options(self, plan: Plan) -> tuple[list[str], list[str]]:
+        """Split the options into the ones in the plan and the ones that aren't, in option order."""
+        done, missing = [], []
+        for option in self.options:  # type: ignore[attr-defined]
+            (done if plan.index.has(option.code) else missing).append(option.code)
+        return done, missing
+
+
 @serde
-class SR1(SR):
+class SR1(CourseSR):
     """Complete [N] units for ALL of the following"""
 
     n: int
@@ -24,21 +48,17 @@ class SR1(SR):
     type: str = "SR1"
 
     def validate(self, plan: Plan):
-        count = 0
-        badcourses = []
-        for option in self.options:
-            if option.code not in plan.courses:
-                badcourses.append(option.code)
-            else:
-                count += 2  # UPDATE UNITS
+        count = plan.index.units_in(self.option_mask, self.option_unknown)
         if count != self.n:
+            _, badcourses = self.split_options(plan)
             return ValidateResult(
                 Status.ERROR,
                 count / self.n * 100,
-                f"{count} units found in plan, but {self.n} required. Add from: {', '.join(badcourses)}",
+                f"{count:g} units found in plan, but {self.n} required. Add from: {', '.join(badcourses)}",
                 badcourses,
             )
-        if badcourses:
+        if not plan.index.has_all(self.option_mask, self.option_unknown):
+            _, badcourses = self.split_options(plan)
             return ValidateResult(
                 Status.ERROR,
                 (self.n - len(badcourses)) / self.n * 100,
@@ -49,7 +69,7 @@ class SR1(SR):
 
 
 @serde
-class SR2(SR):
+class SR2(CourseSR):
     """Complete [N] to [M] units for ALL of the following"""
 
     n: int
@@ -58,30 +78,25 @@ class SR2(SR):
     type: str = "SR2"
 
     def validate(self, plan: Plan):
-        count = 0
-        badcourses = []
-        donecourses = []
-        for course in self.options:
-            if course.code in plan.courses:
-                count += 2  # UPDATE UNITS
-                donecourses.append(course.code)
-            else:
-                badcourses.append(course.code)
+        count = plan.index.units_in(self.option_mask, self.option_unknown)
         if count < self.n:
+            _, badcourses = self.split_options(plan)
             return ValidateResult(
                 Status.ERROR,
                 count / self.n * 100,
-                f"{count} units found in plan, but {self.n} required. Add from: {', '.join(badcourses)}",
+                f"{count:g} units found in plan, but {self.n} required. Add from: {', '.join(badcourses)}",
                 badcourses,
             )
         if count > self.m:
+            donecourses, _ = self.split_options(plan)
             return ValidateResult(
                 Status.WARN,
                 count / self.m * 100,
-                f"{count} units found in plan, but {self.m} maximum. Remove from: {', '.join(donecourses)}",
+                f"{count:g} units found in plan, but {self.m} maximum. Remove from: {', '.join(donecourses)}",
                 donecourses,
             )
-        if badcourses:
+        if not plan.index.has_all(self.option_mask, self.option_unknown):
+            _, badcourses = self.split_options(plan)
             return ValidateResult(
                 Status.ERROR,
                 (self.n - len(badcourses)) / self.n * 100,
@@ -92,7 +107,7 @@ class SR2(SR):
 
 
 @serde
-class SR3(SR):
+class SR3(CourseSR):
     """Complete at least [N] units from the following"""
 
     n: int
@@ -100,25 +115,20 @@ class SR3(SR):
     type: str = "SR3"
 
     def validate(self, plan: Plan):
-        count = 0
-        badcourses = []
-        for course in self.options:
-            if course.code in plan.courses:
-                count += 2  # UPDATE UNITS
-            else:
-                badcourses.append(course.code)
+        count = plan.index.units_in(self.option_mask, self.option_unknown)
         if count < self.n:
+            _, badcourses = self.split_options(plan)
             return ValidateResult(
                 Status.ERROR,
                 count / self.n * 100,
-                f"{count} units found in plan, but {self.n} required. Add from: {', '.join(badcourses)}",
+                f"{count:g} units found in plan, but {self.n} required. Add from: {', '.join(badcourses)}",
                 badcourses,
             )
         return ValidateResult(Status.OK, 100, "", [])
 
 
 @serde
-class SR4(SR):
+class SR4(CourseSR):
     """Complete [N] to [M] units from the following"""
 
     n: int
@@ -127,34 +137,28 @@ class SR4(SR):
     type: str = "SR4"
 
     def validate(self, plan: Plan):
-        count = 0
-        badcourses = []
-        donecourses = []
-        for course in self.options:
-            if course.code in plan.courses:
-                count += 2  # UPDATE UNITS
-                donecourses.append(course.code)
-            else:
-                badcourses.append(course.code)
+        count = plan.index.units_in(self.option_mask, self.option_unknown)
         if count < self.n:
+            _, badcourses = self.split_options(plan)
             return ValidateResult(
                 Status.ERROR,
                 count / self.n * 100,
-                f"{count} units found in plan, but {self.n} required. Add from: {', '.join(badcourses)}",
+                f"{count:g} units found in plan, but {self.n} required. Add from: {', '.join(badcourses)}",
                 badcourses,
             )
         if count > self.m:
+            donecourses, _ = self.split_options(plan)
             return ValidateResult(
                 Status.WARN,
                 count / self.m * 100,
-                f"{count} units found in plan, but {self.m} maximum. Remove from: {', '.join(donecourses)}",
+                f"{count:g} units found in plan, but {self.m} maximum. Remove from: {', '.join(donecourses)}",
                 donecourses,
             )
         return ValidateResult(Status.OK, 100, "", [])
 
 
 @serde
-class SR5(SR):
+class SR5(CourseSR):
     """Complete exactly [N] units from the following"""
 
     n: int
@@ -162,27 +166,21 @@ class SR5(SR):
     type: str = "SR5"
 
     def validate(self, plan: Plan):
-        count = 0
-        badcourses = []
-        donecourses = []
-        for course in self.options:
-            if course.code in plan.courses:
-                count += 2  # UPDATE UNITS
-                donecourses.append(course.code)
-            else:
-                badcourses.append(course.code)
+        count = plan.index.units_in(self.option_mask, self.option_unknown)
         if count < self.n:
+            _, badcourses = self.split_options(plan)
             return ValidateResult(
                 Status.ERROR,
                 count / self.n * 100,
-                f"{count} units found in plan, but {self.n} required. Add from: {', '.join(badcourses)}",
+                f"{count:g} units found in plan, but {self.n} required. Add from: {', '.join(badcourses)}",
                 badcourses,
             )
         if count > self.n:
+            donecourses, _ = self.split_options(plan)
             return ValidateResult(
                 Status.WARN,
                 count / self.n * 100,
-                f"{count} units found in plan, but {self.n} required. Remove from: {', '.join(donecourses)}",
+                f"{count:g} units found in plan, but {self.n} required. Remove from: {', '.join(donecourses)}",
                 donecourses,
             )
         return ValidateResult(Status.OK, 100, "", [])
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import SupportsFloat
 
 from serde import serde
 
@@ -16,8 +17,9 @@ class ValidateResult:
     message: str
     relevant: list[str]
 
-    def __init__(self, status: Status, percentage: float | None, message: str, relevant: list[str]):
+    # rules pass whole percentages like 100 too, which serde's type checking would reject for a float
+    def __init__(self, status: Status, percentage: SupportsFloat | None, message: str, relevant: list[str]):
         self.status = status
-        self.percentage = percentage
+        self.percentage = None if percentage is None else float(percentage)
         self.message = message
         self.relevant = relevant
@@ -0,0 +1,27 @@
+"""Script to write the seed data files as JSON lines, so seeding can stream them.
+
+Run from the backend directory, like the api.
+"""
+
+from pathlib import Path
+
+import orjson
+
+from api.database.records import COURSES_FILE, COURSES_KEY, DEGREES_FILE, DEGREES_KEY, PLANS_FILE
+
+
+def to_jsonl(path: Path, key: str | None = None) -> Path:
+    """Write each record of a JSON data file on its own line of a .jsonl file beside it."""
+    with Path.open(path, "rb") as f:
+        data = orjson.loads(f.read())
+
+    jsonl_path = path.with_suffix(".jsonl")
+    with Path.open(jsonl_path, "wb") as f:
+        for record in data[key] if key is not None else data:
+            f.write(orjson.dumps(record) + b"\n")
+    return jsonl_path
+
+
+if __name__ == "__main__":
+    for path, key in ((COURSES_FILE, COURSES_KEY), (DEGREES_FILE, DEGREES_KEY), (PLANS_FILE, None)):
+        print(f"Wrote {to_jsonl(path, key)}")  # noqa: T201
@@ -0,0 +1,23 @@
+"""Script to reparse every course's requirements, e.g., after a grammar change."""
+
+import time
+from collections import Counter
+
+from common.reqs_parsing import parse_requirements_bulk
+from scripts.utils import load_courses
+
+
+def reparse_requirements() -> Counter[str]:
+    """Parse all the prerequisite and incompatible strings, counting the kinds they parse to."""
+    courses = load_courses()
+    texts = [text for course in courses for text in (course.prerequisite, course.incompatible) if text]
+
+    start = time.perf_counter()
+    parsed = parse_requirements_bulk(texts)
+    print(f"Parsed {len(texts)} requirements in {time.perf_counter() - start:.2f}s")  # noqa: T201
+
+    return Counter(str(requirement.kind) for requirement in parsed)
+
+
+if __name__ == "__main__":
+    print(reparse_requirements())  # noqa: T201
@@ -0,0 +1,21 @@
+"""Builders shared by the tests, for the bits of plans, degrees and requirements they keep making."""
+
+from collections.abc import Mapping
+
+from api.plan.plan import Plan
+from degree.params import CourseRef
+
+
+def atomic(code: str) -> dict:
+    """A stored requirement on just the course, see common.reqs_parsing."""
+    return {"kind": "atomic", "value": code}
+
+
+def course_ref(code: str) -> CourseRef:
+    """A rule option for the course, without any of the scraped details."""
+    return CourseRef(None, None, code, "", "", "")
+
+
+def make_plan(courses: list[str], units: Mapping[str, float] | None = None) -> Plan:
+    """A plan taking all the courses in its first semester, with part A specialisations."""
+    return Plan("plan", {(2025, 1): courses}, {}, courses, "2451", {"A": []}, course_units=units)
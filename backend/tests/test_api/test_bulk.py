@@ -0,0 +1,154 @@
+"""Tests for flattening seed data into bulk insert rows."""
+
+import asyncio
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy.dialects.postgresql import Insert as PgInsert
+from sqlalchemy.sql.dml import Delete, Insert
+
+from api.course.models import CourseDBModel, CourseOfferingDBModel, CourseSecatDBModel, CourseSecatQuestionsDBModel
+from api.database.bulk import (
+    COURSE_TABLE,
+    OFFERING_TABLE,
+    QUESTION_TABLE,
+    SECAT_TABLE,
+    course_rows,
+    degree_row,
+    unique_rows,
+    upsert_courses,
+)
+from common.enums import CourseLevel, CourseMode
+
+
+def make_course(code: str, offerings: int, questions: int | None) -> CourseDBModel:
+    secat = (
+        CourseSecatDBModel(
+            num_enrolled=100,
+            num_responses=50,
+            response_rate=0.5,
+            questions=[
+                CourseSecatQuestionsDBModel(name=f"Q{i}", s_agree=1, agree=2, middle=3, disagree=4, s_disagree=5)
+                for i in range(questions)
+            ],
+        )
+        if questions is not None
+        else None
+    )
+    return CourseDBModel(
+        category="CSSE",
+        code=code,
+        name=f"Course {code}",
+        description="",
+        level=CourseLevel.UNDERGRADUATE,
+        num_units=2,
+        incompatible=None,
+        prerequisite={"kind": "atomic", "value": "CSSE1001"},
+        active=True,
+        semesters_str="Semester 1",
+        attendance_mode=CourseMode.IN_PERSON,
+        faculty="EAIT",
+        school="ITEE",
+        duration=1,
+        offerings=[
+            CourseOfferingDBModel(
+                year=2024 + i, semester=f"Semester 1, {2024 + i}", mode=CourseMode.IN_PERSON, location="St Lucia"
+            )
+            for i in range(offerings)
+        ],
+        secat=secat,
+    )
+
+
+def test_course_rows_link_children_to_parents():
+    """Test that every child row points at its parent's pre-generated id."""
+    rows = course_rows(
+        [make_course("2002", offerings=2, questions=3), make_course("1001", offerings=1, questions=None)]
+    )
+
+    assert list(rows) == [COURSE_TABLE, OFFERING_TABLE, SECAT_TABLE, QUESTION_TABLE]
+    courses, offerings, secats, questions = rows.values()
+    assert [len(courses), len(offerings), len(secats), len(questions)] == [2, 3, 1, 3]
+
+    course_ids = [course["course_id"] for course in courses]
+    assert None not in course_ids
+    assert [offering["course_id"] for offering in offerings] == [course_ids[0], course_ids[0], course_ids[1]]
+    assert secats[0]["course_id"] == course_ids[0]
+    assert {question["secat_id"] for question in questions} == {secats[0]["secat_id"]}
+    assert len({offering["offering_id"] for offering in offerings}) == 3
+
+
+def test_course_rows_skip_generated_columns():
+    """Test that the db generated full code isn't inserted."""
+    (course,) = course_rows([make_course("1001", offerings=0, questions=None)])[COURSE_TABLE]
+
+    assert "full_code" not in course
+    assert course["prerequisite"] == {"kind": "atomic", "value": "CSSE1001"}
+    assert course["category"] == "CSSE"
+
+
+def test_degree_row_from_flat_degree():
+    """Test that a degree row takes its code and year from the flat degree."""
+    details = {"name": "Bachelor of Computer Science", "code": 2451, "year": "2025", "sem": 1}
+
+    row = degree_row(details, "BCompSc", None)
+
+    assert (row["degree_code"], row["year"], row["title"]) == ("2451", 2025, "BCompSc")
+    assert row["details"] is details
+    assert row["degree_id"] is not None
+
+
+def test_unique_rows_keeps_last():
+    """Test that only the last row with the same keys is kept, in first seen order."""
+    rows = [
+        {"degree_code": "2451", "year": 2025, "title": "old"},
+        {"degree_code": "2342", "year": 2025, "title": "other"},
+        {"degree_code": "2451", "year": 2025, "title": "new"},
+    ]
+
+    assert [row["title"] for row in unique_rows(rows, ("degree_code", "year"))] == ["new", "other"]
+
+
+class FakeSession:
+    """Records what's executed, with some courses already in the db under their own ids."""
+
+    def __init__(self, existing: dict[tuple[str, str], UUID]) -> None:
+        """Start with the ids of the courses already in the db."""
+        self.existing = existing
+        self.inserted: dict[str, list[dict[str, Any]]] = {}
+        self.deleted: list[str] = []
+
+    async def execute(self, stmt: Insert | Delete, params: list[dict[str, Any]] | None = None) -> list | None:
+        """Record the statement, returning what an upsert would."""
+        if isinstance(stmt, Delete):
+            self.deleted.append(stmt.table.name)
+            return None
+        self.inserted.setdefault(stmt.table.name, []).extend(params or [])
+        if isinstance(stmt, PgInsert):
+            # an upsert returns existing rows' ids, in no particular order
+            return [
+                (row["category"], row["code"], self.existing.get((row["category"], row["code"]), row["course_id"]))
+                for row in reversed(params or [])
+            ]
+        return None
+
+
+def test_upsert_courses_points_children_at_existing_ids():
+    """Test that children of courses already in the db are inserted under the existing course's id."""
+    existing_id = uuid4()
+    session = FakeSession({("CSSE", "1001"): existing_id})
+    rows = course_rows(
+        [make_course("1001", offerings=2, questions=1), make_course("2002", offerings=1, questions=None)]
+    )
+    new_id = rows[COURSE_TABLE][1]["course_id"]
+
+    asyncio.run(upsert_courses(session, rows))  # type: ignore[arg-type]
+
+    assert [offering["course_id"] for offering in session.inserted["course_offering"]] == [
+        existing_id,
+        existing_id,
+        new_id,
+    ]
+    assert [secat["course_id"] for secat in session.inserted["course_secat"]] == [existing_id]
+    assert len(session.inserted["course_secat_quesions"]) == 1
+    assert session.deleted == ["course_secat_quesions", "course_secat", "course_offering"]
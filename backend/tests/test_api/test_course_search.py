@@ -0,0 +1,46 @@
+"""Tests for the course search index."""
+
+import pytest
+
+from api.course.search import CourseSearchIndex
+
+COURSES = [
+    ("CSSE2310", "Computer Systems Principles and Programming", "Operating systems, C programming and networks."),
+    ("CSSE2002", "Programming in the Large", "Object oriented programming in Java."),
+    ("CSSE1001", "Introduction to Software Engineering", "Introductory programming in Python."),
+    ("COMP3301", "Operating Systems Architecture", "Kernel design and operating systems internals."),
+    ("MATH1061", "Discrete Mathematics", "Logic, sets and proofs."),
+]
+
+
+@pytest.fixture
+def index() -> CourseSearchIndex:
+    result = CourseSearchIndex()
+    result.build(COURSES)
+    return result
+
+
+def test_code_prefix(index: CourseSearchIndex):
+    codes = [code for code, _, _ in index.search("CSSE2", 10)]
+    assert sorted(codes) == ["CSSE2002", "CSSE2310"]
+
+
+def test_exact_code_ranked_first(index: CourseSearchIndex):
+    assert index.search("csse2310", 10)[0][0] == "CSSE2310"
+
+
+def test_all_terms_must_match(index: CourseSearchIndex):
+    codes = [code for code, _, _ in index.search("operating systems", 10)]
+    assert codes[0] == "COMP3301"  # in the name beats only in the description
+    assert "CSSE2310" in codes
+    assert "MATH1061" not in codes
+
+
+def test_word_prefix_and_limit(index: CourseSearchIndex):
+    assert len(index.search("program", 10)) == 3
+    assert len(index.search("program", 2)) == 2
+
+
+def test_no_match(index: CourseSearchIndex):
+    assert index.search("biology", 10) == []
+    assert index.search("  ", 10) == []
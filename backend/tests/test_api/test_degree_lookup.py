@@ -0,0 +1,50 @@
+"""Tests for the degree reverse lookup index."""
+
+from uuid import uuid4
+
+import pytest
+
+from api.degree.lookup import DegreeEntry, DegreeLookupIndex
+
+
+def _sr(sr_type: str, n: int, codes: list[str], part: str = "A") -> dict:
+    return {"type": sr_type, "part": part, "n": n, "options": [{"code": code} for code in codes]}
+
+
+@pytest.fixture
+def index() -> DegreeLookupIndex:
+    result = DegreeLookupIndex()
+    result.build(
+        [
+            (
+                DegreeEntry(uuid4(), "2451", 2024, "Bachelor of Computer Science"),
+                {"srs": [_sr("SR1", 4, ["CSSE1001", "CSSE2002"]), _sr("SR3", 4, ["CSSE2310", "COMP3301", "MATH1061"])]},
+            ),
+            (
+                DegreeEntry(uuid4(), "2030", 2024, "Bachelor of Arts"),
+                {"srs": [_sr("SR3", 8, ["HIST1001", "MATH1061"]), {"type": "SR6", "part": "B", "options": []}]},
+            ),
+        ]
+    )
+    return result
+
+
+def test_ranked_by_coverage(index: DegreeLookupIndex):
+    matches = index.rank({"CSSE1001": 2, "CSSE2002": 2, "MATH1061": 2}, 10)
+
+    assert [m.degree.degree_code for m in matches] == ["2451", "2030"]
+    assert matches[0].percentage == 75  # all 4 units of the first rule, 2 of 4 of the second
+    assert (matches[0].rules_met, matches[0].rules_total) == (1, 2)
+    assert matches[1].percentage == 25
+    assert matches[1].rules_total == 1  # program rules aren't counted
+
+
+def test_units_capped_per_rule(index: DegreeLookupIndex):
+    matches = index.rank({"CSSE2310": 2, "COMP3301": 2, "MATH1061": 2}, 10)
+    assert matches[0].degree.degree_code == "2451"
+    assert matches[0].percentage == 50
+
+
+def test_unrelated_courses_and_limit(index: DegreeLookupIndex):
+    assert index.rank({"BIOL1040": 2}, 10) == []
+    assert len(index.rank({"MATH1061": 2}, 1)) == 1
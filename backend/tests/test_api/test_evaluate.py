@@ -0,0 +1,60 @@
+"""Tests for evaluating plans in worker processes."""
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+from serde import to_dict
+
+from api.plan.evaluate import DegreeLoadError, PlanInputs, ValidationPool, evaluate_plan, reevaluate_plan
+from degree.degree import Degree
+from degree.sr_rule import SR1
+from degree.validate_result import Status
+from helpers import course_ref
+
+
+def _details() -> dict:
+    degree = Degree.build()
+    degree.srs = [
+        SR1(part="A", n=2, options=[course_ref("CSSE1001")]),
+        SR1(part="B", n=2, options=[course_ref("MATH1061")]),
+    ]
+    return to_dict(degree)
+
+
+def _inputs(courses: list[str]) -> PlanInputs:
+    return PlanInputs("plan", {(2025, 1): courses}, {}, courses, "2451", {}, dict.fromkeys(courses, 2))
+
+
+def test_evaluate_plan():
+    degree_id, details = uuid4(), _details()
+
+    results = evaluate_plan(_inputs(["CSSE1001"]), degree_id, details)
+    assert [result.status for result in results] == [Status.OK, Status.ERROR]
+
+    revalidated = reevaluate_plan(
+        _inputs(["CSSE1001", "MATH1061"]), degree_id, details, None, results, {"MATH1061"}, False
+    )
+    assert [result.status for result in revalidated] == [Status.OK, Status.OK]
+
+
+def test_evaluate_plan_bad_degree():
+    with pytest.raises(DegreeLoadError):
+        evaluate_plan(_inputs(["CSSE1001"]), uuid4(), {"code": "2451"})
+
+
+def test_validation_pool_runs_in_workers():
+    """Test that plans are evaluated in a worker process, and errors come back to the caller."""
+    pool = ValidationPool(1)
+    degree_id, details = uuid4(), _details()
+
+    async def run() -> None:
+        results = await pool.run(evaluate_plan, _inputs(["MATH1061"]), degree_id, details)
+        assert [result.status for result in results] == [Status.ERROR, Status.OK]
+        with pytest.raises(DegreeLoadError):
+            await pool.run(evaluate_plan, _inputs(["MATH1061"]), uuid4(), {})
+
+    try:
+        asyncio.run(run())
+    finally:
+        pool.shutdown()
@@ -0,0 +1,91 @@
+"""Tests for plan.py."""
+
+from api.plan.plan import DEFAULT_COURSE_UNITS, PlanIndex
+from degree.aux_rule import AR1, AR7, AR9
+from degree.interner import course_interner
+from degree.sr_rule import SR1, SR3
+from degree.validate_result import Status
+from helpers import course_ref, make_plan
+
+
+def test_index_totals():
+    index = PlanIndex(["CSSE1001", "CSSE2310", "MATH1061", "CSSE2310"], {"CSSE2310": 4})
+
+    assert index.codes == {"CSSE1001", "CSSE2310", "MATH1061"}
+    assert index.units_of("CSSE2310") == 4
+    assert index.units_of("MATH1061") == DEFAULT_COURSE_UNITS
+    assert index.level_units == {1: 4, 2: 4}
+    assert index.discipline_units == {"CSSE": 6, "MATH": 2}
+    assert index.units_at_level(1, or_higher=True) == 8
+    assert index.courses_at_level(2) == ["CSSE2310"]
+
+
+def test_index_invalid_level():
+    index = PlanIndex(["CSSE1001", "ABC"])
+    assert index.invalid_level == ["ABC"]
+
+
+def test_sr_uses_course_units():
+    rule = SR3(part="A", n=4, options=[course_ref("CSSE2310"), course_ref("CSSE2002")])
+
+    assert rule.validate(make_plan(["CSSE2310"])).status == Status.ERROR
+    assert rule.validate(make_plan(["CSSE2310"], {"CSSE2310": 4})).status == Status.OK
+
+
+def test_level_rule():
+    rule = AR1(part="A", n=4, level=2)
+
+    assert rule.validate(make_plan(["CSSE1001", "CSSE2310", "COMP3506"])).status == Status.OK
+    assert rule.validate(make_plan(["CSSE1001", "CSSE2310"])).status == Status.ERROR
+
+
+def test_discipline_rule():
+    rule = AR7(part="A", n=4)
+
+    result = rule.validate(make_plan(["CSSE1001", "CSSE2310", "CSSE2002", "MATH1061"]))
+    assert result.status == Status.ERROR
+    assert result.relevant == ["CSSE1001", "CSSE2310", "CSSE2002"]
+
+
+def test_no_credit_rule():
+    rule = AR9(part="A", course_list=[course_ref("CSSE1001"), course_ref("INFS1200")])
+
+    result = rule.validate(make_plan(["CSSE1001", "CSSE2310"]))
+    assert result.status == Status.ERROR
+    assert result.relevant == ["CSSE1001"]
+
+
+def test_index_bitsets():
+    course_interner.intern_all(["CSSE1001", "CSSE2310", "MATH1061", "COMP3301"])
+    index = PlanIndex(["CSSE1001", "CSSE2310", "MATH1061"], {"CSSE2310": 4})
+    options = course_interner.mask(["CSSE2310", "MATH1061", "COMP3301"])
+
+    assert index.units_in(options) == 6
+    assert course_interner.codes(index.missing(options)) == ["COMP3301"]
+
+
+def test_index_keeps_unknown_courses_out_of_the_interner():
+    interned = len(course_interner)
+    index = PlanIndex(["CSSE1001", "FAKE9001", "FAKE9002"], {"FAKE9002": 4})
+
+    assert len(course_interner) == interned
+    assert index.overflow == {"FAKE9001", "FAKE9002"}
+    assert index.units_in(0, frozenset({"FAKE9002", "FAKE9003"})) == 4
+    assert index.has_all(0, frozenset({"FAKE9001"}))
+    assert not index.has_all(0, frozenset({"FAKE9003"}))
+
+
+def test_sr_options_bitset():
+    rule = SR1(part="A", n=4, options=[course_ref("CSSE1001"), course_ref("CSSE2002")])
+
+    result = rule.validate(make_plan(["CSSE1001", "MATH1061"]))
+    assert result.status == Status.ERROR
+    assert result.relevant == ["CSSE2002"]
+    assert rule.validate(make_plan(["CSSE2002", "CSSE1001"])).status == Status.OK
+
+
+def test_sr_options_not_in_the_catalogue():
+    rule = SR1(part="A", n=4, options=[course_ref("FAKE9001"), course_ref("FAKE9002")])
+
+    assert rule.validate(make_plan(["FAKE9001"])).relevant == ["FAKE9002"]
+    assert rule.validate(make_plan(["FAKE9002", "FAKE9001"])).status == Status.OK
@@ -0,0 +1,283 @@
+"""Tests for the plans service."""
+
+import asyncio
+import re
+from collections.abc import AsyncGenerator, Callable, Iterable
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from serde import to_dict
+from sqlalchemy import Select
+from sqlalchemy.dialects import postgresql
+
+from api.database.service import get_db as service_get_db
+from api.degree.models import DegreeDBModel
+from api.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from api.plan import routes, service
+from api.plan.model import PlanDBModel
+from api.plan.schemas import PlanCreateUpdate
+from degree import cache
+from degree.compiled import hash_degree_details
+from degree.degree import Degree
+from degree.sr_rule import SR1
+from degree.validate_result import Status
+from helpers import course_ref
+
+
+class InlinePool:
+    """Runs validation straight away in this process, see test_evaluate for the real pool."""
+
+    async def run[T](self, fn: Callable[..., T], *args: object) -> T:
+        """Run the function, as the real pool would on a worker."""
+        return fn(*args)
+
+
+def _degree(details: dict | None = None) -> DegreeDBModel:
+    if details is None:
+        degree = Degree.build()
+        degree.srs = [SR1(part="A", n=2, options=[course_ref("CSSE1001")])]
+        details = to_dict(degree)
+    return DegreeDBModel(degree_id=uuid4(), degree_code="2451", year=2025, title="", details=details)
+
+
+def _saved(degree: DegreeDBModel, courses: list[str]) -> PlanDBModel:
+    return PlanDBModel(
+        plan_id=uuid4(),
+        degree_id=degree.degree_id,
+        degree=degree,
+        name="plan",
+        start_year=2025,
+        start_sem=1,
+        end_year=2025,
+        course_dates={(2025, 1): courses},
+        course_reqs={},
+        specialisations={},
+    )
+
+
+def _unsaved(degree_id: UUID, courses: list[str]) -> PlanCreateUpdate:
+    return PlanCreateUpdate(
+        degree_id=degree_id,
+        name="plan",
+        start_year=2025,
+        start_sem=1,
+        end_year=2025,
+        course_dates={(2025, 1): courses},
+        course_reqs={},
+        specialisations={},
+    )
+
+
+@pytest.fixture
+def db(monkeypatch: pytest.MonkeyPatch) -> dict:
+    """Saved plans and degrees the service's lookups find, by id."""
+    found: dict = {"plans": {}, "degrees": {}}
+
+    async def get_plans_by_ids(_: object, plan_ids: Iterable[UUID]) -> dict:
+        return {plan_id: found["plans"][plan_id] for plan_id in plan_ids if plan_id in found["plans"]}
+
+    async def get_degrees_by_ids(_: object, degree_ids: Iterable[UUID]) -> dict:
+        return {degree_id: found["degrees"][degree_id] for degree_id in degree_ids if degree_id in found["degrees"]}
+
+    async def get_courses_by_full_codes(_: object, __: Iterable[str]) -> dict:
+        return {}
+
+    monkeypatch.setattr(service, "get_plans_by_ids", get_plans_by_ids)
+    monkeypatch.setattr(service, "get_degrees_by_ids", get_degrees_by_ids)
+    monkeypatch.setattr(service, "get_courses_by_full_codes", get_courses_by_full_codes)
+    monkeypatch.setattr(service, "validation_pool", InlinePool())
+    return found
+
+
+class QuerySession:
+    """Keeps the query it's asked to run, finding nothing."""
+
+    query: Select | None = None
+
+    async def execute(self, query: Select) -> "QuerySession":
+        """Keep the query."""
+        self.query = query
+        return self
+
+    def scalars(self) -> "QuerySession":
+        """No plans."""
+        return self
+
+    def unique(self) -> "QuerySession":
+        """No plans."""
+        return self
+
+    def all(self) -> list:
+        """No plans."""
+        return []
+
+
+def _get_plans_query(**filters: object) -> tuple[str, list]:
+    """The SQL get_plans runs for the filters, with ? for each parameter, and the parameters."""
+    session = QuerySession()
+    assert asyncio.run(service.get_plans(session, **filters)) == []  # type: ignore[arg-type]
+    compiled = session.query.compile(dialect=postgresql.dialect())  # type: ignore[union-attr]
+    sql = re.sub(r"%\(\w+\)s(::\w+)?", "?", " ".join(str(compiled).split()))
+    # everything after the plans (and their joined degrees) are selected
+    _, _, sql = sql.partition(" FROM plan LEFT OUTER JOIN degree AS degree_1 ON degree_1.degree_id = plan.degree_id")
+    return sql, list(compiled.params.values())
+
+
+def test_get_plans_unfiltered():
+    assert _get_plans_query() == (" ORDER BY plan.plan_id", [])
+
+
+def test_get_plans_filters():
+    degree_id, after = uuid4(), uuid4()
+
+    assert _get_plans_query(degree_id=degree_id) == (" WHERE plan.degree_id = ? ORDER BY plan.plan_id", [degree_id])
+
+    sql, params = _get_plans_query(degree_code="2451")
+    assert sql == (
+        " WHERE EXISTS (SELECT 1 FROM degree WHERE degree.degree_id = plan.degree_id AND degree.degree_code = ?)"
+        " ORDER BY plan.plan_id"
+    )
+    assert params == ["2451"]
+
+    sql, params = _get_plans_query(degree_id=degree_id, degree_code="2451", after=after)
+    assert sql.startswith(" WHERE plan.degree_id = ? AND (EXISTS (SELECT 1 FROM degree")
+    assert sql.endswith(") AND plan.plan_id > ? ORDER BY plan.plan_id")
+    assert params == [degree_id, "2451", after]
+
+
+def test_get_plans_page():
+    """Test that a page continues after the cursor, in id order, up to the limit."""
+    after = uuid4()
+    assert _get_plans_query(after=after, limit=50) == (
+        " WHERE plan.plan_id > ? ORDER BY plan.plan_id LIMIT ?",
+        [after, 50],
+    )
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    """The plan routes, over 5 saved plans."""
+    degree = _degree()
+    plans = sorted((_saved(degree, []) for _ in range(5)), key=lambda plan: plan.plan_id)
+
+    async def get_plans(_: object, __: object, ___: object, after: UUID | None, limit: int | None) -> list:
+        page = [plan for plan in plans if after is None or plan.plan_id > after]
+        return page[:limit]
+
+    async def get_db() -> AsyncGenerator[None]:
+        yield None
+
+    monkeypatch.setattr(routes, "get_plans", get_plans)
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/plan")
+    app.dependency_overrides[service_get_db] = get_db
+    return TestClient(app)
+
+
+def test_get_all_page_bounds(client: TestClient):
+    """Test that pages must hold between 1 and MAX_PAGE_SIZE plans."""
+    assert client.get("/plan", params={"limit": 0, "validate": False}).status_code == 422
+    assert client.get("/plan", params={"limit": MAX_PAGE_SIZE + 1, "validate": False}).status_code == 422
+    assert client.get("/plan", params={"limit": MAX_PAGE_SIZE, "validate": False}).status_code == 200
+
+
+def test_get_all_pages(client: TestClient):
+    """Test that full pages give the cursor of the next one, and the last page doesn't."""
+    first = client.get("/plan", params={"limit": 3, "validate": False})
+    cursor = first.headers[NEXT_CURSOR_HEADER]
+    assert cursor == first.json()[-1]["plan_id"]
+
+    rest = client.get("/plan", params={"limit": 3, "after": cursor, "validate": False})
+    assert len(rest.json()) == 2
+    assert NEXT_CURSOR_HEADER not in rest.headers
+    assert NEXT_CURSOR_HEADER not in client.get("/plan", params={"validate": False}).headers
+
+
+def _validate_batch(plan_ids: list[UUID], plans_in: list[PlanCreateUpdate]) -> list[dict]:
+    async def collect() -> list[dict]:
+        return [item async for item in service.validate_batch(None, plan_ids, plans_in)]  # type: ignore[arg-type]
+
+    return asyncio.run(collect())
+
+
+def _statuses(item: dict) -> list[Status]:
+    return [Status(result["status"]) for result in item["results"]]
+
+
+def test_validate_batch_saved_plans(db: dict):
+    """Test that repeated ids are validated once, missing ones get an error, and fresh results are stored."""
+    degree = _degree()
+    plan = _saved(degree, ["CSSE1001"])
+    db["plans"][plan.plan_id] = plan
+    missing = uuid4()
+
+    items = _validate_batch([plan.plan_id, missing, plan.plan_id], [])
+
+    assert items[0] == {"plan_id": str(missing), "error": f"Plan under id '{missing}' could not be found."}
+    assert len(items) == 2
+    assert items[1]["plan_id"] == str(plan.plan_id)
+    assert _statuses(items[1]) == [Status.OK]
+    assert service.get_stored_validation(plan) is not None
+
+
+def test_validate_batch_reuses_stored_results(db: dict):
+    """Test that up to date stored results are yielded straight away, before anything is validated."""
+    degree = _degree()
+    stored, stale = _saved(degree, ["CSSE1001"]), _saved(degree, [])
+    db["plans"] |= {stored.plan_id: stored, stale.plan_id: stale}
+    db["degrees"][degree.degree_id] = degree
+    service._store_validation(stored, [])  # noqa: SLF001
+
+    items = _validate_batch([stale.plan_id, stored.plan_id], [_unsaved(degree.degree_id, ["CSSE1001"])])
+
+    assert items[0] == {"plan_id": str(stored.plan_id), "results": []}
+    assert {item.get("plan_id", item.get("index")) for item in items[1:]} == {str(stale.plan_id), 0}
+    assert all("results" in item for item in items[1:])
+
+
+def test_validate_batch_unsaved_plan_errors(db: dict):
+    """Test that an unsaved plan's problems are reported against its index without failing the others."""
+    good, broken = _degree(), _degree({"code": "2451"})
+    db["degrees"] |= {good.degree_id: good, broken.degree_id: broken}
+    unknown = uuid4()
+
+    items = _validate_batch(
+        [],
+        [
+            _unsaved(unknown, ["CSSE1001"]),
+            _unsaved(broken.degree_id, ["CSSE1001"]),
+            _unsaved(good.degree_id, []),
+        ],
+    )
+    by_index = {item["index"]: item for item in items}
+
+    assert items[0]["index"] == 0
+    assert by_index[0]["error"] == f"The degree with the id '{unknown}' can not be found"
+    assert by_index[1]["error"] == "The plan's degree could not be loaded."
+    assert _statuses(by_index[2]) == [Status.ERROR]
+
+
+def test_degree_hashed_once_per_call(db: dict, monkeypatch: pytest.MonkeyPatch):
+    """Test that plans sharing a degree only have its details hashed once, here or in the worker."""
+    hashed = []
+
+    def counting_hash(details: dict) -> str:
+        hashed.append(details)
+        return hash_degree_details(details)
+
+    monkeypatch.setattr(service, "hash_degree_details", counting_hash)
+    monkeypatch.setattr(cache, "hash_degree_details", counting_hash)
+    degree = _degree()
+    plans = [_saved(degree, ["CSSE1001"]) for _ in range(3)]
+    db["plans"] |= {plan.plan_id: plan for plan in plans}
+
+    validated = asyncio.run(service.get_validations(None, plans))  # type: ignore[arg-type]
+    assert len(hashed) == 1
+
+    assert asyncio.run(service.get_validations(None, plans)) == validated  # type: ignore[arg-type]
+    assert len(hashed) == 2
+
+    _validate_batch([plan.plan_id for plan in plans], [_unsaved(degree.degree_id, ["CSSE1001"])])
+    assert len(hashed) == 3
@@ -0,0 +1,56 @@
+"""Tests for the prerequisite graph."""
+
+import pytest
+
+from api.course.prereqs import PrerequisiteGraph, requirement_codes
+from helpers import atomic
+
+
+@pytest.fixture
+def graph() -> PrerequisiteGraph:
+    result = PrerequisiteGraph()
+    result.build(
+        [
+            ("CSSE1001", None, None),
+            ("CSSE2002", atomic("CSSE1001"), None),
+            (
+                "CSSE2310",
+                {"kind": "and", "value": [atomic("CSSE2002"), {"kind": "or", "value": [atomic("CSSE1000")]}]},
+                atomic("CSSE2301"),
+            ),
+            ("COMP3301", atomic("CSSE2310"), None),
+        ]
+    )
+    return result
+
+
+def test_requirement_codes():
+    requirement = {"kind": "or", "value": [atomic("csse1001"), atomic("Part A"), {"kind": "other", "value": "x"}]}
+    assert list(requirement_codes(requirement)) == ["CSSE1001"]
+    assert list(requirement_codes(None)) == []
+
+
+def test_requires(graph: PrerequisiteGraph):
+    assert graph.requires("COMP3301") == ["CSSE2310"]
+    assert graph.requires("COMP3301", transitive=True) == ["CSSE1000", "CSSE1001", "CSSE2002", "CSSE2310"]
+    assert graph.requires("CSSE1001", transitive=True) == []
+
+
+def test_unlocks(graph: PrerequisiteGraph):
+    assert graph.unlocks("CSSE1001") == ["CSSE2002"]
+    assert graph.unlocks("CSSE1001", transitive=True) == ["COMP3301", "CSSE2002", "CSSE2310"]
+    assert "CSSE1001" in graph
+    assert "CSSE1000" not in graph  # only a prerequisite, not in the catalogue
+
+
+def test_incompatible(graph: PrerequisiteGraph):
+    assert graph.incompatible("CSSE2310") == atomic("CSSE2301")
+    assert graph.incompatible("CSSE1001") is None
+
+
+def test_cycles():
+    graph = PrerequisiteGraph()
+    graph.build([("AAAA1000", atomic("BBBB1000"), None), ("BBBB1000", atomic("AAAA1000"), None)])
+
+    assert graph.requires("AAAA1000", transitive=True) == ["BBBB1000"]
+    assert graph.requires("BBBB1000", transitive=True) == ["AAAA1000"]
@@ -0,0 +1,57 @@
+"""Tests for course recommendations."""
+
+import datetime as dt
+from typing import NamedTuple
+
+from api.plan.recommend import current_semester, rank_courses
+
+
+class _Row(NamedTuple):
+    name: str
+    score: float | None
+    semesters_str: str | None
+
+
+COURSES = {
+    "COMP3301": _Row("Operating Systems Architecture", 4.5, "Semester 1"),
+    "COMP3506": _Row("Algorithms and Data Structures", 2.5, "Semester 2"),
+    "DECO3801": _Row("Design Computing Studio 3", None, "Semester 2"),
+}
+
+
+def _rank(**kwargs: object) -> list[str]:
+    args = {
+        "candidates": COURSES,
+        "unmet_counts": dict.fromkeys(COURSES, 1),
+        "courses": COURSES,
+        "prerequisites": {},
+        "plan_courses": frozenset(),
+        "remaining_sems": frozenset({1, 2}),
+        "limit": 10,
+    } | kwargs
+    return [rec.full_code for rec in rank_courses(**args)]  # type: ignore[arg-type]
+
+
+def test_secat_breaks_ties():
+    assert _rank() == ["COMP3301", "DECO3801", "COMP3506"]
+
+
+def test_more_unmet_rules_first():
+    assert _rank(unmet_counts={"COMP3506": 2})[0] == "COMP3506"
+
+
+def test_availability_and_prereqs():
+    assert _rank(remaining_sems=frozenset({2}))[-1] == "COMP3301"
+
+    prerequisites = {"DECO3801": {"kind": "atomic", "value": "DECO2500"}}
+    assert _rank(prerequisites=prerequisites)[-1] == "DECO3801"
+    assert _rank(prerequisites=prerequisites, plan_courses=frozenset({"DECO2500"}))[1] == "DECO3801"
+
+
+def test_limit():
+    assert len(_rank(limit=2)) == 2
+
+
+def test_current_semester():
+    assert current_semester(dt.date(2025, 3, 1)) == (2025, 1)
+    assert current_semester(dt.date(2025, 8, 1)) == (2025, 2)
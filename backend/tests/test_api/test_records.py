@@ -0,0 +1,180 @@
+"""Tests for reading the seed data files."""
+
+import hashlib
+import os
+from pathlib import Path
+
+import orjson
+import pytest
+
+from api.database import records
+from api.database.records import convert_degree_record, iter_records, load_degrees_from_file, record_hash
+
+RECORDS = [{"code": "CSSE1001"}, {"code": "CSSE2002"}]
+
+
+def _payload(part: str | None, title: str, rule_logic: str | None = None, body: tuple = ()) -> dict:
+    header = {
+        "partUID": None,
+        "ruleLogic": rule_logic,
+        "partReference": part,
+        "unitsMin": None,
+        "auxiliaryRules": [],
+        "title": title,
+        "summaryDescription": None,
+        "partType": None,
+        "unitsMax": None,
+        "notes": None,
+        "selectionRule": None,
+    }
+    return {"rowType": None, "header": header, "body": list(body)}
+
+
+def _degree_record(code: str, year: str) -> dict:
+    """A scraped year of a program, with a part A met by either of its two streams."""
+    streams = (_payload("A.1", "Stream 1"), _payload("A.2", "Stream 2"))
+    component = {
+        "internalComponentIdentifier": 1,
+        "componentIntegrationIdentifier": "",
+        "name": "",
+        "type": "",
+        "payload": _payload(None, "Program", "A", (_payload("A", "Core", "A.1 or A.2", streams),)),
+    }
+    requirements = {
+        "code": code,
+        "type": "",
+        "orgParent": "",
+        "authorLastName": "",
+        "subtype": "",
+        "orgCode": "",
+        "state": "",
+        "orgName": "",
+        "workflowName": "",
+        "editDate": "",
+        "previousState": "",
+        "templateName": "",
+        "templateIntegrationIdentifier": "",
+        "authorGivenName": "",
+        "name": "",
+        "applicablePeriod": None,
+        "publishInstanceID": None,
+        "unitsMaximum": None,
+        "unitsMinimum": None,
+        "swaggerVersion": None,
+        "coPDF": {},
+        "baseVersion": {},
+        "version": {},
+        "externalSystemIdentifiers": [],
+        "yearApplied": year,
+        "templateVersion": 1,
+        "payload": {"components": [component]},
+    }
+    return {
+        "title": f"Program {code}",
+        "params": {"type": "program", "code": code, "year": year},
+        "status": {"noLongerOffered": False, "alternate": None, "domestic": {"suspension": False, "available": True}},
+        "programRequirements": requirements,
+        "yearOptions": [year],
+        "routes": {},
+    }
+
+
+def test_iter_records_streams_jsonl(tmp_path: Path):
+    """Test that a .jsonl file beside the JSON one is read instead, a line at a time."""
+    path = tmp_path / "courses.json"
+    path.write_bytes(b"not read")
+    (tmp_path / "courses.jsonl").write_bytes(b"".join(orjson.dumps(record) + b"\n" for record in RECORDS) + b"\n")
+
+    assert list(iter_records(path, "courses")) == RECORDS
+
+
+def test_iter_records_ignores_stale_jsonl(tmp_path: Path):
+    """Test that a .jsonl file older than the JSON one isn't trusted."""
+    path = tmp_path / "courses.json"
+    path.write_bytes(orjson.dumps({"courses": RECORDS}))
+    jsonl_path = tmp_path / "courses.jsonl"
+    jsonl_path.write_bytes(orjson.dumps({"code": "OLD1001"}) + b"\n")
+    modified = path.stat().st_mtime
+    os.utime(jsonl_path, (modified - 60, modified - 60))
+
+    assert list(iter_records(path, "courses")) == RECORDS
+
+
+def test_iter_records_falls_back_to_json(tmp_path: Path):
+    """Test that without a .jsonl file the records come from the JSON document."""
+    keyed, listed = tmp_path / "courses.json", tmp_path / "plans.json"
+    keyed.write_bytes(orjson.dumps({"courses": RECORDS}))
+    listed.write_bytes(orjson.dumps(RECORDS))
+
+    assert list(iter_records(keyed, "courses")) == RECORDS
+    assert list(iter_records(listed)) == RECORDS
+
+
+def test_record_hash_ignores_key_order():
+    """Test that a record hashes the same however its keys are ordered, and differently when changed."""
+    record = {"code": "CSSE1001", "units": 2, "offerings": [{"year": 2025}]}
+
+    assert record_hash(record) == record_hash({"offerings": [{"year": 2025}], "units": 2, "code": "CSSE1001"})
+    assert record_hash(record) != record_hash(record | {"units": 4})
+    assert record_hash(record) != record_hash(record, b"salt")
+
+
+def test_record_hash_changes_with_transform_version(monkeypatch: pytest.MonkeyPatch):
+    """Test that bumping the transform version changes every record's hash, so they're all synced again."""
+    record = {"code": "CSSE1001"}
+    before = record_hash(record)
+
+    monkeypatch.setattr(records, "TRANSFORM_VERSION", records.TRANSFORM_VERSION + 1)
+
+    assert record_hash(record) != before
+
+
+def test_convert_degree_record():
+    """Test that a scraped program year is flattened, keeping which part each rule logic belongs to."""
+    details = convert_degree_record(_degree_record("2451", "2025"))
+
+    assert details is not None
+    assert (details["code"], details["year"], details["name"]) == ("2451", "2025", "Program 2451")
+    assert details["part_references"] == {"A": "Core", "A.1": "Stream 1", "A.2": "Stream 2"}
+    assert details["part_logic"] == {"": "A", "A": "A.1 or A.2"}
+
+
+def test_load_degrees_from_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that programs and plans are converted in worker processes, skipping unchanged and unknown ones."""
+    programs = {"2451": _degree_record("2451", "2025"), "9999": _degree_record("9999", "2025")}
+    unchanged = _degree_record("2451", "2024")
+    plans = [{"data": {"2025": _degree_record("CSSEX2451", "2025")}}]
+    meta = [{"program_id": "2451", "title": "Computer Science", "url": "https://example.com/2451"}]
+
+    for name, path in {
+        "DEGREES_FILE": tmp_path / "program_details.json",
+        "PLANS_FILE": tmp_path / "plans.json",
+        "DEGREES_META_FILE": tmp_path / "program_meta.json",
+    }.items():
+        monkeypatch.setattr(records, name, path)
+    records.DEGREES_FILE.write_bytes(
+        orjson.dumps(
+            {
+                "program_details": [
+                    {"data": {"2025": programs["2451"], "2024": unchanged}},
+                    {"data": {"2025": programs["9999"]}},
+                ]
+            }
+        )
+    )
+    records.PLANS_FILE.write_bytes(orjson.dumps(plans))
+    records.DEGREES_META_FILE.write_bytes(orjson.dumps(meta))
+    meta_salt = hashlib.sha256(records.DEGREES_META_FILE.read_bytes()).digest()
+
+    rows = [
+        row for chunk in load_degrees_from_file({record_hash(unchanged, meta_salt)}, max_workers=1) for row in chunk
+    ]
+
+    # 9999 isn't in the meta file, and plans have no meta at all
+    assert [(row["degree_code"], row["year"], row["title"]) for row in rows] == [
+        ("2451", 2025, "Computer Science"),
+        ("CSSEX2451", 2025, "CSSEX2451"),
+    ]
+    assert rows[0]["degree_url"] == "https://example.com/2451"
+    assert rows[0]["content_hash"] == record_hash(programs["2451"], meta_salt)
+    assert rows[0]["details"]["part_logic"] == {"": "A", "A": "A.1 or A.2"}
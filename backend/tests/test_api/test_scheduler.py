@@ -0,0 +1,92 @@
+"""Tests for the semester scheduler."""
+
+import asyncio
+
+from api.plan.evaluate import ValidationPool
+from api.plan.scheduler import ScheduleCourse, Scheduler, offered_semesters, plan_semesters, schedule
+from helpers import atomic
+
+BOTH = frozenset({1, 2})
+
+
+def test_offered_semesters():
+    assert offered_semesters("Semester 1,Summer Semester") == {1}
+    assert offered_semesters(None) == {1, 2}
+    assert offered_semesters("Research Quarter 1") == {1, 2}
+
+
+def test_plan_semesters():
+    assert plan_semesters(2024, 2, 2025) == [(2024, 2), (2025, 1), (2025, 2)]
+
+
+def test_prerequisites_and_offerings():
+    courses = {
+        "CSSE2310": ScheduleCourse(2, frozenset({1}), atomic("CSSE2002")),
+        "CSSE2002": ScheduleCourse(2, BOTH, atomic("CSSE1001")),
+        "CSSE1001": ScheduleCourse(2, BOTH, None),
+    }
+    result = Scheduler(courses, plan_semesters(2024, 1, 2025)).solve()
+
+    assert result.complete
+    assert result.course_dates == {(2024, 1): ["CSSE1001"], (2024, 2): ["CSSE2002"], (2025, 1): ["CSSE2310"]}
+
+
+def test_unit_cap():
+    courses = {f"COMP{i}000": ScheduleCourse(2, BOTH, None) for i in range(1, 6)}
+    result = Scheduler(courses, plan_semesters(2024, 1, 2024), max_units=4).solve()
+
+    assert not result.complete
+    assert len(result.unscheduled) == 1
+    assert all(len(codes) == 2 for codes in result.course_dates.values())
+
+
+def test_backtracks_for_offerings():
+    # greedily putting MATH1061 in semester 1 would leave no room for the semester 1 only course
+    courses = {
+        "MATH1061": ScheduleCourse(2, BOTH, None),
+        "MATH1051": ScheduleCourse(2, frozenset({1}), None),
+    }
+    result = Scheduler(courses, plan_semesters(2024, 1, 2024), max_units=2).solve()
+
+    assert result.complete
+    assert result.course_dates == {(2024, 1): ["MATH1051"], (2024, 2): ["MATH1061"]}
+
+
+def test_prerequisites_outside_plan_assumed():
+    courses = {"CSSE2002": ScheduleCourse(2, BOTH, atomic("CSSE1001"))}
+    result = Scheduler(courses, plan_semesters(2024, 1, 2024)).solve()
+
+    assert result.complete
+    assert result.course_dates == {(2024, 1): ["CSSE2002"]}
+    assert len(result.warnings) == 1
+
+
+def test_long_plans_dont_recurse():
+    """Test that plans longer than the recursion limit can be ordered and searched."""
+    chain = {f"LONG{i:04}": ScheduleCourse(1, BOTH, atomic(f"LONG{i - 1:04}") if i else None) for i in range(1100)}
+    result = Scheduler(chain, plan_semesters(2024, 1, 2024)).solve()
+    assert result.course_dates == {(2024, 1): ["LONG0000"], (2024, 2): ["LONG0001"]}
+    assert result.unscheduled == sorted(chain)[2:]
+
+    courses = {f"WIDE{i:04}": ScheduleCourse(1, BOTH, None) for i in range(1100)}
+    result = Scheduler(courses, plan_semesters(2024, 1, 2024), max_units=1100, time_budget=10).solve()
+
+    assert result.complete
+    assert result.course_dates == {(2024, 1): sorted(courses)}
+
+
+def test_schedule_in_worker():
+    """Test that a schedule can be searched for on a worker process, away from the event loop."""
+    courses = {
+        "CSSE2002": ScheduleCourse(2, BOTH, atomic("CSSE1001")),
+        "CSSE1001": ScheduleCourse(2, BOTH, None),
+    }
+    slots = plan_semesters(2024, 1, 2024)
+    pool = ValidationPool(1, "schedule")
+    try:
+        result = asyncio.run(pool.run(schedule, courses, slots, 4, 1.0))
+    finally:
+        pool.shutdown()
+
+    assert result == Scheduler(courses, slots, 4, 1.0).solve()
+    assert result.course_dates == {(2024, 1): ["CSSE1001"], (2024, 2): ["CSSE2002"]}
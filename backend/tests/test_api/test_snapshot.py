@@ -0,0 +1,102 @@
+"""Tests for the seed snapshot."""
+
+from pathlib import Path
+
+import pytest
+
+from api.course.models import CourseDBModel, CourseOfferingDBModel, CourseSecatDBModel, CourseSecatQuestionsDBModel
+from api.database import snapshot as snapshot_module
+from api.database.bulk import COURSE_TABLE, DEGREE_TABLE, OFFERING_TABLE, course_rows, degree_row, drop_unchanged
+from api.database.snapshot import Snapshot, SnapshotError, open_snapshot, write_snapshot
+from common.enums import CourseLevel, CourseMode
+
+
+@pytest.fixture
+def sources(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """A data file the snapshot is built from."""
+    source = tmp_path / "courses.json"
+    source.write_bytes(b"{}")
+    monkeypatch.setattr(snapshot_module, "SOURCE_FILES", (source,))
+    return source
+
+
+def make_course(code: str, content_hash: str, offerings: int, secat: bool) -> CourseDBModel:
+    return CourseDBModel(
+        category="CSSE",
+        code=code,
+        name=f"Course {code}",
+        level=CourseLevel.UNDERGRADUATE,
+        num_units=2,
+        prerequisite={"kind": "or", "value": [{"kind": "atomic", "value": "CSSE1001"}]},
+        attendance_mode=CourseMode.IN_PERSON,
+        content_hash=content_hash,
+        offerings=[
+            CourseOfferingDBModel(year=2025, semester="Semester 1, 2025", mode=CourseMode.EXTERNAL, location="")
+            for _ in range(offerings)
+        ],
+        secat=CourseSecatDBModel(
+            num_enrolled=10,
+            num_responses=5,
+            response_rate=0.5,
+            questions=[CourseSecatQuestionsDBModel(name="Q", s_agree=1, agree=2, middle=3, disagree=4, s_disagree=5)],
+        )
+        if secat
+        else None,
+    )
+
+
+def make_blocks() -> list:
+    courses = [make_course("1001", "course0", offerings=2, secat=True), make_course("2002", "course1", 0, secat=False)]
+    degrees = [degree_row({"code": 2451, "year": "2025"}, "BCompSc", None, "degree0")]
+    return [course_rows(courses), {DEGREE_TABLE: degrees}, {DEGREE_TABLE: []}]
+
+
+def test_snapshot_round_trip(tmp_path: Path, sources: Path):
+    """Test that the blocks read back are the blocks written, with ids and enums restored."""
+    blocks = make_blocks()
+    path = tmp_path / "seed.snapshot"
+
+    assert write_snapshot(path, blocks) == 7
+
+    with Snapshot(path) as snapshot:
+        assert len(snapshot) == 3
+        assert list(snapshot.blocks()) == blocks
+        offering = snapshot.block(0)[OFFERING_TABLE][0]
+        assert type(offering["mode"]) is CourseMode
+        assert offering["course_id"] == blocks[0][COURSE_TABLE][0]["course_id"]
+
+
+def test_snapshot_rejects_unusable(tmp_path: Path, sources: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that snapshots from another version or older data files aren't used."""
+    path = tmp_path / "seed.snapshot"
+    write_snapshot(path, make_blocks())
+    assert open_snapshot(path) is not None
+
+    sources.write_bytes(b'{"courses": []}')
+    with pytest.raises(SnapshotError, match="older than"):
+        Snapshot(path)
+
+    write_snapshot(path, make_blocks())
+    with monkeypatch.context() as patch:
+        patch.setattr(snapshot_module, "TRANSFORM_VERSION", snapshot_module.TRANSFORM_VERSION + 1)
+        with pytest.raises(SnapshotError, match="other code"):
+            Snapshot(path)
+
+    path.write_bytes(path.read_bytes().replace(b"UQRMSNAP\x01", b"UQRMSNAP\x02", 1))
+    with pytest.raises(SnapshotError, match="version"):
+        Snapshot(path)
+
+    path.write_bytes(b"")
+    assert open_snapshot(path) is None
+    assert open_snapshot(tmp_path / "missing.snapshot") is None
+
+
+def test_drop_unchanged_courses_and_children():
+    """Test that courses already in the db are dropped along with their children."""
+    courses, degrees, _ = make_blocks()
+
+    remaining = drop_unchanged(courses, {"course0"})
+
+    assert [course["code"] for course in remaining[COURSE_TABLE]] == ["2002"]
+    assert all(not rows for table, rows in remaining.items() if table is not COURSE_TABLE)
+    assert drop_unchanged(degrees, {"degree0"}) == {DEGREE_TABLE: []}
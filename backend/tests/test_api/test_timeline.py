@@ -0,0 +1,65 @@
+"""Tests for plan timeline validation."""
+
+import pytest
+
+from api.course.prereqs import PrerequisiteGraph
+from api.plan.timeline import parse_semester_key, requirement_met, validate_timeline
+from degree.validate_result import Status
+from helpers import atomic
+
+
+@pytest.fixture
+def graph() -> PrerequisiteGraph:
+    result = PrerequisiteGraph()
+    result.build(
+        [
+            ("CSSE1001", None, None),
+            ("CSSE2002", atomic("CSSE1001"), None),
+            ("CSSE2310", {"kind": "or", "value": [atomic("CSSE2002"), atomic("CSSE1000")]}, atomic("CSSE2301")),
+        ]
+    )
+    return result
+
+
+def test_parse_semester_key():
+    assert parse_semester_key((2024, 1)) == (2024, 1)
+    assert parse_semester_key("2024,2") == (2024, 2)
+    assert parse_semester_key("(2025, 1)") == (2025, 1)
+    assert parse_semester_key("summer") is None
+
+
+def test_requirement_met():
+    requirement = {"kind": "and", "value": [atomic("CSSE1001"), {"kind": "other", "value": "Maths B"}]}
+    assert requirement_met(requirement, frozenset({"CSSE1001"}))
+    assert not requirement_met(requirement, frozenset())
+    assert requirement_met(None, frozenset())
+
+
+def test_ordered_plan(graph: PrerequisiteGraph):
+    plan = {"2025,1": ["CSSE2002"], "2024,2": ["CSSE1001"], (2025, 2): ["CSSE2310"]}
+    assert validate_timeline(plan, graph) == []
+
+
+def test_prerequisite_in_same_semester(graph: PrerequisiteGraph):
+    results = validate_timeline({(2024, 1): ["CSSE1001", "CSSE2002"]}, graph)
+
+    assert len(results) == 1
+    assert results[0].status == Status.ERROR
+    assert results[0].relevant == ["CSSE2002", "CSSE1001"]
+
+
+def test_incompatible(graph: PrerequisiteGraph):
+    results = validate_timeline({(2024, 1): ["CSSE1000", "CSSE2301"], (2024, 2): ["CSSE2310"]}, graph)
+    assert [result.relevant for result in results] == [["CSSE2310", "CSSE2301"]]
+
+
+def test_incompatible_pair_reported_once(graph: PrerequisiteGraph):
+    """Test that courses listing each other as incompatible give a single error."""
+    graph.build(
+        [
+            ("CSSE1001", None, atomic("ENGG1001")),
+            ("ENGG1001", None, {"kind": "or", "value": [atomic("CSSE1001"), atomic("CSSE1001")]}),
+        ]
+    )
+    results = validate_timeline({(2024, 1): ["ENGG1001"], (2024, 2): ["CSSE1001"]}, graph)
+    assert [result.relevant for result in results] == [["ENGG1001", "CSSE1001"]]
@@ -1,8 +1,12 @@
 """Tests for reqs.py."""
 
+import asyncio
+import warnings
+
 import pytest
 
-from common.reqs_parsing import parse_requirement
+from common import reqs_parsing
+from common.reqs_parsing import parse_requirement, parse_requirements_bulk, requirement_pool
 
 DATA = [
     "( Part A OR Part B ) AND Part C",
@@ -47,3 +51,65 @@ def test_parse_requirement_no_error(requirement_str: str):
         _ = parse_requirement(requirement_str)
     except Exception as e:  # noqa: BLE001
         pytest.fail(f"Parsing failed for: {requirement_str}\nException: {e}")
+
+
+def test_parse_requirement_structure():
+    """Test that precedence comes out as nested requirements."""
+    result = parse_requirement("(CSSE1001 or ENGG1001) and MATH1051 or MATH1052 and MATH1040")
+    assert result.model_dump(mode="json") == {
+        "kind": "or",
+        "value": [
+            {
+                "kind": "and",
+                "value": [
+                    {
+                        "kind": "or",
+                        "value": [{"kind": "atomic", "value": "CSSE1001"}, {"kind": "atomic", "value": "ENGG1001"}],
+                    },
+                    {"kind": "atomic", "value": "MATH1051"},
+                ],
+            },
+            {
+                "kind": "and",
+                "value": [{"kind": "atomic", "value": "MATH1052"}, {"kind": "atomic", "value": "MATH1040"}],
+            },
+        ],
+    }
+
+
+def test_parse_requirement_memoised_on_normalised_text():
+    """Test that strings differing only in whitespace share a parse."""
+    assert parse_requirement("Part A  and\nPart B ") is parse_requirement("Part A and Part B")
+    assert parse_requirement("not a ( requirement").kind == "other"
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_parse_requirements_bulk(monkeypatch: pytest.MonkeyPatch, max_workers: int):
+    """Test that bulk parsing matches parsing one at a time, in input order."""
+    monkeypatch.setattr(reqs_parsing, "BULK_PARSE_MIN_PARALLEL", 0)
+    monkeypatch.setattr(reqs_parsing, "BULK_PARSE_CHUNK_SIZE", 4)
+    texts = [*DATA, *reversed(DATA), "CSSE1001 or  ENGG1001"]
+
+    results = parse_requirements_bulk(texts, max_workers=max_workers)
+
+    assert [r.model_dump() for r in results] == [parse_requirement(text).model_dump() for text in texts]
+
+
+def test_parse_requirements_bulk_shared_pool(monkeypatch: pytest.MonkeyPatch):
+    """Test that a pool can be shared across calls, and is safe to start from a thread of a running loop."""
+    monkeypatch.setattr(reqs_parsing, "BULK_PARSE_MIN_PARALLEL", 0)
+    monkeypatch.setattr(reqs_parsing, "BULK_PARSE_CHUNK_SIZE", 4)
+
+    async def parse_twice() -> list[list[str]]:
+        with requirement_pool(2) as pool:
+            return [
+                [r.model_dump() for r in await asyncio.to_thread(parse_requirements_bulk, texts, pool=pool)]
+                for texts in (DATA, list(reversed(DATA)))
+            ]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        first, second = asyncio.run(parse_twice())
+
+    assert first == [parse_requirement(text).model_dump() for text in DATA]
+    assert second == list(reversed(first))
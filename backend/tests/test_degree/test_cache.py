@@ -0,0 +1,63 @@
+"""Tests for the compiled degree cache."""
+
+from uuid import uuid4
+
+from serde import to_dict
+
+from degree.cache import DegreeCache
+from degree.degree import Degree
+from degree.sr_rule import SR1
+from helpers import course_ref
+
+
+def _details(code: str = "CSSE1001") -> dict:
+    degree = Degree.build()
+    degree.sem = ""  # type: ignore[assignment]
+    degree.srs = [SR1(part="A", n=2, options=[course_ref(code)])]
+    return to_dict(degree)
+
+
+def test_compiles_rules_once():
+    cache = DegreeCache(maxsize=4)
+    degree_id = uuid4()
+    details = _details()
+
+    first = cache.get(degree_id, details)
+    second = cache.get(degree_id, _details())
+
+    assert first is second
+    assert isinstance(first.degree.srs[0], SR1)
+    assert first.degree.sem == 0
+    assert details["sem"] == ""  # source details are left untouched
+
+
+def test_changed_details_recompile():
+    cache = DegreeCache(maxsize=4)
+    degree_id = uuid4()
+
+    first = cache.get(degree_id, _details("CSSE1001"))
+    second = cache.get(degree_id, _details("CSSE2002"))
+
+    assert first is not second
+    assert second.degree.srs[0].options[0].code == "CSSE2002"
+    assert len(cache) == 1
+
+
+def test_least_recently_used_evicted():
+    cache = DegreeCache(maxsize=2)
+    ids = [uuid4() for _ in range(3)]
+
+    oldest = cache.get(ids[0], _details())
+    cache.get(ids[1], _details())
+    cache.get(ids[0], _details())
+    cache.get(ids[2], _details())
+
+    assert len(cache) == 2
+    assert cache.get(ids[0], _details()) is oldest
+
+
+def test_clear():
+    cache = DegreeCache()
+    cache.get(uuid4(), _details())
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,90 @@
+"""Tests for rule dependencies and incremental revalidation."""
+
+from serde import to_dict
+
+from degree.aux_rule import AR1, AR2, AR7
+from degree.compiled import compile_degree
+from degree.degree import Degree
+from degree.dependencies import rule_deps
+from degree.sr_rule import SR1, SR6
+from degree.validate_result import Status, ValidateResult
+from helpers import course_ref, make_plan
+
+
+def test_rule_deps():
+    sr = rule_deps(SR1(part="A", n=2, options=[course_ref("CSSE1001"), course_ref("CSSE2002")]))
+    assert sr.affected_by({"CSSE1001"})
+    assert not sr.affected_by({"MATH1061"})
+
+    level = rule_deps(AR2(part="A", n=8, level=1))
+    assert level.affected_by({"MATH1061"})
+    assert not level.affected_by({"CSSE2310"})
+    assert level.affected_by({"BAD"})  # unreadable levels are reported by level rules
+
+    assert rule_deps(AR7(part="A", n=8)).affected_by({"MATH1061"})
+    assert rule_deps(SR6(part="A", plan_type="Major", options=[])).affected_by(set(), specialisations_changed=True)
+    assert not rule_deps(SR6(part="A", plan_type="Major", options=[])).affected_by({"CSSE1001"})
+
+
+def test_revalidate_reuses_unaffected_results():
+    degree = Degree.build()
+    degree.sem = ""  # type: ignore[assignment]
+    degree.aux = [AR2(part="A", n=8, level=3)]
+    degree.srs = [SR1(part="A", n=2, options=[course_ref("CSSE1001")])]
+    compiled = compile_degree(to_dict(degree))
+
+    stale = ValidateResult(Status.WARN, 50, "stale", [])
+    plan = make_plan(["CSSE1001", "CSSE2310"])
+    results = compiled.revalidate(plan, [stale, stale], {"CSSE1001"})
+
+    assert results[0] is stale  # CSSE1001 isn't level 3
+    assert results[1] is not stale
+    assert results[1].status == Status.OK
+
+
+def test_revalidate_refreshes_every_course_rule():
+    """Test that AR1's list of the plan's courses is refreshed by any edit, not just ones at its level."""
+    degree = Degree.build()
+    degree.sem = ""  # type: ignore[assignment]
+    degree.aux = [AR1(part="A", n=8, level=3, or_higher=False)]
+    compiled = compile_degree(to_dict(degree))
+
+    previous = compiled.degree.validate(make_plan(["CSSE1001"]))
+    results = compiled.revalidate(make_plan(["CSSE1001", "MATH1061"]), previous, {"MATH1061"})
+
+    assert results[0].relevant == ["CSSE1001", "MATH1061"]
+
+
+def test_revalidate_with_mismatched_results():
+    """Test that results that don't line up with the degree's rules are thrown away, not reused."""
+    degree = Degree.build()
+    degree.sem = ""  # type: ignore[assignment]
+    degree.srs = [SR1(part="A", n=2, options=[course_ref("CSSE1001")])]
+    compiled = compile_degree(to_dict(degree))
+
+    stale = ValidateResult(Status.WARN, 50, "stale", [])
+    results = compiled.revalidate(make_plan(["CSSE1001"]), [stale, stale], set())
+    assert [result.status for result in results] == [Status.OK]
+
+
+def test_revalidate_without_previous_results():
+    degree = Degree.build()
+    degree.sem = ""  # type: ignore[assignment]
+    degree.srs = [SR1(part="A", n=2, options=[course_ref("CSSE1001")])]
+    compiled = compile_degree(to_dict(degree))
+
+    results = compiled.revalidate(make_plan(["CSSE1001"]), [], set())
+    assert [result.status for result in results] == [Status.OK]
+
+
+def test_option_rules():
+    degree = Degree.build()
+    degree.sem = ""  # type: ignore[assignment]
+    degree.aux = [AR2(part="A", n=8, level=3)]
+    degree.srs = [
+        SR1(part="A", n=2, options=[course_ref("CSSE1001")]),
+        SR1(part="B", n=4, options=[course_ref("CSSE1001"), course_ref("MATH1061")]),
+    ]
+    compiled = compile_degree(to_dict(degree))
+
+    assert compiled.option_rules == {"CSSE1001": [1, 2], "MATH1061": [2]}
@@ -0,0 +1,32 @@
+"""Tests for the course code interner."""
+
+from degree.interner import CourseInterner
+
+
+def test_ids_are_dense_and_stable():
+    interner = CourseInterner()
+    interner.intern_all(["MATH1061", "CSSE1001", "MATH1061"])
+
+    assert len(interner) == 2
+    assert interner.lookup("CSSE1001") == 0  # interned in sorted order
+    assert interner.lookup("MATH1061") == 1
+    assert interner.intern("COMP3301") == 2  # new codes get the next id
+
+
+def test_lookup_never_assigns():
+    interner = CourseInterner()
+    interner.intern_all(["CSSE1001"])
+
+    assert interner.lookup("FAKE9999") is None
+    assert interner.split(["CSSE1001", "FAKE9999"]) == (1, frozenset({"FAKE9999"}))
+    assert len(interner) == 1
+
+
+def test_mask_round_trip():
+    interner = CourseInterner()
+    interner.intern_all(["CSSE2310", "CSSE1001"])
+    mask = interner.mask(["CSSE2310", "CSSE1001", "CSSE2310"])
+
+    assert mask.bit_count() == 2
+    assert interner.codes(mask) == ["CSSE1001", "CSSE2310"]
+    assert interner.codes(0) == []
@@ -0,0 +1,105 @@
+"""Tests for compiled degree rule logic."""
+
+from serde import to_dict
+
+from degree.compiled import compile_degree
+from degree.degree import Degree
+from degree.rule_logic import AllNode, AnyNode, compile_rule_logic
+from degree.sr_rule import SR1
+from helpers import course_ref, make_plan
+
+
+def test_parse():
+    node = compile_rule_logic("Part A and (A.1 or b)")
+    assert isinstance(node, AllNode)
+    assert isinstance(node.children[1], AnyNode)
+    assert node.parts() == {"A", "A.1", "B"}
+
+    chained = compile_rule_logic("A and B and C")
+    assert isinstance(chained, AllNode)
+    assert len(chained.children) == 3
+
+    assert compile_rule_logic("A and or") is None
+
+
+def test_owner():
+    assert compile_rule_logic("A.1 or A.2").owner() == "A"
+    assert compile_rule_logic("A.1.a and A.1.b or A.2").owner() == "A"
+    assert compile_rule_logic("A and B").owner() == ""
+    assert compile_rule_logic("A.1 or B.1").owner() == ""
+
+
+def test_evaluate_short_circuits():
+    asked = []
+
+    def part_met(part: str) -> bool:
+        asked.append(part)
+        return part == "A"
+
+    assert compile_rule_logic("A or B").evaluate(part_met)
+    assert asked == ["A"]
+
+
+def test_degree_completion():
+    degree = Degree.build()
+    degree.sem = ""  # type: ignore[assignment]
+    degree.srs = [
+        SR1(part="A", n=2, options=[course_ref("CSSE1001")]),
+        SR1(part="B", n=2, options=[course_ref("MATH1061")]),
+        SR1(part="C", n=2, options=[course_ref("COMP3301")]),
+    ]
+    degree.rule_logic = ["A and (B or C)"]
+    compiled = compile_degree(to_dict(degree))
+
+    assert compiled.is_complete(make_plan(["CSSE1001", "COMP3301"]))
+    assert not compiled.is_complete(make_plan(["MATH1061", "COMP3301"]))
+
+    results = compiled.degree.validate(make_plan(["CSSE1001", "MATH1061"]))
+    assert compiled.completed_by(results)
+
+    degree.rule_logic = []
+    assert not compile_degree(to_dict(degree)).is_complete(make_plan(["CSSE1001", "MATH1061"]))
+
+
+def _nested_degree() -> Degree:
+    """Part A only has rules in its sub-parts, one of which completes it."""
+    degree = Degree.build()
+    degree.part_references = {"A": "", "A.1": "", "A.2": "", "B": ""}
+    degree.srs = [
+        SR1(part="A.1", n=2, options=[course_ref("CSSE1001")]),
+        SR1(part="A.2", n=2, options=[course_ref("MATH1061")]),
+        SR1(part="B", n=2, options=[course_ref("COMP3301")]),
+    ]
+    return degree
+
+
+def test_part_logic_is_evaluated_within_its_part():
+    degree = _nested_degree()
+    degree.part_logic = {"": "A and B", "A": "A.1 or A.2"}
+    degree.rule_logic = list(degree.part_logic.values())
+    compiled = compile_degree(to_dict(degree))
+
+    assert compiled.is_complete(make_plan(["CSSE1001", "COMP3301"]))
+    assert compiled.is_complete(make_plan(["MATH1061", "COMP3301"]))
+    # part A has no rules of its own, but isn't met without one of its sub-parts
+    assert not compiled.is_complete(make_plan(["COMP3301"]))
+    assert not compiled.is_complete(make_plan(["CSSE1001", "MATH1061"]))
+
+
+def test_rule_logic_owners_are_inferred():
+    degree = _nested_degree()
+    degree.rule_logic = ["A and B", "A.1 or A.2"]
+    compiled = compile_degree(to_dict(degree))
+
+    assert compiled.is_complete(make_plan(["MATH1061", "COMP3301"]))
+    assert not compiled.is_complete(make_plan(["COMP3301"]))
+
+
+def test_parts_without_logic_need_every_sub_part():
+    degree = _nested_degree()
+    degree.part_logic = {"": "A or B"}
+    compiled = compile_degree(to_dict(degree))
+
+    assert compiled.is_complete(make_plan(["COMP3301"]))
+    assert not compiled.is_complete(make_plan(["CSSE1001"]))
+    assert compiled.is_complete(make_plan(["CSSE1001", "MATH1061"]))